@@ -1,9 +1,22 @@
 # backend/app.py
-from flask import Flask, request, jsonify, session
+from flask import Flask, Response, g, request, jsonify, session
 from flask_cors import CORS
-import pickle
-import pandas as pd
+from werkzeug.http import parse_cookie
+import threading
+import time
+import warnings
 from routes.auth import auth_bp
+from routes.assessments import assessment_writer, assessments_bp
+from routes.stats import population_stats, stats_bp
+from inference.artifact import ModelStore
+from inference.batching import BatchTimeout, MicroBatcher
+from inference.cache import PredictionCache
+from inference.service import batch_response, explain_record, iter_ndjson, predict_record, score_records
+from inference.whatif import whatif_record
+from models.migrations import migrate_configured
+from metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, stage, tracer
+from schemas import ValidationError
+from sessions import ServerSessionInterface, make_session_store
 import os
 
 app = Flask(__name__)
@@ -11,19 +24,75 @@ CORS(app, supports_credentials=True)  # Enable CORS with credentials for session
 
 # Configure session
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-app.config['SESSION_TYPE'] = 'filesystem'
+# Sessions live server-side (SESSION_BACKEND=sqlite|memory); the cookie only holds an opaque id
+app.session_interface = ServerSessionInterface(make_session_store())
+
+def run_startup_first(wsgi_app):
+    """Run startup() before the first request of servers that import app:app without calling it
+    (gunicorn, flask run); wraps the WSGI app because sessions are loaded before before_request hooks"""
+    def wrapped(environ, start_response):
+        if not _started:
+            startup()
+        return wsgi_app(environ, start_response)
+    return wrapped
+
+app.wsgi_app = run_startup_first(app.wsgi_app)
 
 # Register auth blueprint
 app.register_blueprint(auth_bp, url_prefix='/auth')
+app.register_blueprint(assessments_bp, url_prefix='/assessments')
+app.register_blueprint(stats_bp, url_prefix='/stats')
+
+# Number of records scored per predict_proba call on /predict/batch
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', 512))
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl")
+
+# Rows are encoded as plain arrays, so skip sklearn's per-call feature name check warning
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+# Migrations run when a server starts, never at import; DB_AUTO_MIGRATE=0 only checks that they
+# were applied, for deploys that run `python -m models.migrations` themselves
+DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', '1') == '1'
+_started = False
+_startup_lock = threading.Lock()
+
+# Model artifact, loaded on first use and hot-swapped when a new version is published
+model_store = ModelStore()
+
+# Cache of /predict results for resubmitted forms, emptied whenever the model changes
+prediction_cache = PredictionCache(
+    maxsize=int(os.environ.get('PREDICTION_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('PREDICTION_CACHE_TTL', 300))
+)
+model_store.on_reload(lambda bundle: prediction_cache.clear())
 
-# Load model & feature names
-try:
-    with open("model.pkl", "rb") as f:
-        model, feature_names = pickle.load(f)
-    print("Model loaded successfully!")
-except FileNotFoundError:
-    print("Error: model.pkl file not found!")
-    model, feature_names = None, None
+# Opt-in coalescing of concurrent /predict calls into one forest pass
+MICROBATCH_WINDOW_MS = float(os.environ.get('MICROBATCH_WINDOW_MS', 0))
+micro_batcher = MicroBatcher(
+    window=MICROBATCH_WINDOW_MS / 1000,
+    max_rows=int(os.environ.get('MICROBATCH_MAX_ROWS', 64)),
+    timeout=float(os.environ.get('MICROBATCH_TIMEOUT_MS', 1000)) / 1000
+) if MICROBATCH_WINDOW_MS > 0 else None
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.trace_token = tracer.start(f"{request.method} {request.path}")
+
+@app.after_request
+def observe_request(response):
+    # Label by route pattern rather than raw path to keep the series count bounded
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, endpoint=endpoint, method=request.method,
+                            status=response.status_code)
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def finish_trace(exc=None):
+    token = g.pop('trace_token', None)
+    if token is not None:
+        tracer.finish(token, g.pop('response_status', 500))
 
 @app.route("/", methods=["GET"])
 def home():
@@ -31,119 +100,163 @@ def home():
 
 @app.route("/predict", methods=["POST"])
 def predict():
-    if model is None:
+    bundle = model_store.get()
+    if bundle is None:
         return jsonify({"error": "Model not loaded"}), 500
         
-    data = request.json  # JSON input
+    with stage("/predict", "parse"):
+        data = request.json  # JSON input
     
     if not data:
         return jsonify({"error": "No data provided"}), 400
     
     try:
-        print("Received data:", data)  # Debug log
-        
-        # Convert input to DataFrame
-        df = pd.DataFrame([data])
-        
-        # Handle categorical variables (if any)
-        df = pd.get_dummies(df)
-        
-        # Add missing columns from training
-        for col in feature_names:
-            if col not in df.columns:
-                df[col] = 0
-        
-        # Ensure same column order as training data
-        df = df[feature_names]
-        
-        print("Processed DataFrame shape:", df.shape)  # Debug log
-        print("DataFrame columns:", df.columns.tolist())  # Debug log
-        
-        # Get prediction and probabilities
-        prediction = model.predict(df)[0]
-        probabilities = model.predict_proba(df)[0]
-        
-        # Calculate risk level based on probability
-        risk_probability = float(probabilities[1]) if len(probabilities) > 1 else float(probabilities[0])
-        
-        # Determine risk level
-        if risk_probability >= 0.7:
-            risk_level = "High"
-        elif risk_probability >= 0.4:
-            risk_level = "Medium"
-        else:
-            risk_level = "Low"
-        
-        # Generate recommendations based on risk level
-        recommendations = get_recommendations(risk_level, data)
-        
-        return jsonify({
-            "prediction": int(prediction),
-            "probability": risk_probability,
-            "risk_level": risk_level,
-            "risk_percentage": round(risk_probability * 100, 2),
-            "recommendations": recommendations,
-            "status": "success"
-        })
+        result = predict_record(bundle, data, prediction_cache, micro_batcher,
+                                assessment_recorder(bundle, session.get('user_id')))
+    except ValidationError as e:
+        return jsonify(e.as_dict()), 400
+    except BatchTimeout as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
-        print("Error in prediction:", str(e))  # Debug log
         return jsonify({"error": str(e)}), 400
 
-def get_recommendations(risk_level, user_data):
-    """Generate personalized recommendations based on risk level and user data"""
-    base_recommendations = {
-        "High": [
-            "Consult with a healthcare professional immediately",
-            "Monitor blood glucose levels daily",
-            "Follow a strict diabetes-friendly diet",
-            "Engage in supervised physical activity",
-            "Consider medication as prescribed by your doctor"
-        ],
-        "Medium": [
-            "Schedule regular check-ups with your healthcare provider",
-            "Maintain a balanced diet with limited refined sugars",
-            "Exercise regularly (at least 150 minutes per week)",
-            "Monitor your weight and BMI regularly",
-            "Manage stress through relaxation techniques"
-        ],
-        "Low": [
-            "Continue maintaining healthy eating habits",
-            "Stay physically active with regular exercise",
-            "Keep up with routine health screenings",
-            "Maintain a healthy weight",
-            "Stay informed about diabetes prevention"
-        ]
-    }
+    with stage("/predict", "serialize"):
+        return jsonify(result)
+
+def assessment_recorder(bundle, user_id):
+    """on_scored hook queueing a logged-in user's result for the write-behind history"""
+    if not user_id:
+        return None
+    return lambda row, risk_probability, risk_level: assessment_writer.submit(
+        user_id, row, risk_probability, risk_level, bundle.version)
+
+def session_user_id(cookie_header):
+    """User id from the session cookie, for routes served outside Flask"""
+    if not cookie_header:
+        return None
+    # Parsed the way Flask parses it, so a malformed third-party cookie does not hide the session
+    loaded = app.session_interface.load(parse_cookie(cookie_header).get(app.config['SESSION_COOKIE_NAME']))
+    return loaded[0].get('user_id') if loaded else None
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """Score a JSON array or NDJSON stream of records, one predict_proba call per chunk"""
+    bundle = model_store.get()
+    if bundle is None:
+        return jsonify({"error": "Model not loaded"}), 500
     
-    recommendations = base_recommendations.get(risk_level, base_recommendations["Low"])
+    if request.mimetype in NDJSON_MIMETYPES:
+        # NDJSON lines are parsed lazily while scoring
+        records = iter_ndjson(request.stream)
+    else:
+        with stage("/predict/batch", "parse"):
+            records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            return jsonify({"error": "Expected a JSON array of records"}), 400
     
-    # Add personalized recommendations based on user data
-    try:
-        bmi = float(user_data.get('BMI', 0))
-        if bmi > 30:
-            recommendations.append("Focus on weight management - consider consulting a nutritionist")
-        
-        if user_data.get('smoking_status') != 'never':
-            recommendations.append("Consider smoking cessation programs")
-        
-        if int(user_data.get('physical_activity', 1)) < 3:
-            recommendations.append("Gradually increase your physical activity level")
-            
-        glucose = float(user_data.get('Glucose', 0))
-        if glucose > 125:
-            recommendations.append("Monitor fasting glucose levels more frequently")
-            
-    except (ValueError, TypeError):
-        pass  # Skip personalized recommendations if data conversion fails
+    with stage("/predict/batch", "score"):
+        results = score_records(bundle, records, BATCH_CHUNK_SIZE)
+    if not results:
+        return jsonify({"error": "No data provided"}), 400
     
-    return recommendations
+    with stage("/predict/batch", "serialize"):
+        return jsonify(batch_response(results))
+
+@app.route("/predict/explain", methods=["POST"])
+def predict_explain():
+    """Prediction plus per-field contributions to the risk; a JSON array is explained as a batch"""
+    bundle = model_store.get()
+    if bundle is None:
+        return jsonify({"error": "Model not loaded"}), 500
+
+    with stage("/predict/explain", "parse"):
+        data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    if isinstance(data, list):
+        with stage("/predict/explain", "score"):
+            results = score_records(bundle, data, BATCH_CHUNK_SIZE, explain=True)
+        with stage("/predict/explain", "serialize"):
+            return jsonify(batch_response(results))
+
+    try:
+        result = explain_record(bundle, data)
+    except ValidationError as e:
+        return jsonify(e.as_dict()), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    with stage("/predict/explain", "serialize"):
+        return jsonify(result)
+
+@app.route("/predict/whatif", methods=["POST"])
+def predict_whatif():
+    """Risk over a grid of values for one or two fields of a base profile, scored in one pass"""
+    bundle = model_store.get()
+    if bundle is None:
+        return jsonify({"error": "Model not loaded"}), 500
+
+    with stage("/predict/whatif", "parse"):
+        data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    try:
+        result = whatif_record(bundle, data)
+    except ValidationError as e:
+        return jsonify(e.as_dict()), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    with stage("/predict/whatif", "serialize"):
+        return jsonify(result)
 
 @app.route("/health", methods=["GET"])
 def health_check():
-    return jsonify({
+    return jsonify(health_status())
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Latency histograms in the Prometheus text format"""
+    return Response(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.route("/metrics/traces", methods=["GET"])
+def traces():
+    """Most recent sampled request traces (TRACE_SAMPLE_RATE > 0)"""
+    return jsonify({"sample_rate": tracer.sample_rate, "traces": tracer.recent(request.args.get('limit', type=int))})
+
+def health_status():
+    """Health payload shared by the WSGI and ASGI servers"""
+    bundle = model_store.get()
+    return {
         "status": "healthy",
-        "model_loaded": model is not None
-    })
+        "model_loaded": bundle is not None,
+        "model_version": bundle.version if bundle else None,
+        "prediction_cache": prediction_cache.stats(),
+        "microbatch": micro_batcher.stats() if micro_batcher else None,
+        "assessment_writer": assessment_writer.stats(),
+        "sessions": app.session_interface.stats()
+    }
+
+def startup():
+    """Get the process ready for traffic: apply (or check) migrations and map the model. Runs once."""
+    global _started
+    with _startup_lock:
+        if _started:
+            return
+        databases = migrate_configured(check=not DB_AUTO_MIGRATE)
+        if not DB_AUTO_MIGRATE and any(databases.values()):
+            raise RuntimeError(f"Pending database migrations {databases}; run python -m models.migrations")
+        model_store.get()
+        _started = True
+
+def preload():
+    """startup() plus what requests would otherwise build lazily, for servers that fork afterwards"""
+    startup()
+    # Built on the first /stats request otherwise, once per worker
+    population_stats.get()
 
 if __name__ == "__main__":
+    startup()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,329 @@
+# backend/asgi.py
+"""ASGI entry point for the SynapseCare API.
+
+/health and the /predict routes are served natively on the event loop,
+with model lookups and forest scoring pushed to a thread pool. Every other route (the /auth
+blueprint, CORS preflights) runs the Flask app on a separate WSGI thread
+pool, where PBKDF2 is further bounded by the hashing executor. A burst of
+scoring or logins therefore never blocks the loop that answers /health.
+
+Production launch (one process per core, model arrays shared via mmap):
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4 \\
+        --no-access-log --timeout-keep-alive 5
+
+or ``python serve.py --workers 4`` to import and warm up the app once and
+fork the workers from it (see serve.py).
+
+Tuning: INFERENCE_WORKERS (scoring threads per process, default CPU count),
+WSGI_WORKERS (Flask threads per process, default 32). With micro-batching
+enabled (MICROBATCH_WINDOW_MS) scoring threads mostly wait on the batcher,
+so INFERENCE_WORKERS should be raised towards the expected concurrency.
+"""
+import asyncio
+import contextvars
+import functools
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app as api
+from inference.batching import BatchTimeout
+from inference.service import batch_response, explain_record, iter_ndjson, predict_record, score_records
+from inference.whatif import whatif_record
+from metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, stage, tracer
+from schemas import ValidationError
+
+MODEL_NOT_LOADED = {"error": "Model not loaded"}
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', os.cpu_count() or 1))
+WSGI_WORKERS = int(os.environ.get('WSGI_WORKERS', 32))
+
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_WORKERS, thread_name_prefix="wsgi")
+# Its own thread, so /health answers while the other pools are saturated
+health_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health")
+
+
+class ModelNotLoaded(Exception):
+    pass
+
+
+def with_bundle(func, *args):
+    # ModelStore.get() may read CURRENT and map a new artifact under its lock, so never on the loop
+    bundle = api.model_store.get()
+    if bundle is None:
+        raise ModelNotLoaded()
+    return func(bundle, *args)
+
+
+def run_inference(func, *args):
+    """Run func(bundle, *args) with the current model on the inference pool, carrying over the trace context"""
+    call = functools.partial(contextvars.copy_context().run, with_bundle, func, *args)
+    return asyncio.get_running_loop().run_in_executor(inference_executor, call)
+
+
+def predict_for_session(bundle, data, cookie_header):
+    # The session lookup is a SQLite query, so it runs on the inference thread along with the scoring
+    user_id = api.session_user_id(cookie_header)
+    return predict_record(bundle, data, api.prediction_cache, api.micro_batcher,
+                          api.assessment_recorder(bundle, user_id))
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def send_json(send, scope, payload, status=200, endpoint=None):
+    if endpoint:
+        with stage(endpoint, "serialize"):
+            body = json.dumps(payload).encode("utf-8")
+    else:
+        body = json.dumps(payload).encode("utf-8")
+    await send_body(send, scope, body, b"application/json", status)
+
+
+async def send_body(send, scope, body, content_type, status=200):
+    headers = [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+    # Mirror Flask-CORS(supports_credentials=True) for the natively served routes
+    origin = dict(scope["headers"]).get(b"origin")
+    if origin:
+        headers += [(b"access-control-allow-origin", origin), (b"access-control-allow-credentials", b"true"),
+                    (b"vary", b"Origin")]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def health(scope, receive, send):
+    # Reads the session store and the model pointer
+    status = await asyncio.get_running_loop().run_in_executor(health_executor, api.health_status)
+    await send_json(send, scope, status)
+
+
+async def metrics(scope, receive, send):
+    await send_body(send, scope, REGISTRY.render().encode("utf-8"), PROMETHEUS_CONTENT_TYPE.encode())
+
+
+async def predict(scope, receive, send):
+    body = await read_body(receive)
+    with stage("/predict", "parse"):
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+    if not data:
+        return await send_json(send, scope, {"error": "No data provided"}, 400)
+
+    try:
+        cookie_header = dict(scope["headers"]).get(b"cookie", b"").decode("latin1")
+        result = await run_inference(predict_for_session, data, cookie_header)
+    except ModelNotLoaded:
+        return await send_json(send, scope, MODEL_NOT_LOADED, 500)
+    except ValidationError as e:
+        return await send_json(send, scope, e.as_dict(), 400)
+    except BatchTimeout as e:
+        return await send_json(send, scope, {"error": str(e)}, 503)
+    except Exception as e:
+        return await send_json(send, scope, {"error": str(e)}, 400)
+    await send_json(send, scope, result, endpoint="/predict")
+
+
+async def predict_batch(scope, receive, send):
+    body = await read_body(receive)
+    content_type = dict(scope["headers"]).get(b"content-type", b"").split(b";")[0].decode("latin1").strip()
+    with stage("/predict/batch", "parse"):
+        if content_type in api.NDJSON_MIMETYPES:
+            records = list(iter_ndjson(body.splitlines()))
+        else:
+            try:
+                records = json.loads(body)
+            except ValueError:
+                records = None
+    if not isinstance(records, list):
+        return await send_json(send, scope, {"error": "Expected a JSON array of records"}, 400)
+
+    try:
+        with stage("/predict/batch", "score"):
+            results = await run_inference(score_records, records, api.BATCH_CHUNK_SIZE)
+    except ModelNotLoaded:
+        return await send_json(send, scope, MODEL_NOT_LOADED, 500)
+    if not results:
+        return await send_json(send, scope, {"error": "No data provided"}, 400)
+    await send_json(send, scope, batch_response(results), endpoint="/predict/batch")
+
+
+async def predict_explain(scope, receive, send):
+    body = await read_body(receive)
+    with stage("/predict/explain", "parse"):
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+    if not data:
+        return await send_json(send, scope, {"error": "No data provided"}, 400)
+
+    try:
+        if isinstance(data, list):
+            with stage("/predict/explain", "score"):
+                results = await run_inference(score_records, data, api.BATCH_CHUNK_SIZE, True)
+            result = batch_response(results)
+        else:
+            result = await run_inference(explain_record, data)
+    except ModelNotLoaded:
+        return await send_json(send, scope, MODEL_NOT_LOADED, 500)
+    except ValidationError as e:
+        return await send_json(send, scope, e.as_dict(), 400)
+    except Exception as e:
+        return await send_json(send, scope, {"error": str(e)}, 400)
+    await send_json(send, scope, result, endpoint="/predict/explain")
+
+
+async def predict_whatif(scope, receive, send):
+    body = await read_body(receive)
+    with stage("/predict/whatif", "parse"):
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+    if not data:
+        return await send_json(send, scope, {"error": "No data provided"}, 400)
+
+    try:
+        result = await run_inference(whatif_record, data)
+    except ModelNotLoaded:
+        return await send_json(send, scope, MODEL_NOT_LOADED, 500)
+    except ValidationError as e:
+        return await send_json(send, scope, e.as_dict(), 400)
+    except Exception as e:
+        return await send_json(send, scope, {"error": str(e)}, 400)
+    await send_json(send, scope, result, endpoint="/predict/whatif")
+
+
+NATIVE_ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/metrics"): metrics,
+    ("POST", "/predict"): predict,
+    ("POST", "/predict/batch"): predict_batch,
+    ("POST", "/predict/explain"): predict_explain,
+    ("POST", "/predict/whatif"): predict_whatif,
+}
+
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope into a WSGI environ"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        # The body is already buffered, so chunked uploads get a plain length too
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin1").upper().replace("-", "_")
+        value = value.decode("latin1")
+        if name == "CONTENT_TYPE":
+            environ[name] = value
+            continue
+        if name == "CONTENT_LENGTH" or name == "TRANSFER_ENCODING":
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def run_wsgi(environ):
+    """Run the Flask app to completion on a worker thread"""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = [(name.lower().encode("latin1"), value.encode("latin1")) for name, value in headers]
+        return lambda data: None
+
+    result = api.app(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return response["status"], response["headers"], body
+
+
+async def instrumented(handler, scope, receive, send):
+    """Time a natively served request the way the Flask hooks time delegated ones"""
+    started = time.perf_counter()
+    token = tracer.start(f"{scope['method']} {scope['path']}")
+    status = 500
+
+    async def capture_status(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        await send(message)
+
+    try:
+        await handler(scope, receive, capture_status)
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=scope["path"], method=scope["method"],
+                                status=status)
+        tracer.finish(token, status)
+
+
+async def delegate_to_flask(scope, receive, send):
+    body = await read_body(receive)
+    loop = asyncio.get_running_loop()
+    status, headers, body = await loop.run_in_executor(wsgi_executor, run_wsgi, build_environ(scope, body))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Migrate and map the model before taking traffic (a no-op in workers forked after preload)
+            try:
+                await asyncio.get_running_loop().run_in_executor(inference_executor, api.startup)
+            except Exception as e:
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            inference_executor.shutdown(wait=False)
+            wsgi_executor.shutdown(wait=False)
+            health_executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(scope, receive, send)
+    if scope["type"] != "http":
+        return
+    handler = NATIVE_ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        # Flask's request hooks record metrics for delegated routes
+        return await delegate_to_flask(scope, receive, send)
+    await instrumented(handler, scope, receive, send)
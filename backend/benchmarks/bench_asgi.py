@@ -0,0 +1,128 @@
+# backend/benchmarks/bench_asgi.py
+"""Throughput of the Flask dev server vs the ASGI entry point under uvicorn.
+
+Both servers run in-process on one worker. Client threads hammer /predict while
+a probe measures /health latency. Run from the backend directory:
+    python -m benchmarks.bench_asgi --clients 16 --seconds 5
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PREDICT_PAYLOAD = json.dumps({
+    "gender": "Female", "Age": 50, "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+    "SkinThickness": 35, "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627,
+    "smoking_status": "Never", "physical_activity": "Low",
+})
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_flask(port):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    import app as api
+
+    api.startup()
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", port, api.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown
+
+
+def serve_asgi(port):
+    import uvicorn
+
+    from asgi import application
+
+    server = uvicorn.Server(uvicorn.Config(application, host="127.0.0.1", port=port, log_level="warning",
+                                           access_log=False))
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve()), daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+    return stop
+
+
+def request(conn, method, path, body=None):
+    conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def load(port, clients, seconds):
+    """Return (/predict requests per second, /health latencies in ms)"""
+    stop = threading.Event()
+    counts = [0] * clients
+
+    def client(slot):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while not stop.is_set():
+            request(conn, "POST", "/predict", PREDICT_PAYLOAD)
+            counts[slot] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(clients)]
+    for thread in threads:
+        thread.start()
+
+    probe = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        began = time.perf_counter()
+        request(probe, "GET", "/health")
+        latencies.append((time.perf_counter() - began) * 1e3)
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    probe.close()
+    return sum(counts) / elapsed, np.asarray(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # Measure raw scoring throughput rather than cache hits
+    os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+
+    print(f"{'server':>12} {'predict/s':>10} {'health p50':>11} {'health p99':>11}")
+    for name, serve in (("flask", serve_flask), ("asgi", serve_asgi)):
+        port = free_port()
+        stop = serve(port)
+        throughput, latencies = load(port, args.clients, args.seconds)
+        stop()
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"{name:>12} {throughput:>10.0f} {p50:>9.2f}ms {p99:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
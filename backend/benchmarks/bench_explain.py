@@ -0,0 +1,112 @@
+# backend/benchmarks/bench_explain.py
+"""Per-row cost of /predict/explain contributions for the served forest.
+
+Compares three ways of computing the same path decomposition:
+    naive     walk every tree node by node in Python, one row at a time
+    descent   vectorized descent accumulating contributions at each level
+    table     PathExplainer: apply + one gather from the precomputed node table
+and checks that all three agree with predict_proba. Run from the backend directory:
+    python -m benchmarks.bench_explain --rows 1 10 100 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference.artifact import ModelStore  # noqa: E402
+from inference.explain import PathExplainer  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "data", "diabetes_extended_ordered.csv")
+
+
+def naive(forest, positive, X):
+    """Saabas contributions with a Python loop per row, tree and node"""
+    contributions = np.zeros(X.shape)
+    for r, x in enumerate(X.astype(np.float32)):
+        for root in forest.roots:
+            node = root
+            while True:
+                f = forest.feature[node]
+                child = forest.children[2 * node + (x[f] <= forest.threshold[node])]
+                if child == node:
+                    break
+                contributions[r, f] += positive[child] - positive[node]
+                node = child
+    return contributions / forest.n_estimators
+
+
+def descent(forest, positive, X):
+    """Contributions accumulated level by level during a vectorized descent, without a table"""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n_rows, n_features = X.shape
+    row_offsets = np.arange(0, n_rows * n_features, n_features, dtype=np.intp)[:, None]
+    node = np.broadcast_to(forest.roots, (n_rows, forest.n_estimators))
+    contributions = np.zeros(n_rows * n_features)
+    X_flat = X.ravel()
+    for _ in range(forest.max_depth):
+        feature = np.take(forest.feature, node)
+        go_left = np.take(X_flat, row_offsets + feature) <= np.take(forest.threshold, node)
+        child = np.take(forest.children, 2 * node + go_left)
+        contributions += np.bincount((row_offsets + feature).ravel(),
+                                     weights=(positive[child] - positive[node]).ravel(),
+                                     minlength=n_rows * n_features)
+        node = child
+    return contributions.reshape(n_rows, n_features) / forest.n_estimators
+
+
+def per_row_ms(fn, X, budget):
+    """Mean milliseconds per row, repeating fn(X) for about `budget` seconds"""
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        fn(X)
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= budget:
+            return elapsed / calls / len(X) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--naive-rows", type=int, default=20, help="rows timed for the naive loop")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds spent timing each measurement")
+    args = parser.parse_args()
+
+    bundle = ModelStore().get()
+    forest = bundle.model
+    started = time.perf_counter()
+    explainer = PathExplainer.from_model(forest, bundle.encoder, bundle.scorer.positive_index)
+    build_ms = (time.perf_counter() - started) * 1e3
+    positive = explainer.forest.value[:, explainer.positive_index]
+    print(f"{explainer.forest.n_estimators} trees, {len(explainer.forest.feature)} nodes, max depth "
+          f"{explainer.forest.max_depth}; node table {explainer.node_contributions.nbytes / 2 ** 20:.1f} MB "
+          f"built in {build_ms:.1f} ms")
+
+    records = pd.read_csv(DATA_PATH).drop("Outcome", axis=1).sample(max(args.rows), random_state=0, replace=True)
+    X = np.vstack([bundle.encoder.encode(record) for record in records.to_dict("records")])
+
+    probabilities, table = explainer.explain(X)
+    expected = probabilities[:, explainer.positive_index]
+    n = min(args.naive_rows, len(X))
+    for name, contributions in (("table", table), ("descent", descent(explainer.forest, positive, X)),
+                                ("naive", naive(explainer.forest, positive, X[:n]))):
+        error = np.abs(explainer.base_value + contributions.sum(axis=1) - expected[:len(contributions)]).max()
+        print(f"{name:>8} max |base + sum - probability| = {error:.2e}")
+
+    naive_ms = per_row_ms(lambda rows: naive(explainer.forest, positive, rows), X[:n], args.budget)
+    print(f"\n{'rows':>6} {'naive ms/row':>13} {'descent ms/row':>15} {'table ms/row':>13} {'speedup':>8}")
+    for rows in args.rows:
+        descent_ms = per_row_ms(lambda batch: descent(explainer.forest, positive, batch), X[:rows], args.budget)
+        table_ms = per_row_ms(explainer.explain, X[:rows], args.budget)
+        print(f"{rows:>6} {naive_ms:>13.3f} {descent_ms:>15.3f} {table_ms:>13.3f} {naive_ms / table_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# backend/benchmarks/bench_forest.py
+"""Latency of sklearn predict_proba vs the compiled NumPy forest.
+
+Run from the backend directory:
+    python -m benchmarks.bench_forest --model model.pkl --batch 1 32 512
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from export_model import load_training_matrix, verify_parity  # noqa: E402
+from inference.encoder import FeatureEncoder  # noqa: E402
+from inference.forest import CompiledForest  # noqa: E402
+
+warnings.filterwarnings("ignore")
+
+
+def median_ms(fn, X, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.path.join(BACKEND_DIR, "model.pkl"))
+    parser.add_argument("--data", default=os.path.join(BACKEND_DIR, "data", "diabetes_extended_ordered.csv"))
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 32, 512])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f:
+        model, feature_names, *extra = pickle.load(f)
+    encoder = FeatureEncoder(feature_names, extra[0] if extra else None)
+    compiled = CompiledForest.from_sklearn(model, feature_names)
+    X = load_training_matrix(encoder, args.data)
+
+    difference = verify_parity(compiled, model, X)
+    print(f"parity: max |compiled - sklearn| = {difference:.2e} over {len(X)} rows")
+
+    print(f"{'batch':>6} {'sklearn (ms)':>13} {'compiled (ms)':>14} {'speedup':>8}")
+    for size in args.batch:
+        rows = np.resize(X, (size, X.shape[1]))
+        sklearn_ms = median_ms(model.predict_proba, rows, args.repeat)
+        compiled_ms = median_ms(compiled.predict_proba, rows, args.repeat)
+        print(f"{size:>6} {sklearn_ms:>13.3f} {compiled_ms:>14.3f} {sklearn_ms / compiled_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
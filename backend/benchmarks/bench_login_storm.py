@@ -0,0 +1,131 @@
+# backend/benchmarks/bench_login_storm.py
+"""/predict latency during a /auth/login storm: unbounded hashing, the bounded hashing pool, and
+the bounded pool behind the login rate limits.
+
+Serves the app from a threaded WSGI server in-process. Run from the backend directory:
+    python -m benchmarks.bench_login_storm --storm-threads 32 --seconds 5
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PREDICT_PAYLOAD = json.dumps({
+    "gender": "Female", "Age": 50, "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+    "SkinThickness": 35, "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627,
+    "smoking_status": "Never", "physical_activity": "Low",
+})
+LOGIN_PAYLOAD = json.dumps({"email": "storm@example.com", "password": "password123"})
+
+
+def post(port, path, body):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def measure_predict(port, seconds):
+    """Sequential /predict latencies in milliseconds"""
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        post(port, "/predict", PREDICT_PAYLOAD)
+        latencies.append((time.perf_counter() - start) * 1e3)
+    return np.asarray(latencies)
+
+
+def storm(port, threads, stop, statuses):
+    def worker():
+        while not stop.is_set():
+            statuses[post(port, "/auth/login", LOGIN_PAYLOAD)] += 1
+
+    pool = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    return pool
+
+
+def report(name, latencies, statuses=None):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    logins = ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items())) if statuses else "-"
+    print(f"{name:>22} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}   logins {logins}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--storm-threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--ip-rate", default="20/60", help="login limit per client IP for the last scenario")
+    parser.add_argument("--email-rate", default="5/300", help="login limit per email for the last scenario")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["USERS_DB_PATH"] = os.path.join(directory, "users.db")
+    # Only the last scenario is rate limited
+    os.environ["LOGIN_IP_RATE"] = os.environ["LOGIN_EMAIL_RATE"] = "1000000000/1"
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    import app as api
+    from models.hashing import HashingExecutor
+    from ratelimit import MemoryLimitStore, RateLimit, parse_rate
+    from routes import auth
+    from routes.auth import user_model
+
+    api.startup()
+    user_model.create_user("Storm", "User", "storm@example.com", "", "password123")
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, api.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    print(f"{'scenario':>22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    report("idle", measure_predict(port, args.seconds))
+
+    bounded = user_model.hasher
+    scenarios = {
+        # Enough workers that every login hashes immediately, like the old inline path
+        "storm, unbounded": HashingExecutor(max_workers=args.storm_threads, max_queue=args.storm_threads),
+        f"storm, {bounded.max_workers} workers": bounded,
+    }
+    scenarios["storm, rate limited"] = bounded
+    for name, hasher in scenarios.items():
+        user_model.hasher = hasher
+        if name == "storm, rate limited":
+            limits = MemoryLimitStore()
+            auth.login_ip_limit = RateLimit("login_ip", *parse_rate(args.ip_rate), limits)
+            auth.login_email_limit = RateLimit("login_email", *parse_rate(args.email_rate), limits)
+        stop = threading.Event()
+        statuses = Counter()
+        pool = storm(port, args.storm_threads, stop, statuses)
+        time.sleep(0.5)
+        latencies = measure_predict(port, args.seconds)
+        stop.set()
+        for thread in pool:
+            thread.join()
+        report(name, latencies, statuses)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
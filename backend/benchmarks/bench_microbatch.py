@@ -0,0 +1,74 @@
+# backend/benchmarks/bench_microbatch.py
+"""Concurrent single-row scoring throughput with and without micro-batching.
+
+Run from the backend directory:
+    python -m benchmarks.bench_microbatch --threads 64 --window-ms 2 --seconds 3
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference.artifact import ModelStore  # noqa: E402
+from inference.batching import MicroBatcher  # noqa: E402
+from inference.service import predict_record  # noqa: E402
+
+RECORD = {
+    "gender": "Female", "Age": 50, "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+    "SkinThickness": 35, "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627,
+    "smoking_status": "Never", "physical_activity": "Low",
+}
+
+
+def run(bundle, batcher, threads, seconds):
+    """Return (requests per second, per-request latencies in ms)"""
+    stop = threading.Event()
+    latencies = [[] for _ in range(threads)]
+
+    def worker(slot):
+        record = dict(RECORD, Age=20 + slot % 50)
+        while not stop.is_set():
+            start = time.perf_counter()
+            predict_record(bundle, record, batcher=batcher)
+            latencies[slot].append((time.perf_counter() - start) * 1e3)
+
+    pool = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in pool:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in pool:
+        thread.join()
+
+    flat = np.concatenate([np.asarray(values) for values in latencies])
+    return len(flat) / seconds, flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-rows", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    bundle = ModelStore().get()
+    batcher = MicroBatcher(window=args.window_ms / 1000, max_rows=args.max_rows, timeout=5.0)
+
+    print(f"{'mode':>12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, active in (("direct", None), ("microbatch", batcher)):
+        throughput, latencies = run(bundle, active, args.threads, args.seconds)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"{name:>12} {throughput:>8.0f} {p50:>8.2f} {p99:>8.2f}")
+
+    stats = batcher.stats()
+    print(f"mean batch size {stats['mean_batch_size']:.1f}, mean queue wait {stats['mean_queue_wait_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# backend/benchmarks/bench_scorer.py
+"""Per-request scoring latency: predict + predict_proba vs a single RiskScorer pass.
+
+Run from the backend directory:
+    python -m benchmarks.bench_scorer --estimators 10 50 100 200
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference.encoder import FeatureEncoder  # noqa: E402
+from inference.scorer import RiskScorer  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "data", "diabetes_extended_ordered.csv")
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def time_per_call(fn, rows, repeat):
+    """Median wall time of fn(row) in microseconds over repeat passes of rows"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            fn(row)
+        samples.append((time.perf_counter() - start) / len(rows))
+    return float(np.median(samples)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estimators", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--rows", type=int, default=200, help="single-row requests per pass")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = pd.read_csv(DATA_PATH)
+    X_raw = df.drop("Outcome", axis=1)
+    encoder = FeatureEncoder.from_frame(X_raw)
+    X = encoder.encode_batch(X_raw.to_dict("records"))
+    y = df["Outcome"].to_numpy()
+    rows = [X[i:i + 1] for i in range(min(args.rows, len(X)))]
+
+    print(f"{'n_estimators':>12} {'before (us)':>12} {'after (us)':>12} {'speedup':>8}")
+    for n_estimators in args.estimators:
+        model = RandomForestClassifier(n_estimators=n_estimators, random_state=42).fit(X, y)
+        scorer = RiskScorer(model, encoder)
+
+        def before(row):
+            model.predict(row)
+            model.predict_proba(row)
+
+        before_us = time_per_call(before, rows, args.repeat)
+        after_us = time_per_call(scorer.score_matrix, rows, args.repeat)
+        print(f"{n_estimators:>12} {before_us:>12.1f} {after_us:>12.1f} {before_us / after_us:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# backend/benchmarks/bench_sessions.py
+"""Per-request session lookup cost with many active sessions.
+
+Fills the SQLite and in-memory session stores with --sessions live sessions
+(plus a share of expired ones), then times the per-request work: a store
+lookup for a known and an unknown id, and a full open_session/save_session
+round trip through Flask, next to the signed-cookie sessions it replaced.
+Finally times the bounded expiry sweep. Run from the backend directory:
+    python -m benchmarks.bench_sessions --sessions 100000 1000000
+"""
+import argparse
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.sessions import SecureCookieSessionInterface  # noqa: E402
+
+from models.migrations import SESSION_MIGRATIONS, migrate  # noqa: E402
+from models.session_store import UPSERT_SESSION, MemorySessionStore, SQLiteSessionStore  # noqa: E402
+from sessions import ServerSessionInterface  # noqa: E402
+
+
+def fill(store, count, expired_share, seed):
+    """Insert `count` live sessions and count * expired_share expired ones; returns the live ids"""
+    rng = random.Random(seed)
+    now = time.time()
+    data = ServerSessionInterface(store).serializer.dumps({"user_id": 1, "user_email": "bench@example.com"})
+    live = [secrets.token_urlsafe(32) for _ in range(count)]
+    rows = [(session_id, rng.randrange(1, count // 2 + 2), data, now + 3600) for session_id in live]
+    rows += [(secrets.token_urlsafe(32), None, data, now - rng.random() * 3600)
+             for _ in range(int(count * expired_share))]
+    if isinstance(store, SQLiteSessionStore):
+        with store.pool.connection() as conn:
+            with conn:
+                conn.executemany(UPSERT_SESSION, rows)
+    else:
+        for session_id, user_id, value, expires_at in rows:
+            store.save(session_id, value, expires_at, user_id)
+    return live
+
+
+def per_call(func, args, repeat):
+    """Mean microseconds per call, cycling through args"""
+    started = time.perf_counter()
+    for i in range(repeat):
+        func(args[i % len(args)])
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def request_round_trip(app, cookies, repeat):
+    """Mean microseconds to open and save the session of a read-only request"""
+    interface = app.session_interface
+    response = app.response_class()
+    environs = [{"HTTP_COOKIE": f"session={cookie}"} for cookie in cookies]
+    started = time.perf_counter()
+    for i in range(repeat):
+        with app.test_request_context(environ_base=environs[i % len(environs)]) as ctx:
+            session = interface.open_session(app, ctx.request)
+            interface.save_session(app, session, response)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def signed_cookies(app, count):
+    serializer = SecureCookieSessionInterface().get_signing_serializer(app)
+    return [serializer.dumps({"user_id": i, "user_email": "bench@example.com"}) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100000])
+    parser.add_argument("--expired-share", type=float, default=0.1,
+                        help="expired sessions added per live one, for the sweep")
+    parser.add_argument("--repeat", type=int, default=20000, help="timed lookups per measurement")
+    parser.add_argument("--sweep-batch", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "bench"
+    rng = random.Random(args.seed)
+
+    app.session_interface = SecureCookieSessionInterface()
+    cookies = signed_cookies(app, 1000)
+    print(f"signed cookie   open+save {request_round_trip(app, cookies, args.repeat):8.1f} us  "
+          f"(cookie {len(cookies[0])} bytes)")
+
+    with tempfile.TemporaryDirectory(prefix="synapsecare-sessions-") as directory:
+        run(app, directory, args, rng)
+
+
+def run(app, directory, args, rng):
+    print(f"{'store':>8} {'sessions':>9} {'fill s':>7} {'hit us':>7} {'miss us':>8} {'open+save us':>13} "
+          f"{'sweep batch ms':>15} {'swept':>7}")
+    for count in args.sessions:
+        for name in ("sqlite", "memory"):
+            if name == "sqlite":
+                path = os.path.join(directory, f"sessions-{count}.db")
+                migrate(path, SESSION_MIGRATIONS)
+                store = SQLiteSessionStore(path)
+            else:
+                store = MemorySessionStore()
+            started = time.perf_counter()
+            live = fill(store, count, args.expired_share, args.seed)
+            filled = time.perf_counter() - started
+
+            sample = rng.sample(live, min(len(live), 10000))
+            misses = [secrets.token_urlsafe(32) for _ in range(1000)]
+            per_call(store.get, sample, min(args.repeat, 2000))
+            hit = per_call(store.get, sample, args.repeat)
+            miss = per_call(store.get, misses, args.repeat)
+
+            app.session_interface = ServerSessionInterface(store, sweep_interval=3600)
+            round_trip = request_round_trip(app, sample, args.repeat)
+
+            started = time.perf_counter()
+            swept = store.sweep(args.sweep_batch, max_batches=1)
+            batch_ms = (time.perf_counter() - started) * 1e3
+            swept += store.sweep(args.sweep_batch)
+            print(f"{name:>8} {count:>9} {filled:>7.1f} {hit:>7.1f} {miss:>8.1f} {round_trip:>13.1f} "
+                  f"{batch_ms:>15.2f} {swept:>7}")
+
+
+if __name__ == "__main__":
+    main()
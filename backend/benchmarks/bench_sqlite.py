@@ -0,0 +1,86 @@
+# backend/benchmarks/bench_sqlite.py
+"""Concurrent UserModel read/write throughput: connect-per-call vs the pooled WAL layer.
+
+Threads stand in for a multi-threaded WSGI server's request workers. Run from
+the backend directory:
+    python -m benchmarks.bench_sqlite --threads 1 8 32 --seconds 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import ConnectionPool  # noqa: E402
+from models.migrations import USERS_MIGRATIONS, migrate  # noqa: E402
+from models.user import UserModel  # noqa: E402
+
+USERS = 200
+
+
+def seed(model):
+    # Skip PBKDF2 while seeding; only the query paths are measured
+    model.hash_password = lambda password: ("0" * 64, "0" * 64)
+    for i in range(USERS):
+        model.create_user("Bench", f"User{i}", f"user{i}@example.com", "", "password1")
+
+
+def run(model, threads, writers, seconds):
+    """Return (reads/s, writes/s) with `writers` of the threads issuing updates"""
+    counts = [0] * threads
+    stop = threading.Event()
+
+    def worker(slot):
+        write = slot < writers
+        i = slot
+        while not stop.is_set():
+            user_id = i % USERS + 1
+            if write:
+                model.update_user(user_id, phone=str(i))
+            else:
+                model.get_user_by_id(user_id)
+            counts[slot] += 1
+            i += threads
+
+    pool = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in pool:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in pool:
+        thread.join()
+
+    return sum(counts[writers:]) / seconds, sum(counts[:writers]) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--write-ratio", type=float, default=0.25, help="fraction of threads that write")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    configs = {
+        "connect-per-call": dict(size=0, wal=False),
+        "pooled WAL": dict(size=8, wal=True),
+    }
+
+    print(f"{'mode':>18} {'threads':>7} {'reads/s':>10} {'writes/s':>10}")
+    for name, options in configs.items():
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = os.path.join(directory, "bench.db")
+            migrate(db_path, USERS_MIGRATIONS)
+            model = UserModel(db_path, pool=ConnectionPool(db_path, **options))
+            seed(model)
+            for threads in args.threads:
+                writers = int(threads * args.write_ratio) if threads > 1 else 0
+                reads, writes = run(model, threads, writers, args.seconds)
+                print(f"{name:>18} {threads:>7} {reads:>10.0f} {writes:>10.0f}")
+            model.pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# backend/benchmarks/bench_startup.py
+"""Import time and memory of one process, and of serve.py with N workers, with and without preload.
+
+    import    fresh interpreters time `import asgi`, app.startup() (migrations and
+              model) and the first population index build, with the RSS after each
+    workers   serve.py --preload / --no-preload: seconds until every worker has
+              finished startup, total RSS and PSS (proportional set size, which
+              splits shared pages between the processes sharing them) after a
+              warm-up that touches /predict and /stats on every worker, and how
+              long a killed worker takes to be replaced and ready again
+
+Linux only (/proc). Run from the backend directory:
+    python -m benchmarks.bench_startup --workers 1 4 --repeat 5
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from serve import RESPAWN_BACKOFF  # noqa: E402
+
+PREDICT_PAYLOAD = json.dumps({
+    "gender": "Female", "Age": 50, "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+    "SkinThickness": 35, "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627,
+    "smoking_status": "Never", "physical_activity": "Low",
+})
+STATS_PATH = "/stats/percentiles?Glucose=148&BMI=33.6&gender=Female&age=50"
+READY_LINE = "Application startup complete"
+
+# Timed in a fresh interpreter so nothing is already imported or cached
+IMPORT_PROBE = '''
+import json, os, sys, time
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+started = time.perf_counter()
+import asgi
+imported = time.perf_counter()
+heavy = sorted(name for name in ("pandas", "sklearn", "scipy") if name in sys.modules)
+import_rss = rss_mb()
+asgi.api.startup()
+ready = time.perf_counter()
+startup_rss = rss_mb()
+asgi.api.population_stats.get()
+print(json.dumps({"import_s": imported - started, "startup_s": ready - imported,
+                  "population_s": time.perf_counter() - ready, "import_rss": import_rss,
+                  "startup_rss": startup_rss, "population_rss": rss_mb(), "heavy": heavy}))
+'''
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def memory_mb(pid):
+    """(RSS, PSS) of one process in MB from /proc/<pid>/smaps_rollup"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0]) / 1024
+    return values["Rss"], values["Pss"]
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def bench_import(env, repeat):
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=env, check=True,
+                                capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    print(f"import (median of {repeat} fresh interpreters)")
+    print(f"{'step':>22} {'seconds':>8} {'rss MB':>7}")
+    for step, seconds, rss in (("import asgi", "import_s", "import_rss"),
+                               ("+ startup()", "startup_s", "startup_rss"),
+                               ("+ population index", "population_s", "population_rss")):
+        print(f"{step:>22} {np.median([run[seconds] for run in runs]):>8.3f} "
+              f"{np.median([run[rss] for run in runs]):>7.1f}")
+    print(f"heavy modules loaded by the import: {', '.join(runs[0]['heavy']) or 'none'}\n")
+
+
+class Server:
+    """serve.py in a subprocess, counting worker startups from its log"""
+
+    def __init__(self, env, workers, preload):
+        self.port = free_port()
+        self.ready = queue.Queue()
+        self.started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(self.port), "--workers", str(workers),
+             "--preload" if preload else "--no-preload"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        threading.Thread(target=self._read_log, daemon=True).start()
+
+    def _read_log(self):
+        for line in self.process.stderr:
+            if READY_LINE in line:
+                self.ready.put(time.perf_counter())
+
+    def wait_ready(self, count, timeout=120):
+        """perf_counter time at which the count-th next worker finished startup"""
+        for _ in range(count):
+            at = self.ready.get(timeout=timeout)
+        return at
+
+    def request(self, method, path, body=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+        try:
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    def warm_up(self, requests, concurrency):
+        """Spread /predict and /stats requests over the workers on separate connections"""
+        def one(i):
+            if i % 2:
+                return self.request("GET", STATS_PATH)
+            return self.request("POST", "/predict", PREDICT_PAYLOAD)
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            statuses = list(pool.map(one, range(requests)))
+        return sum(status != 200 for status in statuses)
+
+    def memory(self):
+        pids = [self.process.pid] + children(self.process.pid)
+        usage = np.array([memory_mb(pid) for pid in pids])
+        return usage.sum(axis=0)
+
+    def respawn_seconds(self):
+        # Workers that die younger than this are respawned after a delay, which is not what is measured here
+        time.sleep(RESPAWN_BACKOFF)
+        victim = children(self.process.pid)[0]
+        killed = time.perf_counter()
+        os.kill(victim, signal.SIGKILL)
+        return self.wait_ready(1) - killed
+
+    def stop(self):
+        self.process.send_signal(signal.SIGTERM)
+        self.process.wait(30)
+
+
+def bench_workers(env, worker_counts, requests):
+    print("workers (serve.py)")
+    print(f"{'mode':>10} {'workers':>7} {'ready s':>8} {'rss MB':>8} {'pss MB':>8} {'respawn s':>9} {'errors':>6}")
+    for workers in worker_counts:
+        for preload in (False, True):
+            server = Server(env, workers, preload)
+            try:
+                ready = server.wait_ready(workers) - server.started
+                errors = server.warm_up(requests * workers, concurrency=4 * workers)
+                rss, pss = server.memory()
+                respawn = server.respawn_seconds()
+            finally:
+                server.stop()
+            mode = "preload" if preload else "lazy"
+            print(f"{mode:>10} {workers:>7} {ready:>8.2f} {rss:>8.1f} {pss:>8.1f} {respawn:>9.3f} {errors:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters timed for the import section")
+    parser.add_argument("--requests", type=int, default=50, help="warm-up requests per worker")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="synapsecare-startup-") as directory:
+        # A scratch users database; the first startup applies the migrations
+        env = dict(os.environ, USERS_DB_PATH=os.path.join(directory, "users.db"))
+        bench_import(env, args.repeat)
+        bench_workers(env, args.workers, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+# backend/benchmarks/harness.py
+"""Reproducible load benchmark for the prediction and auth endpoints.
+
+Every scenario runs in two modes: sequentially through the Flask test client
+(in-process latency without the network stack) and through an in-process
+threaded HTTP server driven by concurrent keep-alive clients. Prediction
+payloads are sampled from data/diabetes_extended_ordered.csv with a fixed
+seed, and auth scenarios run against a throwaway users database.
+
+Throughput, p50/p95/p99 latency, error counts and RSS are printed and saved as
+JSON; --compare prints the change against an earlier results file. Run from
+the backend directory:
+
+    python -m benchmarks.harness --seconds 5 --clients 8 --output before.json
+    python -m benchmarks.harness --seconds 5 --clients 8 --compare before.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DATA_PATH = os.path.join(BACKEND_DIR, "data", "diabetes_extended_ordered.csv")
+SCENARIOS = ("predict", "predict_batch", "register", "login", "check_auth")
+MODES = ("client", "http")
+PASSWORD = "benchmark123"
+
+
+def load_payloads(seed, batch_size):
+    """Shuffled raw records from the training CSV, as the frontend would send them"""
+    records = pd.read_csv(DATA_PATH).drop("Outcome", axis=1).sample(frac=1.0, random_state=seed)
+    records = records.to_dict("records")
+    predict = [json.dumps(record).encode() for record in records]
+    batches = [json.dumps(records[i:i + batch_size]).encode() for i in range(0, len(records), batch_size)]
+    return predict, batches
+
+
+def rss_mb():
+    """Current resident set size, falling back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return max_rss_mb()
+
+
+def max_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+class ClientSession:
+    """One virtual user on the Flask test client; cookies persist across requests"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, data=body, content_type="application/json")
+        response.close()
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class HTTPSession:
+    """One virtual user on a keep-alive HTTP connection with its own session cookie"""
+
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        self.cookie = None
+
+    def request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"}
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        response.read()
+        cookie = response.getheader("Set-Cookie")
+        if cookie:
+            self.cookie = cookie.split(";", 1)[0]
+        return response.status
+
+    def close(self):
+        self.connection.close()
+
+
+def serve(app):
+    """Threaded HTTP/1.1 server on a free port; returns (port, shutdown)"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port, server.shutdown
+
+
+class Workload:
+    """Builds the request sequence of each scenario for one virtual user"""
+
+    def __init__(self, user_model, predict_payloads, batch_payloads, run_id):
+        self.user_model = user_model
+        self.predict_payloads = predict_payloads
+        self.batch_payloads = batch_payloads
+        self.run_id = run_id
+
+    def login_body(self, slot):
+        return json.dumps({"email": f"bench-{self.run_id}-{slot}@example.com", "password": PASSWORD}).encode()
+
+    def ensure_user(self, slot):
+        self.user_model.create_user("Bench", "User", f"bench-{self.run_id}-{slot}@example.com", "", PASSWORD)
+
+    def setup(self, scenario, session, slot):
+        if scenario in ("login", "check_auth"):
+            self.ensure_user(slot)
+        if scenario == "check_auth":
+            session.request("POST", "/auth/login", self.login_body(slot))
+
+    def next_request(self, scenario, slot, n):
+        """(method, path, body) of the n-th request of a virtual user"""
+        if scenario == "predict":
+            payload = self.predict_payloads[(slot * 7919 + n) % len(self.predict_payloads)]
+            return "POST", "/predict", payload
+        if scenario == "predict_batch":
+            return "POST", "/predict/batch", self.batch_payloads[(slot + n) % len(self.batch_payloads)]
+        if scenario == "register":
+            email = f"new-{self.run_id}-{slot}-{n}@example.com"
+            return "POST", "/auth/register", json.dumps({
+                "firstName": "Bench", "lastName": "User", "email": email, "phone": "",
+                "password": PASSWORD, "confirmPassword": PASSWORD, "agreeToTerms": True,
+            }).encode()
+        if scenario == "login":
+            return "POST", "/auth/login", self.login_body(slot)
+        if scenario == "check_auth":
+            return "GET", "/auth/check-auth", None
+        raise ValueError(f"Unknown scenario {scenario!r}")
+
+
+def drive(workload, scenario, sessions, seconds, warmup):
+    """Run every session in its own thread for `seconds`; returns latencies (ms) and error count"""
+    latencies = [[] for _ in sessions]
+    errors = [0] * len(sessions)
+    ready = threading.Barrier(len(sessions) + 1)
+    stop = threading.Event()
+
+    def user(slot, session):
+        workload.setup(scenario, session, slot)
+        for n in range(warmup):
+            session.request(*workload.next_request(scenario, slot, -1 - n))
+        ready.wait()
+        n = 0
+        while not stop.is_set():
+            request = workload.next_request(scenario, slot, n)
+            started = time.perf_counter()
+            status = session.request(*request)
+            latencies[slot].append((time.perf_counter() - started) * 1e3)
+            if status >= 400:
+                errors[slot] += 1
+            n += 1
+
+    threads = [threading.Thread(target=user, args=(slot, session)) for slot, session in enumerate(sessions)]
+    for thread in threads:
+        thread.start()
+    # Start the clock once every user has logged in and warmed up
+    ready.wait()
+    started = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return np.concatenate([np.asarray(values, dtype=np.float64) for values in latencies]), sum(errors), elapsed
+
+
+def summarize(scenario, mode, clients, latencies, errors, elapsed):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (float("nan"),) * 3
+    return {
+        "scenario": scenario,
+        "mode": mode,
+        "clients": clients,
+        "requests": int(len(latencies)),
+        "errors": int(errors),
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "rss_mb": round(rss_mb(), 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(row["scenario"], row["mode"]): row for row in json.load(f)["results"]}
+    print(f"\nChange against {baseline_path}")
+    print(f"{'scenario':>14} {'mode':>6} {'req/s':>9} {'p50':>9} {'p99':>9}")
+    for row in results:
+        before = baseline.get((row["scenario"], row["mode"]))
+        if before is None:
+            continue
+        change = {key: (row[key] / before[key] - 1) * 100 if before[key] else float("nan")
+                  for key in ("throughput", "p50_ms", "p99_ms")}
+        print(f"{row['scenario']:>14} {row['mode']:>6} {change['throughput']:>+8.1f}% {change['p50_ms']:>+8.1f}% "
+              f"{change['p99_ms']:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--seconds", type=float, default=3.0, help="measured duration of each scenario")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent HTTP clients")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per client")
+    parser.add_argument("--batch-size", type=int, default=100, help="records per /predict/batch request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prediction-cache", action="store_true",
+                        help="keep the /predict result cache on (off by default so scoring is measured)")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    # Configure the app before importing it: a scratch users database and no result cache
+    directory = tempfile.mkdtemp(prefix="synapsecare-bench-")
+    os.environ["USERS_DB_PATH"] = os.path.join(directory, "users.db")
+    if not args.prediction_cache:
+        os.environ["PREDICTION_CACHE_SIZE"] = "0"
+    # Repeated logins from one address would otherwise be measured as 429s
+    os.environ["LOGIN_IP_RATE"] = os.environ["LOGIN_EMAIL_RATE"] = "1000000000/1"
+
+    import app as api
+    from routes.auth import user_model
+
+    api.startup()
+    bundle = api.model_store.get()
+    predict_payloads, batch_payloads = load_payloads(args.seed, args.batch_size)
+    port, shutdown = serve(api.app) if "http" in args.modes else (None, None)
+    run_id = int(time.time())
+
+    results = []
+    print(f"{'scenario':>14} {'mode':>6} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>6} {'rss MB':>7}")
+    for scenario in args.scenarios:
+        for mode in args.modes:
+            # Fresh users per run so register/login never collide with a previous mode
+            workload = Workload(user_model, predict_payloads, batch_payloads, f"{run_id}-{mode}")
+            if mode == "client":
+                sessions = [ClientSession(api.app)]
+            else:
+                sessions = [HTTPSession(port) for _ in range(args.clients)]
+            latencies, errors, elapsed = drive(workload, scenario, sessions, args.seconds, args.warmup)
+            for session in sessions:
+                session.close()
+            row = summarize(scenario, mode, len(sessions), latencies, errors, elapsed)
+            results.append(row)
+            print(f"{scenario:>14} {mode:>6} {row['clients']:>7} {row['throughput']:>9.1f} {row['p50_ms']:>8.2f} "
+                  f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>6} {row['rss_mb']:>7.1f}")
+    if shutdown:
+        shutdown()
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "model_version": bundle.version if bundle else None,
+            "max_rss_mb": round(max_rss_mb(), 1),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(BACKEND_DIR, "benchmarks", "results",
+                                         f"{commit or 'local'}-{datetime.now():%Y%m%d%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
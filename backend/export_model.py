@@ -0,0 +1,70 @@
+# backend/export_model.py
+"""Compile model.pkl into a versioned, memory-mappable model artifact.
+
+    python export_model.py [--model model.pkl] [--artifacts artifacts] [--no-publish]
+"""
+import argparse
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from inference.artifact import ARTIFACT_DIR, BACKEND_DIR, LEGACY_MODEL_PATH, hash_file, write_artifact
+from inference.encoder import FeatureEncoder
+from inference.forest import CompiledForest
+
+DATA_PATH = os.path.join(BACKEND_DIR, "data", "diabetes_extended_ordered.csv")
+
+
+def load_training_matrix(encoder, data_path=DATA_PATH, max_rows=None):
+    """Encode the training CSV (or its first max_rows rows) the same way the API does"""
+    df = pd.read_csv(data_path, nrows=max_rows)
+    return encoder.encode_batch(df.drop("Outcome", axis=1).to_dict("records"))
+
+
+def verify_parity(compiled, model, X, tolerance=1e-9):
+    """Check the compiled forest reproduces predict_proba, returning the max difference"""
+    difference = float(np.abs(compiled.predict_proba(X) - model.predict_proba(X)).max())
+    if difference > tolerance:
+        raise AssertionError(f"Compiled forest differs from predict_proba by {difference}")
+    return difference
+
+
+def export(model, feature_names, categories, root=ARTIFACT_DIR, data_path=DATA_PATH, verify=True,
+           publish=True, metadata=None, verify_rows=None):
+    """Compile a fitted forest, check it against the training data and write an artifact version"""
+    if not categories:
+        # Older pickles only carry feature names; recover the full levels from the data
+        categories = FeatureEncoder.from_frame(pd.read_csv(data_path).drop("Outcome", axis=1)).categories
+    compiled = CompiledForest.from_sklearn(model, feature_names, categories)
+
+    if verify:
+        X = load_training_matrix(FeatureEncoder(feature_names, categories), data_path, verify_rows)
+        difference = verify_parity(compiled, model, X)
+        print(f"Parity check passed on {len(X)} rows (max difference {difference:.2e})")
+
+    version = write_artifact(compiled, root, training_hash=hash_file(data_path), metadata=metadata,
+                             publish=publish)
+    return compiled, version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile model.pkl into a model artifact")
+    parser.add_argument("--model", default=LEGACY_MODEL_PATH)
+    parser.add_argument("--artifacts", default=ARTIFACT_DIR, help="artifact root directory")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--no-verify", action="store_true", help="skip the predict_proba parity check")
+    parser.add_argument("--no-publish", action="store_true", help="write the version without making it current")
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f:
+        model, feature_names, *extra = pickle.load(f)
+
+    compiled, version = export(model, feature_names, extra[0] if extra else None, args.artifacts,
+                               data_path=args.data, verify=not args.no_verify, publish=not args.no_publish)
+    print(f"✅ Compiled {compiled.n_estimators} trees ({len(compiled.feature)} nodes) as artifact {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+from inference.encoder import FeatureEncoder
+from inference.explain import PathExplainer
+from inference.forest import CompiledForest
+from inference.recommendations import RecommendationEngine
+from inference.scorer import RiskScorer
+from schemas import prediction_schema
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT_DIR = os.environ.get("MODEL_ARTIFACT_DIR", os.path.join(BACKEND_DIR, "artifacts"))
+LEGACY_MODEL_PATH = os.path.join(BACKEND_DIR, "model.pkl")
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+# Text file naming the version directory the API serves
+CURRENT_NAME = "CURRENT"
+# Version reported for a bundle loaded from LEGACY_MODEL_PATH
+LEGACY_VERSION = "legacy-pickle"
+
+ModelBundle = namedtuple("ModelBundle", ["version", "manifest", "model", "encoder", "scorer", "recommender", "schema",
+                                         "explainer"])
+
+
+def hash_file(path):
+    """SHA-256 of a file, used to tie an artifact to its training data"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_artifact(compiled, root=ARTIFACT_DIR, training_hash=None, metadata=None, publish=True):
+    """Write a compiled forest as a new version directory and optionally publish it
+
+    Arrays are stored as individual .npy files so they can be memory-mapped.
+    The directory is assembled under a temporary name and renamed into place,
+    so readers never see a partial version.
+    """
+    os.makedirs(root, exist_ok=True)
+    created_at = datetime.now(timezone.utc)
+    version = created_at.strftime("v%Y%m%d%H%M%S")
+    if training_hash:
+        version += f"-{training_hash[:8]}"
+
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=root)
+    try:
+        os.chmod(staging, 0o755)
+        arrays = {}
+        for name, array in compiled.arrays().items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+            arrays[name] = {"file": f"{name}.npy", "dtype": str(array.dtype), "shape": list(array.shape)}
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "version": version,
+            "created_at": created_at.isoformat(),
+            "model_type": "compiled_random_forest",
+            "n_estimators": compiled.n_estimators,
+            "max_depth": compiled.max_depth,
+            "feature_names": compiled.feature_names,
+            "categories": compiled.categories,
+            "training_hash": training_hash,
+            "arrays": arrays,
+        }
+        if metadata:
+            manifest.update(metadata)
+        with open(os.path.join(staging, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        os.rename(staging, os.path.join(root, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if publish:
+        publish_version(version, root)
+    return version
+
+
+def publish_version(version, root=ARTIFACT_DIR):
+    """Atomically point CURRENT at a version directory"""
+    if not os.path.isfile(os.path.join(root, version, MANIFEST_NAME)):
+        raise FileNotFoundError(f"No artifact manifest for version {version}")
+    fd, path = tempfile.mkstemp(prefix=".current-", dir=root)
+    with os.fdopen(fd, "w") as f:
+        f.write(version + "\n")
+    os.chmod(path, 0o644)
+    os.replace(path, os.path.join(root, CURRENT_NAME))
+
+
+def current_version(root=ARTIFACT_DIR):
+    """Version named by CURRENT, or the newest version directory"""
+    try:
+        with open(os.path.join(root, CURRENT_NAME)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        pass
+    try:
+        versions = [name for name in os.listdir(root)
+                    if os.path.isfile(os.path.join(root, name, MANIFEST_NAME))]
+    except FileNotFoundError:
+        return None
+    return max(versions) if versions else None
+
+
+def load_artifact(version, root=ARTIFACT_DIR, mmap=True):
+    """Load a version directory, memory-mapping its arrays by default"""
+    directory = os.path.join(root, version)
+    with open(os.path.join(directory, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {manifest.get('format_version')!r}")
+
+    arrays = {
+        name: np.load(os.path.join(directory, spec["file"]), mmap_mode="r" if mmap else None, allow_pickle=False)
+        for name, spec in manifest["arrays"].items()
+    }
+    model = CompiledForest(
+        max_depth=manifest["max_depth"],
+        feature_names=manifest["feature_names"],
+        categories=manifest["categories"],
+        **arrays,
+    )
+    return _bundle(version, manifest, model)
+
+
+@functools.lru_cache(maxsize=64)
+def load_manifest(version, root=ARTIFACT_DIR):
+    """Manifest of a version directory, or None if it is not on disk"""
+    try:
+        with open(os.path.join(root, version, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_legacy_pickle(path=LEGACY_MODEL_PATH):
+    """Load the sklearn pickle written by older train_model.py runs"""
+    with open(path, "rb") as f:
+        model, feature_names, *extra = pickle.load(f)
+    manifest = {"version": LEGACY_VERSION, "feature_names": feature_names,
+                "categories": extra[0] if extra else None}
+    return _bundle(LEGACY_VERSION, manifest, model)
+
+
+def _bundle(version, manifest, model):
+    encoder = FeatureEncoder(manifest["feature_names"], manifest["categories"])
+    scorer = RiskScorer(model, encoder)
+    # Path contribution tables are built here so /predict/explain never pays for them
+    return ModelBundle(version, manifest, model, encoder, scorer, RecommendationEngine(encoder.feature_names),
+                       prediction_schema(encoder), PathExplainer.from_model(model, encoder, scorer.positive_index))
+
+
+class ModelStore:
+    """Lazily loaded, hot-swappable model shared by the prediction routes.
+
+    Nothing is read until the first ``get()``. Afterwards CURRENT is checked at
+    most every ``reload_interval`` seconds; when it names a new version, that
+    version is loaded and swapped in with a single reference assignment, so
+    in-flight requests finish on the bundle they already hold. Arrays are
+    memory-mapped, so pre-forked workers share the same page-cache pages.
+    """
+
+    def __init__(self, root=ARTIFACT_DIR, legacy_path=LEGACY_MODEL_PATH, reload_interval=5.0):
+        self.root = root
+        self.legacy_path = legacy_path
+        self.reload_interval = reload_interval
+        self.listeners = []
+        self._bundle = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._bundle is not None
+
+    def on_reload(self, callback):
+        """Register callback(bundle) to run after a new version is swapped in"""
+        self.listeners.append(callback)
+        return callback
+
+    def get(self):
+        """Return the current ModelBundle, or None if no model is available"""
+        bundle = self._bundle
+        if bundle is not None and time.monotonic() - self._checked_at < self.reload_interval:
+            return bundle
+        return self._refresh()
+
+    def reload(self):
+        """Force a check for a new version"""
+        self._checked_at = 0.0
+        return self._refresh()
+
+    def _refresh(self):
+        with self._lock:
+            bundle = self._bundle
+            # Another thread may have refreshed while we waited for the lock
+            if bundle is not None and time.monotonic() - self._checked_at < self.reload_interval:
+                return bundle
+            self._checked_at = time.monotonic()
+
+            version = current_version(self.root)
+            if bundle is not None and bundle.version == (version or bundle.version):
+                return bundle
+
+            try:
+                if version is not None:
+                    new_bundle = load_artifact(version, self.root)
+                elif os.path.exists(self.legacy_path):
+                    new_bundle = load_legacy_pickle(self.legacy_path)
+                else:
+                    print("Error: no model artifact or model.pkl found!")
+                    return bundle
+            except (OSError, ValueError, KeyError) as e:
+                # Keep serving the previous version if the new one is unreadable
+                print(f"Error loading model version {version}: {e}")
+                return bundle
+
+            self._bundle = new_bundle
+            print(f"Model {new_bundle.version} loaded successfully!")
+
+        for callback in self.listeners:
+            callback(new_bundle)
+        return new_bundle
@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, TimeoutError
+
+import numpy as np
+
+
+class BatchTimeout(Exception):
+    """Raised when a queued row is not scored within the request timeout"""
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row scoring calls into one forest pass.
+
+    Request threads enqueue an encoded row and wait on a future. A single
+    scheduler thread takes the first waiting row, keeps collecting for up to
+    ``window`` seconds or ``max_rows`` rows, scores them as one matrix per
+    model bundle and resolves every future. Results are identical to scoring
+    each row on its own.
+    """
+
+    def __init__(self, window=0.002, max_rows=64, timeout=1.0):
+        self.window = window
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.rows = 0
+        self.timeouts = 0
+        self.batch_sizes = Counter()
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def _ensure_started(self):
+        # Started lazily so pre-fork servers get a scheduler thread per worker
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="microbatch", daemon=True)
+                    self._thread.start()
+
+    def submit(self, bundle, row):
+        """Queue one encoded row, returning a Future of (prediction, risk probability)"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((bundle, row, future, time.perf_counter()))
+        return future
+
+    def score(self, bundle, row):
+        """Score one encoded row through the next batch, waiting up to the timeout"""
+        future = self.submit(bundle, row)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise BatchTimeout("Prediction timed out waiting for the scoring queue")
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            # Skip rows whose callers already gave up
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            by_bundle = {}
+            for item in batch:
+                by_bundle.setdefault(id(item[0]), []).append(item)
+
+            for items in by_bundle.values():
+                bundle = items[0][0]
+                try:
+                    predictions, probabilities = bundle.scorer.score_matrix(np.vstack([item[1] for item in items]))
+                except Exception as e:
+                    for item in items:
+                        item[2].set_exception(e)
+                    continue
+                for i, item in enumerate(items):
+                    item[2].set_result((int(predictions[i]), float(probabilities[i])))
+
+            waits = [started - item[3] for item in batch]
+            with self._lock:
+                self.batches += 1
+                self.rows += len(batch)
+                self.batch_sizes[len(batch)] += 1
+                self.queue_wait_total += sum(waits)
+                self.queue_wait_max = max(self.queue_wait_max, max(waits))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "window_ms": self.window * 1e3,
+                "max_rows": self.max_rows,
+                "batches": self.batches,
+                "rows": self.rows,
+                "timeouts": self.timeouts,
+                "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "mean_queue_wait_ms": self.queue_wait_total / self.rows * 1e3 if self.rows else 0.0,
+                "max_queue_wait_ms": self.queue_wait_max * 1e3,
+            }
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def score_row(bundle, row):
+    return bundle.scorer.score_row(row)
+
+
+class PredictionCache:
+    """Bounded LRU cache with a TTL for single-record prediction results.
+
+    Keys hash the encoded feature vector together with the model version, so
+    forms that differ only in spelling or key order (e.g. "never" vs "Never")
+    share an entry, and results from an older model are never served.
+    """
+
+    def __init__(self, maxsize=4096, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    @staticmethod
+    def make_key(row, version):
+        """Canonical hash of an encoded feature row and model version"""
+        digest = hashlib.blake2b(row.tobytes(), digest_size=16)
+        digest.update(str(version).encode("utf-8"))
+        return digest.digest()
+
+    def get(self, key):
+        """Return the cached value, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def score(self, bundle, row, score=None):
+        """Score an encoded row, reusing cached results
+
+        ``score(bundle, row)`` computes misses; by default the bundle's scorer.
+        """
+        score = score or score_row
+        if not self.enabled:
+            return score(bundle, row)
+        key = self.make_key(row, bundle.version)
+        result = self.get(key)
+        if result is None:
+            result = score(bundle, row)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,113 @@
+import numpy as np
+
+# Raw categorical columns in data/diabetes_extended_ordered.csv
+CATEGORICAL_COLUMNS = ("gender", "smoking_status", "physical_activity")
+
+
+class FeatureEncoder:
+    """Encode raw JSON records into model feature rows.
+
+    Reproduces ``pd.get_dummies(X, drop_first=True)`` from train_model.py
+    without building a DataFrame: the column plan is compiled once and each
+    record is written straight into a NumPy row.
+    """
+
+    def __init__(self, feature_names, categories=None):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.categories = {}
+        # Levels inferred from dummy column names lack the level drop_first dropped
+        self.baselines_known = bool(categories)
+
+        index = {name: i for i, name in enumerate(self.feature_names)}
+        claimed = set()
+        self._categorical = []
+
+        for column, levels in (categories or self._infer_categories()).items():
+            lookup = {}
+            for level in levels:
+                dummy = f"{column}_{level}"
+                position = index.get(dummy)
+                # The first level is dropped by drop_first=True and encodes as all zeros
+                lookup[str(level).casefold()] = position
+                if position is not None:
+                    claimed.add(dummy)
+            self.categories[column] = list(levels)
+            self._categorical.append((column, lookup))
+
+        self._numeric = [(name, i) for i, name in enumerate(self.feature_names) if name not in claimed]
+
+    def _infer_categories(self):
+        """Recover categorical levels from dummy column names when none were saved"""
+        categories = {}
+        for column in CATEGORICAL_COLUMNS:
+            prefix = f"{column}_"
+            categories[column] = [name[len(prefix):] for name in self.feature_names if name.startswith(prefix)]
+        return {column: levels for column, levels in categories.items() if levels}
+
+    @classmethod
+    def from_frame(cls, X):
+        """Build an encoder from the raw training features"""
+        categories = {}
+        for column in X.select_dtypes(exclude="number").columns:
+            # get_dummies orders levels the same way before dropping the first
+            categories[column] = sorted(X[column].dropna().astype(str).unique().tolist())
+        numeric = [column for column in X.columns if column not in categories]
+        feature_names = numeric + [
+            f"{column}_{level}" for column, levels in categories.items() for level in levels[1:]
+        ]
+        return cls(feature_names, categories)
+
+    def encode(self, record, out=None):
+        """Encode a single record into a 1-D float row"""
+        if not isinstance(record, dict):
+            raise ValueError("Record must be a JSON object")
+
+        row = np.zeros(self.n_features, dtype=np.float64) if out is None else out
+        if out is not None:
+            row.fill(0.0)
+
+        for name, i in self._numeric:
+            value = record.get(name)
+            if value is None or value == "":
+                continue
+            try:
+                row[i] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid numeric value for '{name}': {value!r}")
+
+        for column, lookup in self._categorical:
+            value = record.get(column)
+            if value is None:
+                continue
+            # Unseen levels fall back to the dropped base level, matching get_dummies
+            position = lookup.get(str(value).casefold())
+            if position is not None:
+                row[position] = 1.0
+
+        return row
+
+    def encode_feature(self, name, values):
+        """(columns, block): the encoded columns of one raw field and their values for each of values"""
+        for column, lookup in self._categorical:
+            if column == name:
+                columns = sorted({position for position in lookup.values() if position is not None})
+                slot = {position: k for k, position in enumerate(columns)}
+                block = np.zeros((len(values), len(columns)), dtype=np.float64)
+                for r, value in enumerate(values):
+                    position = lookup.get(str(value).casefold())
+                    if position is not None:
+                        block[r, slot[position]] = 1.0
+                return columns, block
+        for column, i in self._numeric:
+            if column == name:
+                return [i], np.asarray(values, dtype=np.float64).reshape(-1, 1)
+        raise ValueError(f"Unknown feature '{name}'")
+
+    def encode_batch(self, records, out=None):
+        """Encode a sequence of records into a 2-D float matrix"""
+        if out is None:
+            out = np.zeros((len(records), self.n_features), dtype=np.float64)
+        for i, record in enumerate(records):
+            self.encode(record, out[i])
+        return out
@@ -0,0 +1,80 @@
+import numpy as np
+
+from inference.forest import CompiledForest
+
+
+class PathExplainer:
+    """Per-feature contributions to the risk probability by tree path decomposition.
+
+    Walking a tree from the root to a leaf, every split moves the positive
+    class fraction from the parent's value to the child's; that change is
+    credited to the feature the parent split on. Summed along the path and
+    averaged over the trees, the contributions plus the forest's mean root
+    value (``base_value``) add up exactly to the predicted probability.
+
+    The running sums are precomputed once per model for every node, so
+    explaining a batch is the forest's usual ``apply`` plus one gather of
+    the reached leaves' rows of ``node_contributions``.
+    """
+
+    def __init__(self, forest, positive_index, groups):
+        self.forest = forest
+        self.positive_index = positive_index
+        # (output name, encoded column indices); one-hot columns fold back into their raw field
+        self.groups = groups
+        self.group_names = [name for name, _ in groups]
+        self.grouping = np.zeros((forest.n_features_in_, len(groups)))
+        for g, (_, columns) in enumerate(groups):
+            self.grouping[columns, g] = 1.0
+
+        positive = np.ascontiguousarray(forest.value[:, positive_index])
+        self.base_value = float(positive[forest.roots].mean())
+        self.node_contributions = self._path_table(forest, positive)
+
+    @classmethod
+    def from_model(cls, model, encoder, positive_index):
+        """Explainer for a compiled forest, or a RandomForestClassifier compiled on the fly"""
+        if not isinstance(model, CompiledForest):
+            model = CompiledForest.from_sklearn(model, encoder.feature_names, encoder.categories)
+        index = {name: i for i, name in enumerate(encoder.feature_names)}
+        claimed = set()
+        groups = []
+        for column, levels in encoder.categories.items():
+            columns = [index[f"{column}_{level}"] for level in levels if f"{column}_{level}" in index]
+            claimed.update(columns)
+            groups.append((column, columns))
+        numeric = [(name, [i]) for i, name in enumerate(encoder.feature_names) if i not in claimed]
+        return cls(model, positive_index, numeric + groups)
+
+    @staticmethod
+    def _path_table(forest, positive):
+        """Sum of the split contributions from the root down to every node, shape (n_nodes, n_features)"""
+        table = np.zeros((len(forest.feature), forest.n_features_in_))
+        # Right and left child of every node; leaves point back to themselves
+        children = forest.children.reshape(-1, 2)
+        frontier = forest.roots
+        # One level per step, so each row is filled after its parent's
+        for _ in range(forest.max_depth):
+            next_frontier = []
+            for side in (0, 1):
+                child = children[frontier, side]
+                internal = child != frontier
+                parent, child = frontier[internal], child[internal]
+                table[child] = table[parent]
+                table[child, forest.feature[parent]] += positive[child] - positive[parent]
+                next_frontier.append(child)
+            frontier = np.concatenate(next_frontier)
+            if not len(frontier):
+                break
+        return table
+
+    def explain(self, X):
+        """Return (class probabilities, per-column contributions) from one pass over the trees"""
+        leaves = self.forest.apply(X)
+        probabilities = self.forest.value[leaves].mean(axis=1)
+        contributions = self.node_contributions[leaves].mean(axis=1)
+        return probabilities, contributions
+
+    def grouped(self, contributions):
+        """Fold encoded-column contributions into one per raw input field"""
+        return contributions @ self.grouping
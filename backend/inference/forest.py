@@ -0,0 +1,127 @@
+import numpy as np
+
+
+class CompiledForest:
+    """A fitted random forest flattened into NumPy node arrays.
+
+    Every tree is laid out back to back in the same arrays, and leaves point
+    to themselves, so a batch can be pushed through all trees at once with a
+    fixed number of vectorized steps (the depth of the deepest tree).
+    ``predict_proba`` matches sklearn's ``RandomForestClassifier``.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes,
+                 max_depth, feature_names=None, categories=None):
+        self.feature = feature
+        self.threshold = threshold
+        # Interleaved (right, left) pairs, indexed by 2 * node + split test
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.feature_names = feature_names
+        self.categories = categories
+        self.n_estimators = len(roots)
+        self.n_features_in_ = len(feature_names) if feature_names else None
+        self._split_thresholds = {}
+
+    @classmethod
+    def from_sklearn(cls, model, feature_names=None, categories=None):
+        """Flatten a fitted RandomForestClassifier"""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(offset, offset + n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            # Leaves loop back to themselves so extra steps are no-ops
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            left = np.where(is_leaf, nodes, tree.children_left + offset)
+            right = np.where(is_leaf, nodes, tree.children_right + offset)
+            children.append(np.stack([right, left], axis=1).ravel().astype(np.int32))
+
+            # Per-tree class fractions, as averaged by RandomForestClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            values.append(value / np.where(totals == 0, 1.0, totals))
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=max_depth,
+            feature_names=list(feature_names) if feature_names is not None else None,
+            categories=categories,
+        )
+
+    def arrays(self):
+        """Node arrays to persist, keyed by the constructor argument name"""
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children": self.children,
+            "value": self.value,
+            "roots": self.roots,
+            "classes": self.classes_,
+        }
+
+    def apply(self, X, trees=None):
+        """Return the leaf index reached in every tree (or only the given trees), shape (n_rows, n_trees)"""
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        row_offsets = np.arange(0, n_rows * n_features, n_features, dtype=np.intp)[:, None]
+        roots = self.roots if trees is None else self.roots[trees]
+        node = np.broadcast_to(roots, (n_rows, len(roots)))
+        X_flat = X.ravel()
+
+        for _ in range(self.max_depth):
+            go_left = np.take(X_flat, row_offsets + np.take(self.feature, node)) <= np.take(self.threshold, node)
+            node = np.take(self.children, 2 * node + go_left)
+
+        return node
+
+    def path_features(self, row):
+        """(tested, leaves) for one row: which features each tree tests on its path, shape
+        (n_trees, n_features), and the leaf each tree reaches"""
+        x = np.asarray(row, dtype=np.float32)
+        node = self.roots
+        tested = np.zeros((self.n_estimators, len(x)), dtype=bool)
+        trees = np.arange(self.n_estimators)
+        for _ in range(self.max_depth):
+            feature = np.take(self.feature, node)
+            child = np.take(self.children, 2 * node + (x[feature] <= np.take(self.threshold, node)))
+            tested[trees, feature] |= child != node
+            node = child
+        return tested, node
+
+    def split_thresholds(self, column):
+        """Sorted distinct thresholds the forest compares a feature column against"""
+        thresholds = self._split_thresholds.get(column)
+        if thresholds is None:
+            nodes = np.arange(len(self.feature))
+            internal = self.children[2 * nodes] != nodes
+            thresholds = np.unique(self.threshold[internal & (self.feature == column)])
+            self._split_thresholds[column] = thresholds
+        return thresholds
+
+    def predict_proba(self, X):
+        """Average the leaf class fractions over all trees"""
+        return self.value[self.apply(X)].mean(axis=1)
+
+    def predict(self, X):
+        """Most likely class per row"""
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
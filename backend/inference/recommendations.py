@@ -0,0 +1,111 @@
+import operator
+
+import numpy as np
+
+RECOMMENDATION_TEXT = {
+    "high.consult": "Consult with a healthcare professional immediately",
+    "high.glucose_daily": "Monitor blood glucose levels daily",
+    "high.strict_diet": "Follow a strict diabetes-friendly diet",
+    "high.supervised_activity": "Engage in supervised physical activity",
+    "high.medication": "Consider medication as prescribed by your doctor",
+    "medium.checkups": "Schedule regular check-ups with your healthcare provider",
+    "medium.balanced_diet": "Maintain a balanced diet with limited refined sugars",
+    "medium.exercise": "Exercise regularly (at least 150 minutes per week)",
+    "medium.monitor_bmi": "Monitor your weight and BMI regularly",
+    "medium.stress": "Manage stress through relaxation techniques",
+    "low.healthy_eating": "Continue maintaining healthy eating habits",
+    "low.stay_active": "Stay physically active with regular exercise",
+    "low.screenings": "Keep up with routine health screenings",
+    "low.healthy_weight": "Maintain a healthy weight",
+    "low.prevention": "Stay informed about diabetes prevention",
+    "weight_management": "Focus on weight management - consider consulting a nutritionist",
+    "smoking_cessation": "Consider smoking cessation programs",
+    "increase_activity": "Gradually increase your physical activity level",
+    "glucose_monitoring": "Monitor fasting glucose levels more frequently",
+}
+
+BASE_RECOMMENDATIONS = {
+    "High": ("high.consult", "high.glucose_daily", "high.strict_diet", "high.supervised_activity",
+             "high.medication"),
+    "Medium": ("medium.checkups", "medium.balanced_diet", "medium.exercise", "medium.monitor_bmi",
+               "medium.stress"),
+    "Low": ("low.healthy_eating", "low.stay_active", "low.screenings", "low.healthy_weight",
+            "low.prevention"),
+}
+
+# Personalized rules as (rule id, encoded feature columns summed, comparison, threshold).
+# Base levels dropped by the encoder have no column, so "not Never" and "not High"
+# are tested through the remaining dummy columns. Activity counts as low below High,
+# i.e. the original `int(physical_activity) < 3` on a Low/Medium/High = 1/2/3 scale;
+# the original applied int() to the form's 0-1 values, so it fired for every form
+# submission and failed outright on the CSV's level names.
+PERSONALIZED_RULES = (
+    ("weight_management", ("BMI",), ">", 30),
+    ("smoking_cessation", ("smoking_status_Never",), "==", 0),
+    ("increase_activity", ("physical_activity_Low", "physical_activity_Medium"), ">", 0),
+    ("glucose_monitoring", ("Glucose",), ">", 125),
+)
+
+COMPARISONS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "==": operator.eq}
+
+
+class RecommendationEngine:
+    """Recommendation rules compiled against the model's feature columns.
+
+    Rules are evaluated on encoded feature rows into a bitmask, and every
+    (risk level, bitmask) combination is precomputed into immutable tuples
+    of rule ids, so a request only does a handful of comparisons and a
+    table lookup.
+    """
+
+    def __init__(self, feature_names, rules=PERSONALIZED_RULES, base=BASE_RECOMMENDATIONS):
+        index = {name: i for i, name in enumerate(feature_names)}
+        for rule_id, columns, _, _ in rules:
+            # A skipped column would sum to 0 and silently flip the rule for every patient
+            missing = [column for column in columns if column not in index]
+            if missing:
+                raise ValueError(f"Recommendation rule {rule_id} uses unknown feature columns: {', '.join(missing)}")
+        self.rule_ids = tuple(rule_id for rule_id, _, _, _ in rules)
+        self._rules = [
+            ([index[column] for column in columns], COMPARISONS[comparison], threshold)
+            for _, columns, comparison, threshold in rules
+        ]
+        self._weights = 1 << np.arange(len(rules), dtype=np.int64)
+
+        self.levels = tuple(base)
+        self._table = {}
+        self._messages = {}
+        for level, base_ids in base.items():
+            for mask in range(1 << len(rules)):
+                rule_ids = base_ids + tuple(rule_id for bit, rule_id in enumerate(self.rule_ids) if mask >> bit & 1)
+                self._table[level, mask] = rule_ids
+                self._messages[rule_ids] = tuple(RECOMMENDATION_TEXT[rule_id] for rule_id in rule_ids)
+
+    def _mask(self, row):
+        mask = 0
+        for bit, (columns, compare, threshold) in enumerate(self._rules):
+            if compare(sum(row[i] for i in columns), threshold):
+                mask |= 1 << bit
+        return mask
+
+    def _masks(self, X):
+        hits = np.empty((X.shape[0], len(self._rules)), dtype=bool)
+        for bit, (columns, compare, threshold) in enumerate(self._rules):
+            hits[:, bit] = compare(X[:, columns].sum(axis=1), threshold)
+        return hits @ self._weights
+
+    def recommend(self, row, risk_level):
+        """Rule ids for one encoded row"""
+        return self._table[self._level(risk_level), self._mask(row)]
+
+    def recommend_batch(self, X, risk_levels):
+        """Rule ids for every row of an encoded matrix"""
+        masks = self._masks(X).tolist()
+        return [self._table[self._level(level), mask] for level, mask in zip(risk_levels, masks)]
+
+    def messages(self, rule_ids):
+        """Display text for a tuple returned by recommend()"""
+        return self._messages[rule_ids]
+
+    def _level(self, risk_level):
+        return risk_level if risk_level in self.levels else "Low"
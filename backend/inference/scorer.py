@@ -0,0 +1,56 @@
+import numpy as np
+
+# Lower probability bound of each risk band, checked in order
+RISK_LEVELS = (("High", 0.7), ("Medium", 0.4))
+
+
+def get_risk_level(risk_probability):
+    """Map a diabetes probability to a risk band"""
+    for level, threshold in RISK_LEVELS:
+        if risk_probability >= threshold:
+            return level
+    return "Low"
+
+
+def get_risk_levels(risk_probabilities):
+    """Vectorised get_risk_level for an array of probabilities"""
+    risk_probabilities = np.asarray(risk_probabilities)
+    levels = np.full(len(risk_probabilities), "Low", dtype=object)
+    # Apply the lowest band first so higher bands overwrite it
+    for level, threshold in reversed(RISK_LEVELS):
+        levels[risk_probabilities >= threshold] = level
+    return levels
+
+
+class RiskScorer:
+    """Shared inference layer for the prediction endpoints.
+
+    Runs the forest once per call: class labels are derived from the
+    probabilities the same way ``predict`` does, instead of walking every
+    tree a second time.
+    """
+
+    def __init__(self, model, encoder):
+        self.model = model
+        self.encoder = encoder
+        self.classes = np.asarray(model.classes_)
+        # Column holding the positive (diabetic) class probability
+        self.positive_index = 1 if len(self.classes) > 1 else 0
+
+    def score_matrix(self, X):
+        """Return (predictions, risk probabilities) for an encoded matrix"""
+        return self.classify(self.model.predict_proba(X))
+
+    def classify(self, probabilities):
+        """(predictions, risk probabilities) from a matrix of class probabilities"""
+        predictions = self.classes.take(probabilities.argmax(axis=1))
+        return predictions, probabilities[:, self.positive_index]
+
+    def score_row(self, row):
+        """Score one encoded feature row, returning (prediction, risk probability)"""
+        predictions, probabilities = self.score_matrix(row.reshape(1, -1))
+        return int(predictions[0]), float(probabilities[0])
+
+    def score(self, record):
+        """Score a single raw record, returning (prediction, risk probability)"""
+        return self.score_row(self.encoder.encode(record))
@@ -0,0 +1,170 @@
+import json
+
+import numpy as np
+
+from inference.cache import score_row
+from inference.scorer import get_risk_level
+from metrics import stage
+from schemas import ValidationError
+
+
+def build_result(prediction, risk_probability, risk_level, recommendations):
+    """Response body for one scored record"""
+    return {
+        "prediction": int(prediction),
+        "probability": risk_probability,
+        "risk_level": risk_level,
+        "risk_percentage": round(risk_probability * 100, 2),
+        "recommendations": recommendations,
+        "status": "success"
+    }
+
+
+def predict_record(bundle, data, cache=None, batcher=None, on_scored=None):
+    """Score one raw record; raises ValidationError for records that fail the schema
+
+    With a batcher, cache misses are scored together with concurrent requests.
+    on_scored(row, risk_probability, risk_level) is called with the encoded
+    row, e.g. to record the assessment.
+    """
+    # Reject malformed input before any encoding or scoring work
+    with stage("/predict", "validate"):
+        data = bundle.schema.validate(data)
+
+    # Encode input into a feature row matching the training columns
+    with stage("/predict", "encode"):
+        row = bundle.encoder.encode(data)
+
+    # Get prediction and probability from one forest pass (or the cache)
+    score = batcher.score if batcher is not None else score_row
+    with stage("/predict", "score"):
+        if cache is not None:
+            prediction, risk_probability = cache.score(bundle, row, score)
+        else:
+            prediction, risk_probability = score(bundle, row)
+
+    # Determine risk level
+    risk_level = get_risk_level(risk_probability)
+
+    if on_scored is not None:
+        on_scored(row, risk_probability, risk_level)
+
+    # Generate recommendations based on risk level and the encoded features
+    with stage("/predict", "recommend"):
+        recommendations = bundle.recommender.messages(bundle.recommender.recommend(row, risk_level))
+
+    return build_result(prediction, risk_probability, risk_level, recommendations)
+
+
+def explanation(bundle, record, contributions):
+    """Explanation fields for one record: base value and contributions, largest effect first"""
+    ranked = sorted(zip(bundle.explainer.group_names, contributions.tolist()), key=lambda item: -abs(item[1]))
+    return {
+        "base_value": bundle.explainer.base_value,
+        "contributions": [{"feature": name, "value": record.get(name), "contribution": contribution}
+                          for name, contribution in ranked]
+    }
+
+
+def explain_record(bundle, data):
+    """Score one raw record and attribute its risk probability to the input fields
+
+    Raises ValidationError for records that fail the schema.
+    """
+    with stage("/predict/explain", "validate"):
+        data = bundle.schema.validate(data)
+
+    with stage("/predict/explain", "encode"):
+        row = bundle.encoder.encode(data)
+
+    with stage("/predict/explain", "explain"):
+        probabilities, contributions = bundle.explainer.explain(row.reshape(1, -1))
+        predictions, positive = bundle.scorer.classify(probabilities)
+        contributions = bundle.explainer.grouped(contributions)
+
+    risk_probability = float(positive[0])
+    risk_level = get_risk_level(risk_probability)
+    with stage("/predict/explain", "recommend"):
+        recommendations = bundle.recommender.messages(bundle.recommender.recommend(row, risk_level))
+
+    return {**build_result(predictions[0], risk_probability, risk_level, recommendations),
+            **explanation(bundle, data, contributions[0])}
+
+
+def iter_ndjson(lines):
+    """Yield one parsed record per non-empty NDJSON line, or the parse error"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+
+def score_records(bundle, records, chunk_size=512, explain=False):
+    """Score an iterable of raw records chunk by chunk, keeping input order"""
+    results = []
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            results.extend(score_chunk(bundle, chunk, len(results), explain))
+            chunk = []
+    if chunk:
+        results.extend(score_chunk(bundle, chunk, len(results), explain))
+    return results
+
+
+def score_chunk(bundle, records, offset, explain=False):
+    """Encode a chunk into one matrix and score it with a single forest call
+
+    With explain, the same pass also yields each record's feature contributions.
+    """
+    X = np.zeros((len(records), bundle.encoder.n_features), dtype=np.float64)
+    results = [None] * len(records)
+    valid = []
+    clean = []
+
+    for i, record in enumerate(records):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            data = bundle.schema.validate(record)
+            bundle.encoder.encode(data, X[len(valid)])
+            valid.append(i)
+            clean.append(data)
+        except ValidationError as e:
+            results[i] = {"index": offset + i, "error": str(e), "errors": e.errors, "status": "error"}
+        except ValueError as e:
+            results[i] = {"index": offset + i, "error": str(e), "status": "error"}
+
+    if valid:
+        if explain:
+            probabilities, contributions = bundle.explainer.explain(X[:len(valid)])
+            predictions, positive = bundle.scorer.classify(probabilities)
+            contributions = bundle.explainer.grouped(contributions)
+        else:
+            predictions, positive = bundle.scorer.score_matrix(X[:len(valid)])
+        risk_levels = [get_risk_level(p) for p in positive.tolist()]
+        rule_ids = bundle.recommender.recommend_batch(X[:len(valid)], risk_levels)
+
+        for row, i in enumerate(valid):
+            result = build_result(predictions[row], float(positive[row]), risk_levels[row],
+                                  bundle.recommender.messages(rule_ids[row]))
+            if explain:
+                result.update(explanation(bundle, clean[row], contributions[row]))
+            results[i] = {"index": offset + i, **result}
+
+    return results
+
+
+def batch_response(results):
+    """Response body for /predict/batch"""
+    return {
+        "results": results,
+        "count": len(results),
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "status": "success"
+    }
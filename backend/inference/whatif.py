@@ -0,0 +1,154 @@
+import math
+import os
+
+import numpy as np
+
+from inference.forest import CompiledForest
+from inference.scorer import get_risk_level, get_risk_levels
+from metrics import stage
+from schemas import Invalid, ValidationError
+
+MAX_WHATIF_FEATURES = 2
+MAX_WHATIF_POINTS = int(os.environ.get('WHATIF_MAX_POINTS', 2500))
+# Distinct grid cells from which skipping the trees a sweep cannot change pays for itself
+TREE_SKIP_MIN_ROWS = 128
+
+
+def axis_values(name, spec, profile, convert):
+    """Raw values of one swept field from a list or a {"start", "stop", "step", "relative"} range
+
+    Ranges include stop. With relative, start and stop are offsets from the profile's value.
+    Every value is checked by the field's schema converter.
+    """
+    if isinstance(spec, list):
+        values = spec
+    elif isinstance(spec, dict):
+        try:
+            start, stop = float(spec["start"]), float(spec["stop"])
+            step = float(spec.get("step", 1))
+        except (KeyError, TypeError, ValueError):
+            raise Invalid("Expected a list of values or numeric start, stop and step")
+        # json accepts NaN and Infinity, which would otherwise fail when counting the steps
+        if not all(math.isfinite(value) for value in (start, stop, step)):
+            raise Invalid("Expected finite start, stop and step")
+        if not step > 0 or stop < start:
+            raise Invalid("Expected step > 0 and stop >= start")
+        if (stop - start) / step >= MAX_WHATIF_POINTS:
+            raise Invalid(f"At most {MAX_WHATIF_POINTS} values are allowed")
+        if spec.get("relative"):
+            if not isinstance(profile.get(name), float):
+                raise Invalid("relative ranges need a numeric value in the profile")
+            start, stop = start + profile[name], stop + profile[name]
+        # Rounded so steps like 0.1 do not accumulate float noise in the returned values
+        values = np.round(start + step * np.arange(int(np.floor((stop - start) / step + 1e-9)) + 1), 6).tolist()
+    else:
+        raise Invalid("Expected a list of values or a start/stop/step range")
+    if not values:
+        raise Invalid("Expected at least one value")
+    return [convert(value) for value in values]
+
+
+def parse_request(bundle, data):
+    """(clean profile, [(field, values)]) from a /predict/whatif body; raises ValidationError"""
+    if not isinstance(data, dict):
+        raise ValidationError({"_": "Expected a JSON object"})
+    vary = data.get("vary")
+    if not isinstance(vary, dict) or not 1 <= len(vary) <= MAX_WHATIF_FEATURES:
+        raise ValidationError({"vary": f"Expected an object with 1 to {MAX_WHATIF_FEATURES} fields to sweep"})
+
+    try:
+        profile = bundle.schema.validate(data.get("profile"))
+    except ValidationError as e:
+        raise ValidationError({f"profile.{field}": message for field, message in e.errors.items()})
+
+    axes = []
+    errors = {}
+    for name, spec in vary.items():
+        try:
+            convert = bundle.schema.converter(name)
+        except KeyError:
+            errors[f"vary.{name}"] = "Unknown feature"
+            continue
+        try:
+            axes.append((name, axis_values(name, spec, profile, convert)))
+        except Invalid as e:
+            errors[f"vary.{name}"] = str(e)
+    if not errors and np.prod([len(values) for _, values in axes]) > MAX_WHATIF_POINTS:
+        errors["vary"] = f"The grid may have at most {MAX_WHATIF_POINTS} points"
+    if errors:
+        raise ValidationError(errors)
+    return profile, axes
+
+
+def grid_matrix(bundle, row, axes):
+    """(X, varied columns): the base row repeated over the cartesian grid of the swept fields"""
+    blocks = [bundle.encoder.encode_feature(name, values) for name, values in axes]
+    shape = [len(values) for _, values in axes]
+    # Row-major grid: the last field varies fastest, matching the nested response arrays
+    index = np.indices(shape).reshape(len(shape), -1)
+    X = np.repeat(row[None, :], index.shape[1], axis=0)
+    varied = []
+    for (columns, block), positions in zip(blocks, index):
+        X[:, columns] = block[positions]
+        varied.extend(columns)
+    return X, varied
+
+
+def score_grid(bundle, row, X, varied):
+    """(grid class probabilities, base row class probabilities, rows pushed through the trees)
+
+    Grid rows that fall between the same split thresholds on every swept
+    column reach the same leaves, so only one row per such cell is scored.
+    For larger grids, trees whose path for the base row never tests a swept
+    column are also skipped: they reach the same leaf for every grid row, so
+    their value is added once.
+    """
+    forest = bundle.model
+    if not isinstance(forest, CompiledForest):
+        return forest.predict_proba(X), forest.predict_proba(row.reshape(1, -1))[0], len(X)
+
+    thresholds = [forest.split_thresholds(column) for column in varied]
+    cells = [np.searchsorted(splits, X[:, column].astype(np.float32), side="left")
+             for splits, column in zip(thresholds, varied)]
+    keys = np.ravel_multi_index(cells, [len(splits) + 1 for splits in thresholds])
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    if len(first) < TREE_SKIP_MIN_ROWS:
+        # Tracing the base path costs about as much as scoring a few dozen rows through every tree
+        probabilities = forest.predict_proba(np.vstack([X[first], row]))
+        return probabilities[inverse], probabilities[-1], len(first)
+
+    tested, base_leaves = forest.path_features(row)
+    affected = np.flatnonzero(tested[:, varied].any(axis=1))
+    constant = forest.value[np.delete(base_leaves, affected)].sum(axis=0)
+    leaves = forest.apply(X[first], affected)
+    probabilities = (forest.value[leaves].sum(axis=1) + constant) / forest.n_estimators
+    return probabilities[inverse], forest.value[base_leaves].mean(axis=0), len(first)
+
+
+def whatif_record(bundle, data):
+    """Risk response curve (1 field) or surface (2 fields) around a base profile, in one forest pass"""
+    with stage("/predict/whatif", "validate"):
+        profile, axes = parse_request(bundle, data)
+
+    with stage("/predict/whatif", "encode"):
+        row = bundle.encoder.encode(profile)
+        X, varied = grid_matrix(bundle, row, axes)
+
+    with stage("/predict/whatif", "score"):
+        probabilities, base_probabilities, scored = score_grid(bundle, row, X, varied)
+        _, positive = bundle.scorer.classify(np.asarray(probabilities))
+        base = float(base_probabilities[bundle.scorer.positive_index])
+
+    shape = [len(values) for _, values in axes]
+    return {
+        "features": [name for name, _ in axes],
+        "values": [values for _, values in axes],
+        "probabilities": np.round(positive, 4).reshape(shape).tolist(),
+        "risk_levels": get_risk_levels(positive).reshape(shape).tolist(),
+        "base": {"probability": base, "risk_level": get_risk_level(base),
+                 "values": {name: profile.get(name) for name, _ in axes}},
+        "points": int(np.prod(shape)),
+        "scored_points": scored,
+        "status": "success"
+    }
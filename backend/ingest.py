@@ -0,0 +1,162 @@
+# backend/ingest.py
+"""Stream a training CSV in chunks into a bounded, uniformly sampled matrix.
+
+Exports can be far larger than memory, so the file is read twice in chunks
+with compact dtypes: the first pass learns the categorical levels and class
+counts, the second encodes each chunk the way the API does and keeps a
+uniform sample of at most ``max_rows`` rows (bottom-k on random keys, so the
+sample does not depend on the chunk size). Memory therefore scales with the
+chunk size and sample size, never with the file.
+
+    python ingest.py data/export.csv --chunksize 100000 --sample-rows 200000
+"""
+import argparse
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+from inference.encoder import CATEGORICAL_COLUMNS, FeatureEncoder
+
+TARGET_COLUMN = "Outcome"
+
+# Compact dtypes for the known columns; nullable ints so missing values survive the read
+DTYPES = {
+    "Age": "Int16",
+    "Pregnancies": "Int8",
+    "Glucose": "Int16",
+    "BloodPressure": "Int16",
+    "SkinThickness": "Int16",
+    "Insulin": "Int16",
+    "BMI": "float32",
+    "DiabetesPedigreeFunction": "float32",
+    TARGET_COLUMN: "int8",
+    **{column: "category" for column in CATEGORICAL_COLUMNS},
+}
+
+
+def read_header(path):
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_chunks(path, chunksize, columns=None):
+    """Yield DataFrame chunks with compact dtypes; unknown numeric columns are read as float32"""
+    header = read_header(path)
+    usecols = columns or header
+    dtype = {column: DTYPES.get(column, "float32") for column in usecols}
+    yield from pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunksize)
+
+
+def learn_categories(path, chunksize):
+    """One pass over the categorical and target columns: (levels, row count, class counts)"""
+    header = read_header(path)
+    categorical = [column for column in header if column in CATEGORICAL_COLUMNS]
+    levels = {column: set() for column in categorical}
+    class_counts = {}
+    rows = 0
+
+    for chunk in read_chunks(path, chunksize, categorical + [TARGET_COLUMN]):
+        rows += len(chunk)
+        for column in categorical:
+            levels[column].update(chunk[column].cat.categories.astype(str))
+        for label, count in chunk[TARGET_COLUMN].value_counts().items():
+            class_counts[int(label)] = class_counts.get(int(label), 0) + int(count)
+
+    # get_dummies orders levels the same way before dropping the first
+    return {column: sorted(values) for column, values in levels.items()}, rows, class_counts
+
+
+def build_encoder(header, categories):
+    """Feature encoder matching pd.get_dummies(X, drop_first=True) on the full file"""
+    numeric = [column for column in header if column != TARGET_COLUMN and column not in categories]
+    feature_names = numeric + [
+        f"{column}_{level}" for column, levels in categories.items() for level in levels[1:]
+    ]
+    return FeatureEncoder(feature_names, categories)
+
+
+def encode_chunk(chunk, encoder, out=None, dtype=np.float32):
+    """Vectorised FeatureEncoder.encode for a whole chunk, as a float32 matrix
+
+    Missing columns, missing numeric values and unseen levels encode as zeros,
+    like the API. Pass dtype=np.float64 to get exactly the values the API scores.
+    """
+    X = np.zeros((len(chunk), encoder.n_features), dtype=dtype) if out is None else out
+    index = {name: i for i, name in enumerate(encoder.feature_names)}
+    dummies = set()
+
+    for column, levels in encoder.categories.items():
+        if column not in chunk:
+            continue
+        folded = chunk[column].astype(str).str.casefold()
+        codes = pd.Categorical(folded, categories=[str(level).casefold() for level in levels]).codes
+        for code, level in enumerate(levels):
+            position = index.get(f"{column}_{level}")
+            if position is not None:
+                X[:, position] = codes == code
+                dummies.add(position)
+
+    for name, i in index.items():
+        if i in dummies:
+            continue
+        if name not in chunk:
+            X[:, i] = 0
+        else:
+            X[:, i] = chunk[name].to_numpy(dtype=X.dtype, na_value=0)
+    return X
+
+
+def sample_dataset(path, chunksize=100_000, max_rows=200_000, seed=42):
+    """Return (X float32, y int8, encoder, summary) for a uniform sample of the file"""
+    started = time.perf_counter()
+    categories, rows, class_counts = learn_categories(path, chunksize)
+    encoder = build_encoder(read_header(path), categories)
+
+    rng = np.random.default_rng(seed)
+    X = np.empty((0, encoder.n_features), dtype=np.float32)
+    y = np.empty(0, dtype=np.int8)
+    keys = np.empty(0, dtype=np.float64)
+    peak = 0
+
+    for chunk in read_chunks(path, chunksize):
+        chunk_keys = rng.random(len(chunk))
+        X = np.concatenate([X, encode_chunk(chunk, encoder)])
+        y = np.concatenate([y, chunk[TARGET_COLUMN].to_numpy(dtype=np.int8)])
+        keys = np.concatenate([keys, chunk_keys])
+        peak = max(peak, int(chunk.memory_usage(deep=True).sum()) + X.nbytes + y.nbytes + keys.nbytes)
+        if len(keys) > max_rows:
+            # Keep the rows with the smallest keys (a uniform sample without
+            # replacement), in file order so the sample is reproducible
+            keep = np.sort(np.argpartition(keys, max_rows)[:max_rows])
+            X, y, keys = X[keep], y[keep], keys[keep]
+
+    summary = {
+        "rows_read": rows,
+        "rows_sampled": len(y),
+        "class_counts": class_counts,
+        "chunksize": chunksize,
+        "seconds": round(time.perf_counter() - started, 3),
+        # Chunk plus sample buffers at their largest; bounded by chunksize and max_rows
+        "peak_working_mb": round(peak / 2 ** 20, 1),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    return X, y, encoder, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a training CSV into a bounded sample")
+    parser.add_argument("path")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--sample-rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    X, y, encoder, summary = sample_dataset(args.path, args.chunksize, args.sample_rows, args.seed)
+    print(f"{summary['rows_read']} rows read, {summary['rows_sampled']} sampled into a "
+          f"{X.shape[0]}x{X.shape[1]} float32 matrix ({X.nbytes / 2 ** 20:.1f} MB) in {summary['seconds']}s")
+    print(f"Peak working set {summary['peak_working_mb']} MB, max RSS {summary['max_rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
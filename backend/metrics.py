@@ -0,0 +1,215 @@
+# backend/metrics.py
+"""In-process latency histograms, Prometheus text export and sampled traces.
+
+Stages are timed with ``timed(histogram, **labels)``. Every observation lands
+in a fixed-bucket histogram; when the current request was picked for tracing
+(TRACE_SAMPLE_RATE), it is also recorded as a span so a single slow request
+can be broken down stage by stage. Finished traces are kept in a small ring
+buffer served by /metrics/traces.
+"""
+import bisect
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds in seconds, from 100us scoring stages to multi-second hashing queues
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0))
+TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 100))
+
+_current_trace = ContextVar("current_trace", default=None)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), then sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", key, (("le", _format_value(bound)),), cumulative
+            yield f"{self.name}_sum", key, (), total
+            yield f"{self.name}_count", key, (), cumulative
+
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}_total", key, (), value
+
+
+class Registry:
+    """Named metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample, key, extra, value in metric.samples():
+                lines.append(f"{sample}{_format_labels(metric.labelnames, key, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = Registry()
+REQUEST_SECONDS = REGISTRY.histogram(
+    "synapsecare_request_seconds", "End-to-end request latency", ("endpoint", "method", "status"))
+STAGE_SECONDS = REGISTRY.histogram(
+    "synapsecare_stage_seconds", "Latency of each request stage", ("endpoint", "stage"))
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "synapsecare_db_query_seconds", "UserModel query latency, including waiting for a connection", ("query",))
+TRACES_SAMPLED = REGISTRY.counter("synapsecare_traces_sampled", "Requests recorded as detailed traces")
+RATE_LIMITED = REGISTRY.counter("synapsecare_rate_limited", "Attempts rejected by a rate limit", ("limit",))
+
+
+class Trace:
+    """Spans of one sampled request"""
+
+    def __init__(self, name):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans = []
+        self.status = None
+        self.duration = None
+
+    def record(self, name, started, elapsed):
+        self.spans.append({"name": name, "start_ms": round((started - self.start) * 1e3, 3),
+                           "duration_ms": round(elapsed * 1e3, 3), "thread": threading.current_thread().name})
+
+    def as_dict(self):
+        return {"trace_id": self.trace_id, "name": self.name, "status": self.status, "started_at": self.started_at,
+                "duration_ms": round(self.duration * 1e3, 3) if self.duration is not None else None,
+                "spans": sorted(self.spans, key=lambda span: span["start_ms"])}
+
+
+class Tracer:
+    """Samples requests into traces and keeps the most recent ones"""
+
+    def __init__(self, sample_rate=TRACE_SAMPLE_RATE, buffer_size=TRACE_BUFFER_SIZE):
+        self.sample_rate = sample_rate
+        self.traces = deque(maxlen=buffer_size)
+
+    def start(self, name):
+        """Begin a trace for the current context if sampled; returns a token for finish()"""
+        trace = Trace(name) if self.sample_rate > 0 and random.random() < self.sample_rate else None
+        return _current_trace.set(trace)
+
+    def finish(self, token, status=None):
+        trace = _current_trace.get()
+        _current_trace.reset(token)
+        if trace is not None:
+            trace.status = status
+            trace.duration = time.perf_counter() - trace.start
+            self.traces.append(trace)
+            TRACES_SAMPLED.inc()
+
+    def recent(self, limit=None):
+        traces = list(self.traces)[::-1]
+        return [trace.as_dict() for trace in traces[:limit]]
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe the duration of the block, and add it as a span if the request is traced"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, **labels)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.record(":".join(str(value) for value in labels.values()), started, elapsed)
+
+
+def stage(endpoint, name):
+    """Time one stage of a request"""
+    return timed(STAGE_SECONDS, endpoint=endpoint, stage=name)
+
+
+def db_query(name):
+    """Time one UserModel query"""
+    return timed(DB_QUERY_SECONDS, query=name)
@@ -0,0 +1,195 @@
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from metrics import db_query
+
+# Ordered by (user_id, created_at, id) so history pages are index range scans
+CREATE_ASSESSMENTS = '''
+    CREATE TABLE IF NOT EXISTS assessments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        created_at INTEGER NOT NULL,
+        features BLOB NOT NULL,
+        probability REAL NOT NULL,
+        risk_level TEXT NOT NULL,
+        model_version TEXT NOT NULL
+    )
+'''
+CREATE_USER_CREATED_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_assessments_user_created
+    ON assessments (user_id, created_at, id)
+'''
+INSERT_ASSESSMENT = '''
+    INSERT INTO assessments (user_id, created_at, features, probability, risk_level, model_version)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+# Keyset pagination: continue strictly before the last (created_at, id) seen, newest first
+SELECT_ASSESSMENT_PAGE = '''
+    SELECT id, created_at, features, probability, risk_level, model_version
+    FROM assessments
+    WHERE user_id = ? AND created_at >= ? AND created_at < ? AND (created_at, id) < (?, ?)
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+'''
+SELECT_ASSESSMENT_TREND = '''
+    SELECT created_at / ? AS bucket, COUNT(*), AVG(probability), MIN(probability), MAX(probability)
+    FROM assessments
+    WHERE user_id = ? AND created_at >= ? AND created_at < ?
+    GROUP BY bucket
+    ORDER BY bucket
+'''
+
+# Timestamps are stored as integer milliseconds since the epoch
+MAX_TIMESTAMP = 2 ** 62
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def pack_features(row):
+    """Encoded feature row as a compact float32 blob"""
+    return np.asarray(row, dtype=np.float32).tobytes()
+
+
+def unpack_features(blob):
+    # Shortest decimal that round-trips the float32, so 33.6 does not come back as 33.59999847
+    return [float(str(value)) for value in np.frombuffer(blob, dtype=np.float32)]
+
+
+class AssessmentModel:
+    """Prediction history stored next to the users table"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def insert_many(self, rows):
+        """Insert (user_id, created_at, features, probability, risk_level, model_version) rows in one transaction"""
+        with db_query("insert_assessments"), self.pool.connection() as conn:
+            with conn:
+                conn.executemany(INSERT_ASSESSMENT, rows)
+
+    def page(self, user_id, start=0, end=MAX_TIMESTAMP, before=None, limit=50):
+        """Newest-first assessments in [start, end), continuing after the ``before`` (created_at, id) cursor
+
+        Returns (rows, next cursor or None).
+        """
+        before_created, before_id = before or (MAX_TIMESTAMP, 0)
+        if before is None:
+            before_created += 1
+        with db_query("select_assessment_page"), self.pool.connection() as conn:
+            rows = conn.execute(SELECT_ASSESSMENT_PAGE,
+                                (user_id, start, end, before_created, before_id, limit + 1)).fetchall()
+
+        next_cursor = (rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        return [{
+            "id": assessment_id,
+            "created_at": created_at,
+            "features": unpack_features(features),
+            "probability": probability,
+            "risk_percentage": round(probability * 100, 2),
+            "risk_level": risk_level,
+            "model_version": model_version,
+        } for assessment_id, created_at, features, probability, risk_level, model_version in rows[:limit]], \
+            next_cursor
+
+    def trend(self, user_id, start=0, end=MAX_TIMESTAMP, bucket_ms=86_400_000):
+        """Per-bucket count and mean/min/max probability in [start, end)"""
+        with db_query("select_assessment_trend"), self.pool.connection() as conn:
+            rows = conn.execute(SELECT_ASSESSMENT_TREND, (bucket_ms, user_id, start, end)).fetchall()
+        return [{"start": bucket * bucket_ms, "count": count, "mean_probability": mean,
+                 "min_probability": low, "max_probability": high}
+                for bucket, count, mean, low, high in rows]
+
+
+class AssessmentWriter:
+    """Write-behind queue that batches assessment inserts off the request path.
+
+    ``submit`` only enqueues; a background thread drains up to ``batch_size``
+    rows (or whatever arrived within ``flush_interval``) and inserts them in a
+    single transaction. When the queue is full new rows are dropped and
+    counted rather than slowing /predict down.
+    """
+
+    def __init__(self, model, batch_size=256, flush_interval=0.5, max_queue=10000):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _ensure_started(self):
+        # Started lazily so pre-fork servers get a writer thread per worker
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="assessment-writer", daemon=True)
+                    self._thread.start()
+
+    def submit(self, user_id, row, probability, risk_level, model_version, created_at=None):
+        """Queue one assessment; returns False if it was dropped because the queue is full"""
+        self._ensure_started()
+        item = (user_id, created_at or now_ms(), pack_features(row), probability, risk_level, model_version)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        try:
+            self.model.insert_many(batch)
+        except sqlite3.Error:
+            with self._lock:
+                self.failed += len(batch)
+            return
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def flush(self):
+        """Block until every queued assessment has been written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "mean_batch_size": self.written / self.batches if self.batches else 0.0,
+            }
@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Applied to every new connection; WAL lets readers proceed while a writer commits
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class ConnectionPool:
+    """Bounded pool of reusable SQLite connections.
+
+    Connections are opened lazily up to ``size`` and handed to one thread at
+    a time, so each keeps its page cache and sqlite3's prepared statement
+    cache across requests. ``size=0`` opens and closes a connection per use,
+    which is how the models worked before pooling.
+    """
+
+    def __init__(self, db_path, size=8, timeout=10.0, wal=True, cached_statements=128):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = PRAGMAS if wal else ()
+        self.cached_statements = cached_statements
+        self._idle = []
+        self._opened = 0
+        # Signalled whenever a connection is returned or a slot is freed
+        self._available = threading.Condition(threading.Lock())
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._available:
+            while not self._idle:
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError("Timed out waiting for a database connection")
+                self._available.wait(remaining)
+            else:
+                return self._idle.pop()
+        try:
+            return self._connect()
+        except sqlite3.Error:
+            self._free_slot()
+            raise
+
+    def _free_slot(self):
+        # A waiter may now open a connection in place of the one that went away
+        with self._available:
+            self._opened -= 1
+            self._available.notify()
+
+    def _release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Drop connections left in a bad state instead of reusing them
+            conn.close()
+            self._free_slot()
+            return
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with block"""
+        if self.size <= 0:
+            conn = self._connect()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Close every idle connection"""
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._available.notify_all()
+        for conn in idle:
+            conn.close()
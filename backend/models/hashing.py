@@ -0,0 +1,108 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Current cost; raising it makes older hashes get upgraded on the next successful login
+PASSWORD_ALGORITHM = "pbkdf2_sha256"
+PASSWORD_ITERATIONS = int(os.environ.get('PASSWORD_ITERATIONS', 100000))
+
+# Hashes stored before parameters were recorded were plain hex digests with these settings
+LEGACY_PARAMETERS = (PASSWORD_ALGORITHM, 100000)
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing executor cannot take more work"""
+
+    def __init__(self, message, status_code=429, retry_after=1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def encode_hash(algorithm, iterations, digest):
+    return f"{algorithm}${iterations}${digest}"
+
+
+def decode_hash(password_hash):
+    """Split a stored hash into (algorithm, iterations, hex digest)"""
+    if "$" not in password_hash:
+        algorithm, iterations = LEGACY_PARAMETERS
+        return algorithm, iterations, password_hash
+    algorithm, iterations, digest = password_hash.split("$", 2)
+    return algorithm, int(iterations), digest
+
+
+def pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations).hex()
+
+
+def hash_password(password, iterations=None):
+    """Hash password with a new salt, returning (stored hash, salt)"""
+    iterations = iterations or PASSWORD_ITERATIONS
+    salt = secrets.token_hex(32)
+    return encode_hash(PASSWORD_ALGORITHM, iterations, pbkdf2(password, salt, iterations)), salt
+
+
+def verify_password(password, password_hash, salt):
+    """Verify password against a stored hash using the parameters it was created with"""
+    algorithm, iterations, digest = decode_hash(password_hash)
+    if algorithm != PASSWORD_ALGORITHM:
+        return False
+    return hmac.compare_digest(digest, pbkdf2(password, salt, iterations))
+
+
+def needs_rehash(password_hash):
+    """True when a stored hash predates recorded parameters or uses weaker ones"""
+    if "$" not in password_hash:
+        return True
+    algorithm, iterations, _ = decode_hash(password_hash)
+    return algorithm != PASSWORD_ALGORITHM or iterations < PASSWORD_ITERATIONS
+
+
+class HashingExecutor:
+    """Bounded worker pool for password hashing.
+
+    At most ``max_workers`` hashes run at once and ``max_queue`` more may
+    wait; anything beyond that is rejected immediately with HashingBusy (429)
+    instead of piling up request threads. Callers that wait longer than
+    ``timeout`` get HashingBusy with a 503. hashlib releases the GIL while
+    hashing, so the rest of the API keeps serving.
+    """
+
+    def __init__(self, max_workers=None, max_queue=None, timeout=10.0):
+        self.max_workers = max_workers or int(os.environ.get('HASH_WORKERS', min(4, os.cpu_count() or 1)))
+        self.max_queue = max_queue if max_queue is not None else int(os.environ.get('HASH_QUEUE', 32))
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pbkdf2")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self.rejected = 0
+        self.timed_out = 0
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for its result"""
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy("Too many authentication requests, please retry shortly")
+        try:
+            future = self._executor.submit(fn, *args)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            self.timed_out += 1
+            raise HashingBusy("Authentication service is overloaded", status_code=503, retry_after=5)
+
+    def hash_password(self, password):
+        return self.run(hash_password, password)
+
+    def verify_password(self, password, password_hash, salt):
+        return self.run(verify_password, password, password_hash, salt)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
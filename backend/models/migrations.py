@@ -0,0 +1,129 @@
+# backend/models/migrations.py
+"""Schema migrations for the SQLite databases, applied as an explicit step.
+
+Tables are no longer created by the model and store constructors, and
+connection pools open lazily, so importing the app opens no database.
+Migrations run once per deploy with ``python -m models.migrations``, or
+when a server starts (app.startup(), DB_AUTO_MIGRATE=1 by default); a
+pre-forking server runs them once in the master rather than in every worker.
+
+Each migration is a named tuple of statements. Applied names are recorded
+in ``schema_migrations`` in the same IMMEDIATE transaction as the
+statements, so workers starting together cannot apply one twice. The
+statements use IF NOT EXISTS, so databases created before migrations were
+tracked are adopted unchanged.
+
+    python -m models.migrations           # apply pending migrations
+    python -m models.migrations --check   # list them and exit 1 if any are pending
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from models.assessment import CREATE_ASSESSMENTS, CREATE_USER_CREATED_INDEX
+from models.session_store import CREATE_EXPIRES_INDEX, CREATE_SESSIONS, CREATE_USER_INDEX
+from models.store import CREATE_KV_STORE
+from models.user import CREATE_USERS
+from ratelimit import CREATE_RATE_LIMITS, CREATE_TAT_INDEX
+
+CREATE_SCHEMA_MIGRATIONS = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        name TEXT PRIMARY KEY,
+        applied_at REAL NOT NULL
+    ) WITHOUT ROWID
+'''
+SELECT_MIGRATIONS_TABLE = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+SELECT_APPLIED = 'SELECT name FROM schema_migrations'
+INSERT_APPLIED = 'INSERT INTO schema_migrations (name, applied_at) VALUES (?, ?)'
+
+# Append only: a released migration is never edited, later schema changes get a new name
+MIGRATIONS = {
+    "0001_users": (CREATE_USERS,),
+    "0002_assessments": (CREATE_ASSESSMENTS, CREATE_USER_CREATED_INDEX),
+    "0003_sessions": (CREATE_SESSIONS, CREATE_EXPIRES_INDEX, CREATE_USER_INDEX),
+    "0004_rate_limits": (CREATE_RATE_LIMITS, CREATE_TAT_INDEX),
+    "0005_profile_cache": (CREATE_KV_STORE,),
+}
+USERS_MIGRATIONS = ("0001_users", "0002_assessments")
+SESSION_MIGRATIONS = ("0003_sessions",)
+RATE_LIMIT_MIGRATIONS = ("0004_rate_limits",)
+PROFILE_CACHE_MIGRATIONS = ("0005_profile_cache",)
+
+
+def configured_databases():
+    """{db path: migration names} for the databases selected by the environment"""
+    users = os.environ.get('USERS_DB_PATH', 'users.db')
+    databases = {users: list(USERS_MIGRATIONS)}
+    if os.environ.get('SESSION_BACKEND', 'sqlite') == 'sqlite':
+        databases.setdefault(os.environ.get('SESSION_DB_PATH') or users, []).extend(SESSION_MIGRATIONS)
+    if os.environ.get('RATE_LIMIT_BACKEND', 'memory') == 'sqlite':
+        databases.setdefault(os.environ.get('RATE_LIMIT_DB_PATH', 'rate_limits.db'), []).extend(RATE_LIMIT_MIGRATIONS)
+    if os.environ.get('PROFILE_CACHE_STORE'):
+        databases.setdefault(os.environ['PROFILE_CACHE_STORE'], []).extend(PROFILE_CACHE_MIGRATIONS)
+    return databases
+
+
+def connect(db_path):
+    # A short-lived connection rather than a pooled one, so nothing stays open in a pre-fork master
+    return sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+
+
+def pending(db_path, names=tuple(MIGRATIONS)):
+    """Names among `names` not yet applied to db_path, without writing to it"""
+    if not os.path.exists(db_path):
+        return list(names)
+    conn = connect(db_path)
+    try:
+        applied = set()
+        if conn.execute(SELECT_MIGRATIONS_TABLE).fetchone():
+            applied = {name for name, in conn.execute(SELECT_APPLIED)}
+    finally:
+        conn.close()
+    return [name for name in names if name not in applied]
+
+
+def migrate(db_path, names=tuple(MIGRATIONS)):
+    """Apply the pending migrations among `names` in order, all or none; returns the names applied"""
+    conn = connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(CREATE_SCHEMA_MIGRATIONS)
+            applied = {name for name, in conn.execute(SELECT_APPLIED)}
+            todo = [name for name in names if name not in applied]
+            for name in todo:
+                for statement in MIGRATIONS[name]:
+                    conn.execute(statement)
+                conn.execute(INSERT_APPLIED, (name, time.time()))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    return todo
+
+
+def migrate_configured(check=False):
+    """{db path: migration names} applied to every configured database, or only pending with check"""
+    run = pending if check else migrate
+    return {path: run(path, names) for path, names in configured_databases().items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="only list pending migrations")
+    args = parser.parse_args()
+
+    results = migrate_configured(check=args.check)
+    for path, names in results.items():
+        print(f"{path}: {'pending' if args.check else 'applied'} {', '.join(names) or 'nothing'}")
+    if args.check and any(results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
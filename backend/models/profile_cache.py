@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ProfileCache:
+    """Read-through cache of user profiles for the session endpoints.
+
+    A bounded in-process LRU with a TTL sits in front of an optional shared
+    store (see models.store). Invalidation removes the user from both, so
+    with a shared store other workers see an update once their short local
+    TTL (``local_ttl``) lapses; without one the local entry is authoritative.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60.0, shared=None, local_ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = shared
+        self.local_ttl = local_ttl if local_ttl is not None else (min(ttl, 2.0) if shared else ttl)
+        self._entries = OrderedDict()
+        self._loads = {}  # user_id -> token of the latest load in flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(user_id):
+        return f"profile:{user_id}"
+
+    def get(self, user_id, loader):
+        """Return the cached profile for user_id, calling loader(user_id) on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return dict(entry[0])
+            # invalidate() drops the token: a load that raced with it may have read the old row,
+            # so it is returned but not cached
+            token = self._loads[user_id] = object()
+
+        try:
+            profile = self.shared.get(self._key(user_id)) if self.shared else None
+            if profile is None:
+                with self._lock:
+                    self.misses += 1
+                profile = loader(user_id)
+                if profile is None:
+                    return None
+                if self.shared and self._is_current(user_id, token):
+                    self.shared.set(self._key(user_id), profile, ttl=self.ttl)
+                    # An invalidate() between the check and the set deleted the key before it was written
+                    if not self._is_current(user_id, token):
+                        self.shared.delete(self._key(user_id))
+
+            self._put(user_id, profile, token)
+            return dict(profile)
+        finally:
+            with self._lock:
+                if self._loads.get(user_id) is token:
+                    del self._loads[user_id]
+
+    def _is_current(self, user_id, token):
+        with self._lock:
+            return self._loads.get(user_id) is token
+
+    def _put(self, user_id, profile, token):
+        with self._lock:
+            if self._loads.get(user_id) is not token:
+                return
+            self._entries[user_id] = (profile, time.monotonic() + self.local_ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Forget one user after their profile changes"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._loads.pop(user_id, None)
+        if self.shared:
+            self.shared.delete(self._key(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._loads.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,185 @@
+import heapq
+import threading
+import time
+
+from metrics import db_query
+from models.database import ConnectionPool
+
+# Sessions are looked up by their random id on every request; expiry and user
+# indexes keep sweeps and per-user revocation off full table scans
+CREATE_SESSIONS = '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER,
+        data TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID
+'''
+CREATE_EXPIRES_INDEX = 'CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)'
+CREATE_USER_INDEX = 'CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id) WHERE user_id IS NOT NULL'
+SELECT_SESSION = 'SELECT data, expires_at FROM sessions WHERE id = ? AND expires_at > ?'
+UPSERT_SESSION = '''
+    INSERT INTO sessions (id, user_id, data, expires_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET user_id = excluded.user_id, data = excluded.data, expires_at = excluded.expires_at
+'''
+TOUCH_SESSION = 'UPDATE sessions SET expires_at = ? WHERE id = ?'
+DELETE_SESSION = 'DELETE FROM sessions WHERE id = ?'
+DELETE_USER_SESSIONS = 'DELETE FROM sessions WHERE user_id = ?'
+# Bounded batches so a sweep never holds the write lock for long
+DELETE_EXPIRED_BATCH = '''
+    DELETE FROM sessions WHERE id IN (
+        SELECT id FROM sessions WHERE expires_at <= ? ORDER BY expires_at LIMIT ?
+    )
+'''
+COUNT_SESSIONS = 'SELECT COUNT(*) FROM sessions WHERE expires_at > ?'
+
+
+class MemorySessionStore:
+    """Server-side sessions in a dict, for a single worker or as a stand-in for a shared store.
+
+    Expiry times are also pushed on a heap, so a sweep only looks at sessions
+    that are due instead of scanning every live one. Heap entries left behind
+    by a refresh or a delete are skipped when they surface.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._by_user = {}
+        self._expiry = []
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """(serialized data, expires_at) of a live session, or None"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        if entry is None or entry[2] <= time.time():
+            return None
+        return entry[1], entry[2]
+
+    def save(self, session_id, data, expires_at, user_id=None):
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous is not None and previous[0] != user_id:
+                self._unlink(session_id, previous[0])
+            self._sessions[session_id] = (user_id, data, expires_at)
+            if user_id is not None:
+                self._by_user.setdefault(user_id, set()).add(session_id)
+            heapq.heappush(self._expiry, (expires_at, session_id))
+
+    def touch(self, session_id, expires_at):
+        """Move the expiry of a session forward without rewriting its data"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions[session_id] = (entry[0], entry[1], expires_at)
+                heapq.heappush(self._expiry, (expires_at, session_id))
+
+    def delete(self, session_id):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._unlink(session_id, entry[0])
+
+    def revoke_user(self, user_id):
+        """Delete every session of a user, returning how many were removed"""
+        with self._lock:
+            session_ids = self._by_user.pop(user_id, set())
+            for session_id in session_ids:
+                self._sessions.pop(session_id, None)
+        return len(session_ids)
+
+    def sweep(self, batch_size=1000, max_batches=None):
+        """Drop expired sessions in batches, returning how many were removed"""
+        removed = 0
+        batches = 0
+        now = time.time()
+        while max_batches is None or batches < max_batches:
+            with self._lock:
+                count = 0
+                while self._expiry and self._expiry[0][0] <= now and count < batch_size:
+                    expires_at, session_id = heapq.heappop(self._expiry)
+                    entry = self._sessions.get(session_id)
+                    # Stale heap entry: the session was refreshed or already removed
+                    if entry is None or entry[2] != expires_at:
+                        continue
+                    del self._sessions[session_id]
+                    self._unlink(session_id, entry[0])
+                    count += 1
+                more = bool(self._expiry) and self._expiry[0][0] <= now
+            removed += count
+            batches += 1
+            if not more:
+                break
+        return removed
+
+    def count(self):
+        now = time.time()
+        with self._lock:
+            return sum(1 for _, _, expires_at in self._sessions.values() if expires_at > now)
+
+    def _unlink(self, session_id, user_id):
+        sessions = self._by_user.get(user_id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self._by_user[user_id]
+
+
+class SQLiteSessionStore:
+    """Server-side sessions in a SQLite table every worker process can open.
+
+    A lookup is a single primary-key probe on a WITHOUT ROWID table, so its
+    cost grows with the B-tree depth rather than the number of sessions.
+    """
+
+    def __init__(self, db_path, pool=None):
+        self.pool = pool or ConnectionPool(db_path, size=8)
+
+    def get(self, session_id):
+        """(serialized data, expires_at) of a live session, or None"""
+        with db_query("select_session"), self.pool.connection() as conn:
+            row = conn.execute(SELECT_SESSION, (session_id, time.time())).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    def save(self, session_id, data, expires_at, user_id=None):
+        with db_query("upsert_session"), self.pool.connection() as conn:
+            with conn:
+                conn.execute(UPSERT_SESSION, (session_id, user_id, data, expires_at))
+
+    def touch(self, session_id, expires_at):
+        """Move the expiry of a session forward without rewriting its data"""
+        with db_query("touch_session"), self.pool.connection() as conn:
+            with conn:
+                conn.execute(TOUCH_SESSION, (expires_at, session_id))
+
+    def delete(self, session_id):
+        with db_query("delete_session"), self.pool.connection() as conn:
+            with conn:
+                conn.execute(DELETE_SESSION, (session_id,))
+
+    def revoke_user(self, user_id):
+        """Delete every session of a user, returning how many were removed"""
+        with db_query("delete_user_sessions"), self.pool.connection() as conn:
+            with conn:
+                return conn.execute(DELETE_USER_SESSIONS, (user_id,)).rowcount
+
+    def sweep(self, batch_size=1000, max_batches=None):
+        """Drop expired sessions in batches, each in its own short transaction"""
+        removed = 0
+        batches = 0
+        now = time.time()
+        while max_batches is None or batches < max_batches:
+            with db_query("sweep_sessions"), self.pool.connection() as conn:
+                with conn:
+                    count = conn.execute(DELETE_EXPIRED_BATCH, (now, batch_size)).rowcount
+            removed += count
+            batches += 1
+            if count < batch_size:
+                break
+        return removed
+
+    def count(self):
+        with self.pool.connection() as conn:
+            return conn.execute(COUNT_SESSIONS, (time.time(),)).fetchone()[0]
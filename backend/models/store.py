@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+
+from models.database import ConnectionPool
+
+# Applied by models/migrations.py to the PROFILE_CACHE_STORE file
+CREATE_KV_STORE = '''
+    CREATE TABLE IF NOT EXISTS kv_store (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        expires_at REAL
+    ) WITHOUT ROWID
+'''
+
+
+class MemoryStore:
+    """In-process key/value store with per-key expiry.
+
+    Stands in for a shared store when the API runs as a single worker.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def sweep(self):
+        """Drop expired keys, returning how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._data.items()
+                       if expires_at is not None and expires_at < now]
+            for key in expired:
+                del self._data[key]
+        return len(expired)
+
+
+class SQLiteStore:
+    """Key/value store in a SQLite file that every worker process can open.
+
+    Values are JSON encoded. WAL mode lets workers read while another writes.
+    """
+
+    def __init__(self, db_path, pool=None):
+        self.pool = pool or ConnectionPool(db_path, size=4)
+
+    def get(self, key):
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT value, expires_at FROM kv_store WHERE key = ?', (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO kv_store (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), time.time() + ttl if ttl else None)
+                )
+
+    def delete(self, key):
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute('DELETE FROM kv_store WHERE key = ?', (key,))
+
+    def sweep(self):
+        """Drop expired keys, returning how many were removed"""
+        with self.pool.connection() as conn:
+            with conn:
+                return conn.execute('DELETE FROM kv_store WHERE expires_at < ?', (time.time(),)).rowcount
@@ -1,114 +1,117 @@
 import sqlite3
-import hashlib
-import secrets
 from datetime import datetime
 import os
 
+from metrics import db_query, stage
+from models.database import ConnectionPool
+from models.hashing import HashingBusy, HashingExecutor, needs_rehash
+from models.profile_cache import ProfileCache
+from models.store import SQLiteStore
+
+# Applied by models/migrations.py, not when the model is constructed
+CREATE_USERS = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        phone TEXT,
+        password_hash TEXT NOT NULL,
+        salt TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT 1
+    )
+'''
+# Statements are kept as constants so each pooled connection prepares them once
+SELECT_ID_BY_EMAIL = 'SELECT id FROM users WHERE email = ?'
+INSERT_USER = '''
+    INSERT INTO users (first_name, last_name, email, phone, password_hash, salt)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+SELECT_LOGIN_BY_EMAIL = '''
+    SELECT id, first_name, last_name, email, phone, password_hash, salt, is_active
+    FROM users WHERE email = ?
+'''
+UPDATE_PASSWORD_HASH = 'UPDATE users SET password_hash = ?, salt = ? WHERE id = ?'
+SELECT_ACTIVE_USER_BY_ID = '''
+    SELECT id, first_name, last_name, email, phone, created_at
+    FROM users WHERE id = ? AND is_active = 1
+'''
+
 class UserModel:
-    def __init__(self, db_path="users.db"):
+    def __init__(self, db_path="users.db", pool=None, hasher=None, profile_cache=None):
         self.db_path = db_path
-        self.init_db()
-    
-    def init_db(self):
-        """Initialize the database with users table"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                phone TEXT,
-                password_hash TEXT NOT NULL,
-                salt TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
-    def hash_password(self, password):
-        """Hash password with salt"""
-        salt = secrets.token_hex(32)
-        password_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt.encode('utf-8'),
-            100000
+        self.pool = pool or ConnectionPool(db_path, size=int(os.environ.get('DB_POOL_SIZE', 8)))
+        self.hasher = hasher or HashingExecutor()
+        self.profile_cache = profile_cache or self.default_profile_cache()
+
+    @staticmethod
+    def default_profile_cache():
+        """Profile cache configured from the environment, shared across workers if a store path is set"""
+        store_path = os.environ.get('PROFILE_CACHE_STORE')
+        return ProfileCache(
+            maxsize=int(os.environ.get('PROFILE_CACHE_SIZE', 10000)),
+            ttl=float(os.environ.get('PROFILE_CACHE_TTL', 60)),
+            shared=SQLiteStore(store_path) if store_path else None
         )
-        return password_hash.hex(), salt
-    
+
+    def hash_password(self, password):
+        """Hash password with salt on the hashing pool"""
+        with stage("/auth", "hash_password"):
+            return self.hasher.hash_password(password)
+
     def verify_password(self, password, password_hash, salt):
-        """Verify password against hash"""
-        return password_hash == hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt.encode('utf-8'),
-            100000
-        ).hex()
-    
+        """Verify password against hash on the hashing pool"""
+        with stage("/auth", "verify_password"):
+            return self.hasher.verify_password(password, password_hash, salt)
+
     def create_user(self, first_name, last_name, email, phone, password):
         """Create a new user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
             # Check if user already exists
-            cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
-            if cursor.fetchone():
-                return {"success": False, "message": "Email already registered"}
-            
-            # Hash password
+            with db_query("select_id_by_email"), self.pool.connection() as conn:
+                if conn.execute(SELECT_ID_BY_EMAIL, (email,)).fetchone():
+                    return {"success": False, "message": "Email already registered"}
+
+            # Hash password without holding a pooled connection
             password_hash, salt = self.hash_password(password)
-            
+
             # Insert user
-            cursor.execute('''
-                INSERT INTO users (first_name, last_name, email, phone, password_hash, salt)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (first_name, last_name, email, phone, password_hash, salt))
-            
-            user_id = cursor.lastrowid
-            conn.commit()
-            
+            with db_query("insert_user"), self.pool.connection() as conn:
+                with conn:
+                    cursor = conn.execute(INSERT_USER, (first_name, last_name, email, phone, password_hash, salt))
+
             return {
-                "success": True, 
+                "success": True,
                 "message": "User created successfully",
-                "user_id": user_id
+                "user_id": cursor.lastrowid
             }
-            
+
+        except sqlite3.IntegrityError:
+            # Lost a race with a concurrent registration for the same email
+            return {"success": False, "message": "Email already registered"}
         except sqlite3.Error as e:
             return {"success": False, "message": f"Database error: {str(e)}"}
-        finally:
-            conn.close()
-    
+
     def authenticate_user(self, email, password):
         """Authenticate user login"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                SELECT id, first_name, last_name, email, phone, password_hash, salt, is_active
-                FROM users WHERE email = ?
-            ''', (email,))
-            
-            user = cursor.fetchone()
-            
+            with db_query("select_login_by_email"), self.pool.connection() as conn:
+                user = conn.execute(SELECT_LOGIN_BY_EMAIL, (email,)).fetchone()
+
             if not user:
                 return {"success": False, "message": "Invalid email or password"}
-            
+
             user_id, first_name, last_name, email, phone, password_hash, salt, is_active = user
-            
+
             if not is_active:
                 return {"success": False, "message": "Account is deactivated"}
-            
+
             # Verify password
             if self.verify_password(password, password_hash, salt):
+                if needs_rehash(password_hash):
+                    self.rehash_password(user_id, password)
                 return {
                     "success": True,
                     "message": "Login successful",
@@ -122,77 +125,80 @@ class UserModel:
                 }
             else:
                 return {"success": False, "message": "Invalid email or password"}
-                
+
         except sqlite3.Error as e:
             return {"success": False, "message": f"Database error: {str(e)}"}
-        finally:
-            conn.close()
-    
+
+    def rehash_password(self, user_id, password):
+        """Upgrade a stored hash to the current parameters after a successful login"""
+        try:
+            password_hash, salt = self.hash_password(password)
+        except HashingBusy:
+            # Best effort: the upgrade is retried on a later login
+            return
+        with db_query("update_password_hash"), self.pool.connection() as conn:
+            with conn:
+                conn.execute(UPDATE_PASSWORD_HASH, (password_hash, salt, user_id))
+
     def get_user_by_id(self, user_id):
         """Get user by ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                SELECT id, first_name, last_name, email, phone, created_at
-                FROM users WHERE id = ? AND is_active = 1
-            ''', (user_id,))
-            
-            user = cursor.fetchone()
-            
+            user = self.profile_cache.get(user_id, self.load_user)
+
             if user:
-                return {
-                    "success": True,
-                    "user": {
-                        "id": user[0],
-                        "first_name": user[1],
-                        "last_name": user[2],
-                        "email": user[3],
-                        "phone": user[4],
-                        "created_at": user[5]
-                    }
-                }
+                return {"success": True, "user": user}
             else:
                 return {"success": False, "message": "User not found"}
-                
+
         except sqlite3.Error as e:
             return {"success": False, "message": f"Database error: {str(e)}"}
-        finally:
-            conn.close()
-    
+
+    def load_user(self, user_id):
+        """Read an active user's profile from the database"""
+        with db_query("select_active_user_by_id"), self.pool.connection() as conn:
+            user = conn.execute(SELECT_ACTIVE_USER_BY_ID, (user_id,)).fetchone()
+
+        if not user:
+            return None
+        return {
+            "id": user[0],
+            "first_name": user[1],
+            "last_name": user[2],
+            "email": user[3],
+            "phone": user[4],
+            "created_at": user[5]
+        }
+
     def update_user(self, user_id, **kwargs):
         """Update user information"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
             # Build dynamic update query
             update_fields = []
             values = []
-            
-            for field, value in kwargs.items():
-                if field in ['first_name', 'last_name', 'email', 'phone'] and value is not None:
+
+            for field in ['first_name', 'last_name', 'email', 'phone']:
+                if kwargs.get(field) is not None:
                     update_fields.append(f"{field} = ?")
-                    values.append(value)
-            
+                    values.append(kwargs[field])
+
             if not update_fields:
                 return {"success": False, "message": "No valid fields to update"}
-            
+
             update_fields.append("updated_at = ?")
             values.append(datetime.now().isoformat())
             values.append(user_id)
-            
+
+            # Fields are emitted in a fixed order so the statement cache sees few distinct queries
             query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
-            cursor.execute(query, values)
-            
+            with db_query("update_user"), self.pool.connection() as conn:
+                with conn:
+                    cursor = conn.execute(query, values)
+
             if cursor.rowcount == 0:
                 return {"success": False, "message": "User not found"}
-            
-            conn.commit()
+
+            self.profile_cache.invalidate(user_id)
             return {"success": True, "message": "User updated successfully"}
-            
+
         except sqlite3.Error as e:
             return {"success": False, "message": f"Database error: {str(e)}"}
-        finally:
-            conn.close()
\ No newline at end of file
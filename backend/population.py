@@ -0,0 +1,218 @@
+# backend/population.py
+"""Population statistics for placing a user's measurements in context.
+
+Every (feature, segment) pair keeps its distinct observed values in sorted
+order with cumulative counts. That is exact, small for these clinical
+measurements (a few hundred distinct values each, however many rows), and
+answers "what percentile is this value" with two binary searches.
+
+Segments are every combination of gender, ten-year age band and outcome,
+with None meaning "any", so the whole population is the (None, None, None)
+segment. Two indexes merge by summing counts per distinct value, which is
+how chunks of a large CSV are combined and how new assessment rows can be
+folded in without rereading the training data.
+
+    python population.py data/diabetes_extended_ordered.csv --Glucose 148 --gender Female --age 50
+"""
+import argparse
+import itertools
+import os
+import threading
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+POPULATION_DATA_PATH = os.environ.get('POPULATION_DATA_PATH',
+                                      os.path.join(BACKEND_DIR, "data", "diabetes_extended_ordered.csv"))
+
+FEATURES = ("Age", "Pregnancies", "Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI",
+            "DiabetesPedigreeFunction")
+# The Pima export records unmeasured values as 0; they are not part of the population
+ZERO_MEANS_MISSING = frozenset({"Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI"})
+SEGMENT_COLUMNS = ("gender", "age_band", "outcome")
+# Float32 values read back from assessments are rounded so 33.6 and 33.59999847 count as one value
+VALUE_DECIMALS = 4
+MIN_SEGMENT_SIZE = int(os.environ.get('POPULATION_MIN_SEGMENT_SIZE', 30))
+
+
+def age_band(age):
+    """Ten-year band label such as "40-49"; 80 and over share one band"""
+    if age is None or age != age:
+        return None
+    start = min(int(age) // 10 * 10, 80)
+    return "80+" if start == 80 else f"{start}-{start + 9}"
+
+
+class Distribution:
+    """Sorted distinct values with cumulative counts"""
+
+    __slots__ = ("values", "cumulative")
+
+    def __init__(self, values, cumulative):
+        self.values = values
+        self.cumulative = cumulative
+
+    @classmethod
+    def from_values(cls, values):
+        values, counts = np.unique(np.round(np.asarray(values, dtype=np.float64), VALUE_DECIMALS),
+                                   return_counts=True)
+        return cls(values, np.cumsum(counts))
+
+    @property
+    def count(self):
+        return int(self.cumulative[-1]) if len(self.cumulative) else 0
+
+    def counts(self):
+        return np.diff(self.cumulative, prepend=0)
+
+    def merge(self, other):
+        """Distribution of both samples together"""
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        values = np.union1d(self.values, other.values)
+        counts = np.zeros(len(values), dtype=np.int64)
+        counts[np.searchsorted(values, self.values)] += self.counts()
+        counts[np.searchsorted(values, other.values)] += other.counts()
+        return Distribution(values, np.cumsum(counts))
+
+    def percentile(self, value):
+        """Percentage of the population below value, counting ties as half (0-100)"""
+        value = round(float(value), VALUE_DECIMALS)
+        lower = np.searchsorted(self.values, value, side="left")
+        upper = np.searchsorted(self.values, value, side="right")
+        below = self.cumulative[lower - 1] if lower else 0
+        at_or_below = self.cumulative[upper - 1] if upper else 0
+        return float((below + at_or_below) / 2 / self.count * 100)
+
+    def quantile(self, q):
+        """Smallest observed value with at least a fraction q of the population at or below it"""
+        position = np.searchsorted(self.cumulative, max(q * self.count, 1), side="left")
+        return float(self.values[min(position, len(self.values) - 1)])
+
+
+class PopulationIndex:
+    """Distributions of every feature for every segment; immutable, so merges build a new index"""
+
+    def __init__(self, distributions=None):
+        # (feature, (gender, age_band, outcome)) -> Distribution
+        self.distributions = distributions or {}
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Index a DataFrame of raw records (Outcome optional)"""
+        from ingest import TARGET_COLUMN
+
+        keys = {
+            "gender": frame["gender"].astype("object").to_numpy() if "gender" in frame else None,
+            "age_band": np.array([age_band(age) for age in frame["Age"].astype("float64")], dtype=object)
+            if "Age" in frame else None,
+            "outcome": frame[TARGET_COLUMN].astype("float64").to_numpy() if TARGET_COLUMN in frame else None,
+        }
+        levels = {column: [None] + ([] if key is None else sorted({k for k in key if k is not None and k == k},
+                                                                  key=str))
+                  for column, key in keys.items()}
+        distributions = {}
+        for feature in FEATURES:
+            if feature not in frame:
+                continue
+            values = frame[feature].astype("float64").to_numpy()
+            present = ~np.isnan(values)
+            if feature in ZERO_MEANS_MISSING:
+                present &= values != 0
+            for segment in itertools.product(*levels.values()):
+                mask = present.copy()
+                for column, level in zip(SEGMENT_COLUMNS, segment):
+                    if level is not None:
+                        mask &= keys[column] == level
+                if mask.any():
+                    distributions[(feature, cls._segment(segment))] = Distribution.from_values(values[mask])
+        return cls(distributions)
+
+    @staticmethod
+    def _segment(segment):
+        gender, band, outcome = segment
+        return gender, band, None if outcome is None else int(outcome)
+
+    @classmethod
+    def from_csv(cls, path, chunksize=100_000):
+        """Index a CSV chunk by chunk, so memory follows the chunk size rather than the file"""
+        # ingest imports pandas, which is only needed once the index is built, not when the API starts
+        from ingest import read_chunks
+
+        index = cls()
+        for chunk in read_chunks(path, chunksize):
+            index = index.merge(cls.from_frame(chunk))
+        return index
+
+    def merge(self, other):
+        """Index over both populations, e.g. the training data plus newly recorded assessments"""
+        distributions = dict(self.distributions)
+        for key, distribution in other.distributions.items():
+            mine = distributions.get(key)
+            distributions[key] = distribution if mine is None else mine.merge(distribution)
+        return PopulationIndex(distributions)
+
+    def lookup(self, feature, gender=None, band=None, outcome=None, min_size=MIN_SEGMENT_SIZE):
+        """(segment, Distribution) for the narrowest requested segment with at least min_size values
+
+        Criteria are dropped outcome first, then age band, then gender until the segment is large enough.
+        """
+        candidates = [(gender, band, outcome), (gender, band, None), (gender, None, None), (None, None, None)]
+        for segment in dict.fromkeys(candidates):
+            distribution = self.distributions.get((feature, segment))
+            if distribution is not None and (distribution.count >= min_size or segment == (None, None, None)):
+                return segment, distribution
+        return None, None
+
+
+class PopulationStats:
+    """Lazily built index shared by the stats routes; add() publishes a merged index"""
+
+    def __init__(self, path=POPULATION_DATA_PATH):
+        self.path = path
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = PopulationIndex.from_csv(self.path)
+                index = self._index
+        return index
+
+    def add(self, index):
+        """Merge newly arrived data (e.g. PopulationIndex.from_frame of recent assessments) into the index"""
+        with self._lock:
+            self._index = (self._index or PopulationIndex.from_csv(self.path)).merge(index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv")
+    for feature in FEATURES:
+        parser.add_argument(f"--{feature}", type=float)
+    parser.add_argument("--gender")
+    parser.add_argument("--age", type=float, help="age used for the age band segment")
+    parser.add_argument("--outcome", type=int, choices=(0, 1))
+    args = parser.parse_args()
+
+    index = PopulationIndex.from_csv(args.csv)
+    band = age_band(args.age)
+    for feature in FEATURES:
+        value = getattr(args, feature)
+        if value is None:
+            continue
+        segment, distribution = index.lookup(feature, args.gender, band, args.outcome)
+        if distribution is None:
+            print(f"{feature}: no data")
+            continue
+        print(f"{feature} {value:g}: {distribution.percentile(value):.1f}th percentile of {distribution.count} "
+              f"(segment {segment}, median {distribution.quantile(0.5):g})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# backend/ratelimit.py
+"""Request rate limits checked before any expensive work.
+
+Limits use GCRA (the generic cell rate algorithm), a token bucket that
+stores a single number per key: the theoretical arrival time (TAT) of the
+next request. "5 per 300 seconds" admits a burst of 5 and then one attempt
+every 60 seconds, sliding rather than resetting at window boundaries. A
+check is one dict or primary-key lookup, and a key whose TAT has passed is
+indistinguishable from a fresh one, so stale keys can simply be evicted.
+
+Backends are pluggable: MemoryLimitStore keeps counters per process, and
+SQLiteLimitStore lets every worker on a host share them through a local
+SQLite file (RATE_LIMIT_BACKEND=sqlite, RATE_LIMIT_DB_PATH).
+"""
+import heapq
+import math
+import os
+import threading
+import time
+
+from metrics import RATE_LIMITED
+from models.database import ConnectionPool
+
+RATE_LIMIT_BACKENDS = ("memory", "sqlite")
+
+# Applied by models/migrations.py to the RATE_LIMIT_DB_PATH file
+CREATE_RATE_LIMITS = '''
+    CREATE TABLE IF NOT EXISTS rate_limits (
+        key TEXT PRIMARY KEY,
+        tat REAL NOT NULL
+    ) WITHOUT ROWID
+'''
+CREATE_TAT_INDEX = 'CREATE INDEX IF NOT EXISTS idx_rate_limits_tat ON rate_limits (tat)'
+SELECT_TAT = 'SELECT tat FROM rate_limits WHERE key = ?'
+UPSERT_TAT = '''
+    INSERT INTO rate_limits (key, tat) VALUES (?, ?)
+    ON CONFLICT (key) DO UPDATE SET tat = excluded.tat
+'''
+DELETE_TAT = 'DELETE FROM rate_limits WHERE key = ?'
+REFUND_TAT = 'UPDATE rate_limits SET tat = tat - ? WHERE key = ?'
+DELETE_EXPIRED_BATCH = '''
+    DELETE FROM rate_limits WHERE key IN (
+        SELECT key FROM rate_limits WHERE tat <= ? ORDER BY tat LIMIT ?
+    )
+'''
+
+
+def gcra(tat, now, interval, tolerance):
+    """(new TAT or None if denied, seconds until the next attempt would be allowed)"""
+    tat = max(tat or now, now)
+    if tat - now > tolerance:
+        return None, tat - now - tolerance
+    return tat + interval, 0.0
+
+
+def parse_rate(value):
+    """(limit, period seconds) from "limit/period", e.g. "5/300" """
+    limit, period = value.split("/", 1)
+    limit, period = int(limit), float(period)
+    if limit < 1 or period <= 0:
+        raise ValueError(f"Invalid rate {value!r}")
+    return limit, period
+
+
+class MemoryLimitStore:
+    """Per-process TATs, with a heap of (TAT, key) so keys are evicted in expiry order.
+
+    Limits with different intervals share the store, so update order is not
+    expiry order. Eviction runs every ``evict_interval`` seconds and pops the
+    heap up to the first live entry, skipping entries a later hit superseded,
+    so it is amortised O(log n) per check. Past ``max_keys`` the keys closest
+    to expiry are dropped, which only ever makes limits laxer.
+    """
+
+    def __init__(self, max_keys=100000, evict_interval=10.0):
+        self.max_keys = max_keys
+        self.evict_interval = evict_interval
+        self._tats = {}
+        self._expiry = []  # (tat, key), including entries superseded by a later hit
+        self._lock = threading.Lock()
+        self._next_eviction = 0.0
+
+    def hit(self, key, now, interval, tolerance):
+        with self._lock:
+            if now >= self._next_eviction:
+                self._evict(now)
+            tat, retry_after = gcra(self._tats.get(key), now, interval, tolerance)
+            if tat is not None:
+                self._set(key, tat)
+                while len(self._tats) > self.max_keys:
+                    self._pop()
+        return tat is not None, retry_after
+
+    def refund(self, key, interval):
+        with self._lock:
+            tat = self._tats.get(key)
+            if tat is not None:
+                self._set(key, tat - interval)
+
+    def reset(self, key):
+        with self._lock:
+            self._tats.pop(key, None)
+
+    def _set(self, key, tat):
+        self._tats[key] = tat
+        heapq.heappush(self._expiry, (tat, key))
+
+    def _pop(self):
+        tat, key = heapq.heappop(self._expiry)
+        if self._tats.get(key) == tat:
+            del self._tats[key]
+
+    def _evict(self, now):
+        self._next_eviction = now + self.evict_interval
+        while self._expiry and self._expiry[0][0] <= now:
+            self._pop()
+
+    def __len__(self):
+        return len(self._tats)
+
+
+class SQLiteLimitStore:
+    """TATs in a SQLite file shared by every worker process on the host.
+
+    Each check reads and writes its key inside one IMMEDIATE transaction, so
+    concurrent workers cannot both take the last slot.
+    """
+
+    def __init__(self, db_path, pool=None, evict_interval=60.0, evict_batch=1000):
+        self.pool = pool or ConnectionPool(db_path, size=4)
+        self.evict_interval = evict_interval
+        self.evict_batch = evict_batch
+        self._next_eviction = 0.0
+
+    def hit(self, key, now, interval, tolerance):
+        if now >= self._next_eviction:
+            self._evict(now)
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(SELECT_TAT, (key,)).fetchone()
+                tat, retry_after = gcra(row[0] if row else None, now, interval, tolerance)
+                if tat is not None:
+                    conn.execute(UPSERT_TAT, (key, tat))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return tat is not None, retry_after
+
+    def refund(self, key, interval):
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute(REFUND_TAT, (interval, key))
+
+    def reset(self, key):
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute(DELETE_TAT, (key,))
+
+    def _evict(self, now):
+        # Bounded, so a backlog of expired keys is cleared over several intervals
+        self._next_eviction = now + self.evict_interval
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute(DELETE_EXPIRED_BATCH, (now, self.evict_batch))
+
+
+class RateLimit:
+    """``limit`` attempts per ``period`` seconds for each key, sharing a store with other limits"""
+
+    def __init__(self, name, limit, period, store, clock=time.time):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.store = store
+        self.clock = clock
+        # GCRA parameters: one attempt per interval, with a burst of `limit`
+        self.interval = period / limit
+        self.tolerance = period - self.interval
+
+    def hit(self, key):
+        """Count one attempt for key; returns (allowed, seconds to wait before retrying)"""
+        allowed, retry_after = self.store.hit(f"{self.name}:{key}", self.clock(), self.interval, self.tolerance)
+        if allowed:
+            return True, 0
+        RATE_LIMITED.inc(limit=self.name)
+        return False, max(1, math.ceil(retry_after))
+
+    def refund(self, key):
+        """Give back one allowed attempt of key, so it only counts if it turns out to fail"""
+        self.store.refund(f"{self.name}:{key}", self.interval)
+
+    def reset(self, key):
+        """Forget the attempts of key, e.g. after a successful login"""
+        self.store.reset(f"{self.name}:{key}")
+
+
+def make_limit_store(backend=None, db_path=None):
+    """Limit store selected by RATE_LIMIT_BACKEND (memory by default)"""
+    backend = backend or os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    if backend == "memory":
+        return MemoryLimitStore()
+    if backend == "sqlite":
+        return SQLiteLimitStore(db_path or os.environ.get('RATE_LIMIT_DB_PATH', 'rate_limits.db'))
+    raise ValueError(f"RATE_LIMIT_BACKEND must be one of: {', '.join(RATE_LIMIT_BACKENDS)}")
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify, session
+from inference.artifact import load_manifest
+from models.assessment import MAX_TIMESTAMP, AssessmentModel, AssessmentWriter
+from routes.auth import user_model
+import os
+
+assessments_bp = Blueprint('assessments', __name__)
+
+# History lives in the users database and shares its connection pool
+assessment_model = AssessmentModel(user_model.pool)
+assessment_writer = AssessmentWriter(
+    assessment_model,
+    batch_size=int(os.environ.get('ASSESSMENT_BATCH_SIZE', 256)),
+    flush_interval=float(os.environ.get('ASSESSMENT_FLUSH_MS', 500)) / 1000,
+    max_queue=int(os.environ.get('ASSESSMENT_QUEUE_SIZE', 10000))
+)
+
+MAX_PAGE_SIZE = 500
+BUCKETS_MS = {"hour": 3_600_000, "day": 86_400_000, "week": 604_800_000}
+
+def check_range(value):
+    # Anything larger would overflow SQLite's 64-bit integers and fail as a 500
+    if not 0 <= value <= MAX_TIMESTAMP:
+        raise ValueError(f"{value} is out of range")
+    return value
+
+def parse_timestamp(value, default):
+    """Epoch milliseconds or an ISO 8601 timestamp (UTC if no offset)"""
+    if value is None or value == "":
+        return default
+    if value.isdigit():
+        return check_range(int(value))
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return check_range(int(parsed.timestamp() * 1000))
+
+def isoformat(timestamp_ms):
+    return datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc).isoformat()
+
+def parse_cursor(value):
+    if not value:
+        return None
+    created_at, assessment_id = value.split("-", 1)
+    return check_range(int(created_at)), check_range(int(assessment_id))
+
+def feature_map(features, model_version):
+    """Name the stored feature values using the manifest of the model that produced them"""
+    manifest = load_manifest(model_version) if model_version else None
+    names = manifest.get("feature_names") if manifest else None
+    if not names or len(names) != len(features):
+        return features
+    return dict(zip(names, features))
+
+def time_range():
+    return (parse_timestamp(request.args.get('from'), 0),
+            parse_timestamp(request.args.get('to'), MAX_TIMESTAMP))
+
+@assessments_bp.route('', methods=['GET'])
+def list_assessments():
+    """Newest-first assessment history of the logged-in user, paginated by cursor"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"success": False, "message": "Not authenticated"}), 401
+
+    try:
+        start, end = time_range()
+        before = parse_cursor(request.args.get('cursor'))
+        limit = min(max(int(request.args.get('limit', 50)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid from, to, cursor or limit parameter"}), 400
+
+    rows, next_cursor = assessment_model.page(user_id, start, end, before, limit)
+    for row in rows:
+        row["features"] = feature_map(row["features"], row["model_version"])
+        row["created_at"] = isoformat(row["created_at"])
+    return jsonify({
+        "success": True,
+        "assessments": rows,
+        "count": len(rows),
+        "next_cursor": f"{next_cursor[0]}-{next_cursor[1]}" if next_cursor else None
+    }), 200
+
+@assessments_bp.route('/trend', methods=['GET'])
+def assessment_trend():
+    """Per hour/day/week risk statistics for the logged-in user's charts"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"success": False, "message": "Not authenticated"}), 401
+
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in BUCKETS_MS:
+        return jsonify({"success": False, "message": f"bucket must be one of: {', '.join(BUCKETS_MS)}"}), 400
+    try:
+        start, end = time_range()
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid from or to parameter"}), 400
+
+    points = assessment_model.trend(user_id, start, end, BUCKETS_MS[bucket])
+    for point in points:
+        point["start"] = isoformat(point["start"])
+    return jsonify({"success": True, "bucket": bucket, "points": points}), 200
@@ -1,24 +1,34 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, request, jsonify, session
+from models.hashing import HashingBusy
 from models.user import UserModel
-import re
+from ratelimit import RateLimit, make_limit_store, parse_rate
+from schemas import LOGIN_SCHEMA, PROFILE_SCHEMA, REGISTER_SCHEMA, ValidationError, first_message
+import os
 
 auth_bp = Blueprint('auth', __name__)
-user_model = UserModel()
+user_model = UserModel(os.environ.get('USERS_DB_PATH', 'users.db'))
 
-def validate_email(email):
-    """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+# Login attempts per client IP and per email ("limit/seconds"), checked before any hashing or query.
+# Successful logins are refunded, so a clinic logging in behind one NAT address only spends failures.
+limit_store = make_limit_store()
+login_ip_limit = RateLimit("login_ip", *parse_rate(os.environ.get('LOGIN_IP_RATE', '20/60')), limit_store)
+login_email_limit = RateLimit("login_email", *parse_rate(os.environ.get('LOGIN_EMAIL_RATE', '5/300')), limit_store)
 
-def validate_password(password):
-    """Validate password strength"""
-    if len(password) < 8:
-        return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Za-z]', password):
-        return False, "Password must contain at least one letter"
-    if not re.search(r'\d', password):
-        return False, "Password must contain at least one number"
-    return True, "Password is valid"
+@auth_bp.errorhandler(HashingBusy)
+def hashing_busy(e):
+    """Shed register/login load when the password hashing pool is saturated"""
+    response = jsonify({"success": False, "message": str(e)})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, e.status_code
+
+def too_many_attempts(retry_after):
+    response = jsonify({"success": False, "message": "Too many login attempts. Please try again later."})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+def invalid(e):
+    """400 response for a payload that failed its schema"""
+    return jsonify({"success": False, "message": first_message(e.errors), "errors": e.errors}), 400
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -29,49 +39,15 @@ def register():
         if not data:
             return jsonify({"success": False, "message": "No data provided"}), 400
         
-        # Extract and validate required fields
-        first_name = data.get('firstName', '').strip()
-        last_name = data.get('lastName', '').strip()
-        email = data.get('email', '').strip().lower()
-        phone = data.get('phone', '').strip()
-        password = data.get('password', '')
-        confirm_password = data.get('confirmPassword', '')
-        agree_to_terms = data.get('agreeToTerms', False)
-        
-        # Validation
-        if not all([first_name, last_name, email, password]):
-            return jsonify({
-                "success": False, 
-                "message": "All required fields must be filled"
-            }), 400
-        
-        if not validate_email(email):
-            return jsonify({
-                "success": False, 
-                "message": "Invalid email format"
-            }), 400
-        
-        if password != confirm_password:
-            return jsonify({
-                "success": False, 
-                "message": "Passwords do not match"
-            }), 400
-        
-        is_valid, password_message = validate_password(password)
-        if not is_valid:
-            return jsonify({
-                "success": False, 
-                "message": password_message
-            }), 400
-        
-        if not agree_to_terms:
-            return jsonify({
-                "success": False, 
-                "message": "You must agree to the terms and conditions"
-            }), 400
+        # Validate all fields in one pass before touching the database
+        try:
+            data = REGISTER_SCHEMA.validate(data)
+        except ValidationError as e:
+            return invalid(e)
         
         # Create user
-        result = user_model.create_user(first_name, last_name, email, phone, password)
+        result = user_model.create_user(data['firstName'], data['lastName'], data['email'],
+                                        data.get('phone', ''), data['password'])
         
         if result["success"]:
             return jsonify({
@@ -82,6 +58,8 @@ def register():
         else:
             return jsonify(result), 400
             
+    except HashingBusy:
+        raise
     except Exception as e:
         return jsonify({
             "success": False, 
@@ -91,37 +69,36 @@ def register():
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """User login endpoint"""
+    allowed, retry_after = login_ip_limit.hit(request.remote_addr)
+    if not allowed:
+        return too_many_attempts(retry_after)
+
     try:
         data = request.json
         
         if not data:
             return jsonify({"success": False, "message": "No data provided"}), 400
         
-        email = data.get('email', '').strip().lower()
-        password = data.get('password', '')
-        remember_me = data.get('rememberMe', False)
+        try:
+            data = LOGIN_SCHEMA.validate(data)
+        except ValidationError as e:
+            return invalid(e)
         
-        # Validation
-        if not email or not password:
-            return jsonify({
-                "success": False, 
-                "message": "Email and password are required"
-            }), 400
-        
-        if not validate_email(email):
-            return jsonify({
-                "success": False, 
-                "message": "Invalid email format"
-            }), 400
+        allowed, retry_after = login_email_limit.hit(data['email'])
+        if not allowed:
+            return too_many_attempts(retry_after)
         
         # Authenticate user
-        result = user_model.authenticate_user(email, password)
+        result = user_model.authenticate_user(data['email'], data['password'])
         
         if result["success"]:
-            # Store user session
+            login_ip_limit.refund(request.remote_addr)
+            login_email_limit.reset(data['email'])
+            # Store user session under a fresh id, dropping any previous one
+            session.clear()
             session['user_id'] = result["user"]["id"]
             session['user_email'] = result["user"]["email"]
-            session.permanent = remember_me
+            session.permanent = data.get('rememberMe', False)
             
             return jsonify({
                 "success": True,
@@ -131,6 +108,8 @@ def login():
         else:
             return jsonify(result), 401
             
+    except HashingBusy:
+        raise
     except Exception as e:
         return jsonify({
             "success": False, 
@@ -139,8 +118,11 @@ def login():
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
-    """User logout endpoint"""
+    """User logout endpoint; ?all=1 also revokes the user's sessions on every other device"""
     try:
+        user_id = session.get('user_id')
+        if user_id and request.args.get('all') in ('1', 'true'):
+            current_app.session_interface.revoke_user(user_id)
         session.clear()
         return jsonify({
             "success": True,
@@ -197,19 +179,10 @@ def update_profile():
             return jsonify({"success": False, "message": "No data provided"}), 400
         
         # Extract updateable fields
-        update_data = {}
-        for field in ['first_name', 'last_name', 'email', 'phone']:
-            if field in data and data[field]:
-                if field == 'email':
-                    email = data[field].strip().lower()
-                    if not validate_email(email):
-                        return jsonify({
-                            "success": False, 
-                            "message": "Invalid email format"
-                        }), 400
-                    update_data[field] = email
-                else:
-                    update_data[field] = data[field].strip()
+        try:
+            update_data = PROFILE_SCHEMA.validate(data)
+        except ValidationError as e:
+            return invalid(e)
         
         if not update_data:
             return jsonify({
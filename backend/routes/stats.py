@@ -0,0 +1,63 @@
+from flask import Blueprint, request, jsonify
+from population import FEATURES, SEGMENT_COLUMNS, ZERO_MEANS_MISSING, PopulationStats, age_band
+import math
+
+stats_bp = Blueprint('stats', __name__)
+
+# Built from the training CSV on first use; merge newer data in with population_stats.add()
+population_stats = PopulationStats()
+
+def parse_number(name, value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+@stats_bp.route('/percentiles', methods=['GET'])
+def percentiles():
+    """Percentile of each given measurement, e.g. ?Glucose=148&BMI=33.6&gender=Female&age=50
+
+    Compared within the requested gender / age band / outcome segment, widened
+    when that segment has too few people.
+    """
+    try:
+        values = {feature: parse_number(feature, request.args[feature])
+                  for feature in FEATURES if request.args.get(feature)}
+        age = request.args.get('age') or request.args.get('Age')
+        band = age_band(parse_number('age', age)) if age else None
+        outcome = request.args.get('outcome')
+        if outcome not in (None, '', '0', '1'):
+            raise ValueError("outcome must be 0 or 1")
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    if not values:
+        return jsonify({"success": False,
+                        "message": f"Provide at least one of: {', '.join(FEATURES)}"}), 400
+
+    gender = request.args.get('gender')
+    # Match the gender spelling used in the data, like the prediction schema does
+    gender = {"female": "Female", "male": "Male"}.get(gender.strip().casefold(), gender) if gender else None
+    outcome = int(outcome) if outcome else None
+
+    index = population_stats.get()
+    results = {}
+    for feature, value in values.items():
+        segment, distribution = index.lookup(feature, gender, band, outcome)
+        # 0 is the "not measured" code for these features, so it has no meaningful percentile
+        if distribution is None or (value == 0 and feature in ZERO_MEANS_MISSING):
+            results[feature] = None
+            continue
+        results[feature] = {
+            "value": value,
+            "percentile": round(distribution.percentile(value), 1),
+            "count": distribution.count,
+            "segment": dict(zip(SEGMENT_COLUMNS, segment)),
+            "p25": distribution.quantile(0.25),
+            "median": distribution.quantile(0.5),
+            "p75": distribution.quantile(0.75),
+        }
+    return jsonify({"success": True, "percentiles": results}), 200
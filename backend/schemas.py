@@ -0,0 +1,290 @@
+# backend/schemas.py
+"""Declarative request schemas compiled into fast validators.
+
+A schema is a mapping of field name to ``Field``. ``Schema`` compiles every
+field once into a short chain of converter and check closures (regexes are
+compiled up front), so validating a payload is a single pass that never
+touches pandas, the model or the database. Failures are collected per field
+and raised together as a ``ValidationError``.
+"""
+import math
+import re
+
+# Bounds are generous physiological limits; the training CSV sits well inside them
+FEATURE_RANGES = {
+    "Age": (0, 120),
+    "Pregnancies": (0, 30),
+    "Glucose": (0, 600),
+    "BloodPressure": (0, 300),
+    "SkinThickness": (0, 150),
+    "Insulin": (0, 1500),
+    "BMI": (0, 100),
+    "DiabetesPedigreeFunction": (0, 5),
+}
+
+# The risk form posts activity as numbers (1 = regular, 0.5 = some, 0 = little exercise)
+CATEGORY_ALIASES = {
+    "physical_activity": {"1": "High", "1.0": "High", "0.5": "Medium", "0": "Low", "0.0": "Low"},
+}
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+PHONE_PATTERN = r'^[0-9+()\-. ]{0,32}$'
+PASSWORD_RULES = (
+    (r'(?s)^.{8,}', "Password must be at least 8 characters long"),
+    (r'[A-Za-z]', "Password must contain at least one letter"),
+    (r'\d', "Password must contain at least one number"),
+)
+
+REQUIRED_MESSAGE = "This field is required"
+
+
+class ValidationError(ValueError):
+    """A payload failed its schema; ``errors`` maps field names to messages"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(f"{field}: {message}" for field, message in errors.items()))
+
+    def as_dict(self):
+        return {"error": str(self), "errors": self.errors, "status": "error"}
+
+
+class Invalid(Exception):
+    """Raised by a field converter with the message for that field"""
+
+
+class Field:
+    """Declaration of one payload field; compile() turns it into a converter"""
+
+    def __init__(self, kind="string", required=False, minimum=None, maximum=None, choices=None, aliases=None,
+                 pattern=None, pattern_message="Invalid format", min_length=None, max_length=None, strip=True,
+                 lower=False, rules=(), other=False):
+        self.kind = kind
+        self.required = required
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.aliases = aliases or {}
+        self.pattern = pattern
+        self.pattern_message = pattern_message
+        self.min_length = min_length
+        self.max_length = max_length
+        self.strip = strip
+        self.lower = lower
+        self.rules = rules
+        # A choice field that passes other strings through unchanged
+        self.other = other
+
+    def compile(self):
+        steps = [getattr(self, f"_compile_{self.kind}")()]
+
+        if self.minimum is not None or self.maximum is not None:
+            low = -math.inf if self.minimum is None else self.minimum
+            high = math.inf if self.maximum is None else self.maximum
+            message = f"Must be between {self.minimum} and {self.maximum}"
+
+            def check_range(value, message=message):
+                if not low <= value <= high:
+                    raise Invalid(message)
+                return value
+            steps.append(check_range)
+
+        if self.min_length is not None:
+            min_length, message = self.min_length, f"Must be at least {self.min_length} characters long"
+
+            def check_min_length(value, message=message):
+                if len(value) < min_length:
+                    raise Invalid(message)
+                return value
+            steps.append(check_min_length)
+
+        if self.max_length is not None:
+            max_length, message = self.max_length, f"Must be at most {self.max_length} characters long"
+
+            def check_max_length(value, message=message):
+                if len(value) > max_length:
+                    raise Invalid(message)
+                return value
+            steps.append(check_max_length)
+
+        for pattern, message in ((self.pattern, self.pattern_message),) + tuple(self.rules):
+            if pattern is None:
+                continue
+            search = re.compile(pattern).search
+
+            def check_pattern(value, search=search, message=message):
+                if search(value) is None:
+                    raise Invalid(message)
+                return value
+            steps.append(check_pattern)
+
+        if len(steps) == 1:
+            return steps[0]
+
+        def convert(value):
+            for step in steps:
+                value = step(value)
+            return value
+        return convert
+
+    def _compile_number(self):
+        def to_number(value):
+            # bool is an int subclass, but True is not a measurement
+            if isinstance(value, bool):
+                raise Invalid("Must be a number")
+            if isinstance(value, str):
+                try:
+                    value = float(value)
+                except ValueError:
+                    raise Invalid("Must be a number")
+            elif not isinstance(value, (int, float)):
+                raise Invalid("Must be a number")
+            if not math.isfinite(value):
+                raise Invalid("Must be a finite number")
+            return float(value)
+        return to_number
+
+    def _compile_string(self):
+        strip, lower = self.strip, self.lower
+
+        def to_string(value):
+            if not isinstance(value, str):
+                raise Invalid("Must be a string")
+            if strip:
+                value = value.strip()
+            return value.lower() if lower else value
+        return to_string
+
+    def _compile_boolean(self):
+        def to_boolean(value):
+            if not isinstance(value, bool):
+                raise Invalid("Must be true or false")
+            return value
+        return to_boolean
+
+    def _compile_choice(self):
+        # Matched case-insensitively, like FeatureEncoder, and returned in canonical form
+        lookup = {str(choice).casefold(): choice for choice in self.choices}
+        lookup.update({str(alias).casefold(): target for alias, target in self.aliases.items()})
+        message = f"Must be one of: {', '.join(str(choice) for choice in self.choices)}"
+        other = self.other
+
+        def to_choice(value):
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                raise Invalid(message)
+            key = value.strip().casefold() if isinstance(value, str) else str(value)
+            try:
+                return lookup[key]
+            except KeyError:
+                if other and isinstance(value, str):
+                    return value.strip()
+                raise Invalid(message)
+        return to_choice
+
+
+class Schema:
+    """Compiled validator for JSON object payloads"""
+
+    def __init__(self, fields, checks=()):
+        self.fields = dict(fields)
+        # (field, predicate(clean), message) evaluated once every field is valid
+        self.checks = tuple(checks)
+        self._compiled = tuple((name, field.required, field.compile()) for name, field in self.fields.items())
+
+    def converter(self, name):
+        """Compiled converter of one field, raising Invalid for bad values"""
+        for field, _, convert in self._compiled:
+            if field == name:
+                return convert
+        raise KeyError(name)
+
+    def validate(self, payload):
+        """Return the cleaned payload (known, non-empty fields only) or raise ValidationError"""
+        if not isinstance(payload, dict):
+            raise ValidationError({"_": "Expected a JSON object"})
+
+        clean = {}
+        errors = {}
+        for name, required, convert in self._compiled:
+            value = payload.get(name)
+            if value is None or value == "":
+                if required:
+                    errors[name] = REQUIRED_MESSAGE
+                continue
+            try:
+                value = convert(value)
+            except Invalid as e:
+                errors[name] = str(e)
+                continue
+            if required and value == "":
+                errors[name] = REQUIRED_MESSAGE
+            else:
+                clean[name] = value
+
+        if not errors:
+            for name, predicate, message in self.checks:
+                if not predicate(clean):
+                    errors[name] = message
+        if errors:
+            raise ValidationError(errors)
+        return clean
+
+
+def prediction_schema(encoder):
+    """Schema for /predict records, with the categorical levels the model was trained on"""
+    claimed = {f"{column}_{level}" for column, levels in encoder.categories.items() for level in levels}
+    fields = {}
+    for name in encoder.feature_names:
+        if name not in claimed:
+            minimum, maximum = FEATURE_RANGES.get(name, (None, None))
+            fields[name] = Field("number", minimum=minimum, maximum=maximum)
+    for column, levels in encoder.categories.items():
+        # Without the dropped baseline level (legacy pickles), any other level encodes as the baseline
+        fields[column] = Field("choice", choices=levels, aliases=CATEGORY_ALIASES.get(column),
+                               other=not encoder.baselines_known)
+    return Schema(fields)
+
+
+def first_message(errors):
+    """Single message for clients that only show one, preferring missing required fields"""
+    if REQUIRED_MESSAGE in errors.values():
+        return "All required fields must be filled"
+    return next(iter(errors.values()))
+
+
+EMAIL = Field("string", required=True, lower=True, max_length=254, pattern=EMAIL_PATTERN,
+              pattern_message="Invalid email format")
+NAME = Field("string", required=True, max_length=100)
+PHONE = Field("string", max_length=32, pattern=PHONE_PATTERN, pattern_message="Invalid phone number")
+
+REGISTER_SCHEMA = Schema(
+    {
+        "firstName": NAME,
+        "lastName": NAME,
+        "email": EMAIL,
+        "phone": PHONE,
+        "password": Field("string", required=True, strip=False, max_length=1024, rules=PASSWORD_RULES),
+        "confirmPassword": Field("string", strip=False),
+        "agreeToTerms": Field("boolean"),
+    },
+    checks=(
+        ("confirmPassword", lambda clean: clean.get("confirmPassword") == clean["password"],
+         "Passwords do not match"),
+        ("agreeToTerms", lambda clean: clean.get("agreeToTerms") is True,
+         "You must agree to the terms and conditions"),
+    ),
+)
+
+LOGIN_SCHEMA = Schema({
+    "email": EMAIL,
+    "password": Field("string", required=True, strip=False, max_length=1024),
+    "rememberMe": Field("boolean"),
+})
+
+PROFILE_SCHEMA = Schema({
+    "first_name": Field("string", max_length=100),
+    "last_name": Field("string", max_length=100),
+    "email": Field("string", lower=True, max_length=254, pattern=EMAIL_PATTERN,
+                   pattern_message="Invalid email format"),
+    "phone": PHONE,
+})
@@ -0,0 +1,323 @@
+# backend/score_file.py
+"""Score a CSV or Parquet file offline with the model the API serves.
+
+    python score_file.py registry.csv scored.csv
+    python score_file.py registry.parquet scored.parquet --workers 4 --recommendations
+    python score_file.py registry.csv scored.csv --resume
+
+The input is streamed in chunks and each chunk is validated, encoded and
+scored as one matrix with the same schema, encoder, artifact and
+recommendation rules as /predict. Rows that fail the schema are written
+with empty prediction columns and the reason in the `error` column.
+With --workers, chunks are scored in a process pool (each worker memory-maps
+the artifact) and written back in input order.
+
+Progress is checkpointed after every written chunk in <output>.progress.json.
+--resume skips the rows already written, truncating any partially written
+tail, and refuses to continue with a different model version or input file.
+CSV output is a single file; Parquet output is a directory of part files.
+Parquet needs pyarrow.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from inference.artifact import ARTIFACT_DIR, LEGACY_MODEL_PATH, LEGACY_VERSION, ModelStore, load_artifact, \
+    load_legacy_pickle
+from inference.encoder import CATEGORICAL_COLUMNS
+from inference.scorer import get_risk_levels
+from ingest import encode_chunk
+from schemas import Invalid, ValidationError
+
+OUTPUT_COLUMNS = ("prediction", "probability", "risk_level", "risk_percentage", "error")
+RECOMMENDATION_SEPARATOR = " | "
+
+# Bundle loaded once per pool worker by _init_worker
+_worker = {}
+
+
+def is_parquet(path):
+    return path.endswith((".parquet", ".pq"))
+
+
+def require_pyarrow():
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        sys.exit("Parquet files need pyarrow: pip install pyarrow")
+    return pyarrow.parquet
+
+
+def load_bundle(root=ARTIFACT_DIR, version=None, legacy_path=LEGACY_MODEL_PATH):
+    """An explicit version (LEGACY_VERSION for the pickle), else what the API serves"""
+    if version is None:
+        bundle = ModelStore(root, legacy_path).get()
+    elif version == LEGACY_VERSION:
+        bundle = load_legacy_pickle(legacy_path) if os.path.exists(legacy_path) else None
+    else:
+        bundle = load_artifact(version, root)
+    if bundle is None:
+        sys.exit("No model artifact or model.pkl found")
+    return bundle
+
+
+def read_input(path, chunksize, skip_rows=0):
+    """Yield DataFrame chunks of the input, starting after skip_rows rows"""
+    if is_parquet(path):
+        parquet = require_pyarrow()
+        for batch in parquet.ParquetFile(path).iter_batches(batch_size=chunksize):
+            if skip_rows >= batch.num_rows:
+                skip_rows -= batch.num_rows
+                continue
+            yield batch.slice(skip_rows).to_pandas()
+            skip_rows = 0
+        return
+
+    header = pd.read_csv(path, nrows=0).columns
+    # Numeric columns are inferred rather than forced to ingest.DTYPES, so one malformed value
+    # fails its row in validate_frame instead of the whole read
+    dtype = {column: "category" for column in header if column in CATEGORICAL_COLUMNS}
+    yield from pd.read_csv(path, chunksize=chunksize, dtype=dtype,
+                           skiprows=range(1, skip_rows + 1) if skip_rows else None)
+
+
+def validate_frame(schema, frame):
+    """Clean a chunk with the schema's field converters, called once per distinct value of each column
+
+    Returns the cleaned columns and {row position: {field: message}} for the rows that fail.
+    Missing and empty values are skipped, like absent fields in a /predict record.
+    """
+    clean = {}
+    errors = {}
+    for name in schema.fields:
+        if name not in frame:
+            continue
+        convert = schema.converter(name)
+        codes, uniques = pd.factorize(frame[name])
+        # One slot per distinct value, plus a trailing None that missing values (code -1) pick up
+        values = np.full(len(uniques) + 1, None, dtype=object)
+        invalid = np.zeros(len(uniques) + 1, dtype=bool)
+        messages = {}
+        for i, value in enumerate(uniques.tolist()):
+            if value == "":
+                continue
+            try:
+                values[i] = convert(value)
+            except Invalid as e:
+                invalid[i] = True
+                messages[i] = str(e)
+        clean[name] = values[codes]
+        for row in np.flatnonzero(invalid[codes]):
+            errors.setdefault(int(row), {})[name] = messages[codes[row]]
+    return pd.DataFrame(clean, index=range(len(frame))), errors
+
+
+def score_frame(bundle, frame, keep=None, recommendations=False):
+    """Score a chunk, returning the kept input columns followed by the prediction columns"""
+    clean, errors = validate_frame(bundle.schema, frame)
+    # float64 like /predict, so threshold rules such as BMI > 30 agree at the boundary
+    X = encode_chunk(clean, bundle.encoder, dtype=np.float64)
+    predictions, positive = bundle.scorer.score_matrix(X)
+    levels = get_risk_levels(positive)
+
+    # Failed rows are scored with the rest (as zeros) and blanked here, which keeps one matrix per chunk
+    failed = np.zeros(len(frame), dtype=bool)
+    failed[list(errors)] = True
+    error = np.full(len(frame), None, dtype=object)
+    for row, fields in errors.items():
+        error[row] = str(ValidationError(fields))
+
+    scored = frame if keep is None else frame[[column for column in keep if column in frame]]
+    scored = scored.reset_index(drop=True).assign(
+        prediction=pd.array(np.where(failed, None, predictions.astype(np.int64)), dtype="Int64"),
+        probability=np.where(failed, np.nan, positive),
+        # String dtypes, so Parquet parts agree on the type even when a chunk has no failures
+        risk_level=pd.array(np.where(failed, None, levels), dtype="string"),
+        risk_percentage=np.where(failed, np.nan, np.round(positive * 100, 2)),
+        error=pd.array(error, dtype="string"),
+    )
+    if recommendations:
+        rule_ids = bundle.recommender.recommend_batch(X, levels)
+        scored["recommendations"] = [None if bad else RECOMMENDATION_SEPARATOR.join(bundle.recommender.messages(ids))
+                                     for bad, ids in zip(failed, rule_ids)]
+    return scored
+
+
+def _init_worker(root, version, legacy_path):
+    _worker["bundle"] = load_bundle(root, version, legacy_path)
+
+
+def _score_in_worker(frame, keep, recommendations):
+    return score_frame(_worker["bundle"], frame, keep, recommendations)
+
+
+class Checkpoint:
+    """Progress of one output file, persisted atomically after every chunk"""
+
+    def __init__(self, output, state):
+        self.path = f"{output.rstrip(os.sep)}.progress.json"
+        self.state = state
+
+    @classmethod
+    def load(cls, output):
+        checkpoint = cls(output, None)
+        try:
+            with open(checkpoint.path) as f:
+                checkpoint.state = json.load(f)
+        except FileNotFoundError:
+            return None
+        return checkpoint
+
+    def save(self, **changes):
+        self.state.update(changes)
+        staging = f"{self.path}.tmp"
+        with open(staging, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(staging, self.path)
+
+
+def input_fingerprint(path):
+    stat = os.stat(path)
+    return {"input": os.path.abspath(path), "input_size": stat.st_size, "input_mtime": stat.st_mtime}
+
+
+class CSVSink:
+    """Append chunks to one CSV file, truncating to the last checkpoint on resume"""
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        mode = "r+b" if offset and os.path.exists(path) else "wb"
+        self.file = open(path, mode)
+        self.file.truncate(offset)
+        self.file.seek(offset)
+        self.parts = 0
+
+    def write(self, frame):
+        frame.to_csv(self.file, header=self.file.tell() == 0, index=False)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {"output_bytes": self.file.tell()}
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Write each chunk as its own part file, dropping parts past the checkpoint on resume"""
+
+    def __init__(self, path, parts=0):
+        self.parquet = require_pyarrow()
+        self.path = path
+        self.parts = parts
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.startswith("part-") and int(name[5:10]) >= parts:
+                os.remove(os.path.join(path, name))
+
+    def write(self, frame):
+        import pyarrow
+
+        name = os.path.join(self.path, f"part-{self.parts:05d}.parquet")
+        self.parquet.write_table(pyarrow.Table.from_pandas(frame, preserve_index=False), f"{name}.tmp")
+        os.replace(f"{name}.tmp", name)
+        self.parts += 1
+        return {"output_parts": self.parts}
+
+    def close(self):
+        pass
+
+
+def run(args):
+    bundle = load_bundle(args.artifacts, args.version)
+    fingerprint = input_fingerprint(args.input)
+
+    checkpoint = Checkpoint.load(args.output) if args.resume else None
+    if checkpoint is not None:
+        state = checkpoint.state
+        if state["model_version"] != bundle.version:
+            sys.exit(f"Cannot resume: output was scored with {state['model_version']}, "
+                     f"current model is {bundle.version} (pass --version {state['model_version']})")
+        if {key: state[key] for key in fingerprint} != fingerprint:
+            sys.exit("Cannot resume: the input file changed since the interrupted run")
+        if state.get("complete"):
+            print(f"Nothing to do: {args.output} is already complete ({state['rows_done']} rows)")
+            return
+        print(f"Resuming after {state['rows_done']} rows")
+    else:
+        checkpoint = Checkpoint(args.output, {"model_version": bundle.version, **fingerprint, "rows_done": 0,
+                                              "rows_failed": 0, "output_bytes": 0, "output_parts": 0, "complete": False})
+    state = checkpoint.state
+
+    if is_parquet(args.output):
+        sink = ParquetSink(args.output, state["output_parts"])
+    else:
+        sink = CSVSink(args.output, state["output_bytes"])
+    checkpoint.save()
+
+    chunks = read_input(args.input, args.chunksize, state["rows_done"])
+    started = time.perf_counter()
+    rows = 0
+    last_report = started
+
+    def commit(scored):
+        nonlocal rows, last_report
+        rows += len(scored)
+        # Checkpoints written before validation have no rows_failed
+        checkpoint.save(rows_done=state["rows_done"] + len(scored),
+                        rows_failed=state.get("rows_failed", 0) + int(scored["error"].notna().sum()),
+                        **sink.write(scored))
+        now = time.perf_counter()
+        if now - last_report >= args.report_every:
+            print(f"{state['rows_done']} rows written, {rows / (now - started):.0f} rows/s")
+            last_report = now
+
+    try:
+        if args.workers > 1:
+            with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                     initargs=(args.artifacts, bundle.version, LEGACY_MODEL_PATH)) as pool:
+                # Bound the chunks in flight so memory stays flat, and write them back in order
+                pending = deque()
+                for frame in chunks:
+                    pending.append(pool.submit(_score_in_worker, frame, args.keep, args.recommendations))
+                    if len(pending) >= args.workers * 2:
+                        commit(pending.popleft().result())
+                while pending:
+                    commit(pending.popleft().result())
+        else:
+            for frame in chunks:
+                commit(score_frame(bundle, frame, args.keep, args.recommendations))
+    finally:
+        sink.close()
+
+    checkpoint.save(complete=True)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Scored {rows} rows with model {bundle.version} in {elapsed:.1f}s "
+          f"({rows / elapsed if elapsed else 0:.0f} rows/s) -> {args.output}")
+    if state["rows_failed"]:
+        print(f"{state['rows_failed']} rows failed validation, see the error column")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file with the served model")
+    parser.add_argument("input")
+    parser.add_argument("output", help=".csv file or .parquet directory")
+    parser.add_argument("--artifacts", default=ARTIFACT_DIR, help="artifact root directory")
+    parser.add_argument("--version", default=None, help="artifact version (default: CURRENT)")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=1, help="score chunks in this many processes")
+    parser.add_argument("--keep", nargs="+", default=None, help="input columns to copy (default: all)")
+    parser.add_argument("--recommendations", action="store_true", help="add a recommendations column")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run")
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between progress lines")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
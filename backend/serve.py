@@ -0,0 +1,123 @@
+# backend/serve.py
+"""Pre-forking server: one master process and N uvicorn workers sharing a listening socket.
+
+    python serve.py --workers 4 --port 5000               # preload once, then fork the workers
+    python serve.py --workers 4 --port 5000 --no-preload  # fork first, each worker imports the app
+
+With preload (the default) the master imports the app, applies the schema
+migrations, maps the model and builds the population index, then forks.
+Workers start with all of it in place and share those pages copy-on-write,
+and a worker that dies is replaced by another fork in milliseconds instead
+of a fresh interpreter. gc.freeze() before forking moves the preloaded
+objects out of the collector's reach, so collections in the workers do not
+write to them and un-share their pages.
+
+Without preload the master imports nothing of the app and each worker
+starts cold, as with ``uvicorn --workers``; the app's heavy imports (pandas
+for the population index) are then deferred until a route needs them.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+# A worker that exits sooner than this after starting is respawned after the same delay, not in a tight loop
+RESPAWN_BACKOFF = 1.0
+
+
+def bind(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+def run_worker(sock, args):
+    """Serve on the inherited socket until uvicorn shuts down"""
+    import uvicorn
+
+    from asgi import application
+
+    config = uvicorn.Config(application, log_level=args.log_level, access_log=False,
+                            timeout_keep_alive=args.timeout_keep_alive)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(sock, args):
+    pid = os.fork()
+    if pid:
+        return pid
+    # Worker: uvicorn installs its own handlers; never return into the master's loop
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal.SIG_DFL)
+    try:
+        run_worker(sock, args)
+    except BaseException:
+        traceback.print_exc()
+        os._exit(1)
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=True,
+                        help="import and warm up the app in the master before forking (default)")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--timeout-keep-alive", type=int, default=5)
+    args = parser.parse_args()
+
+    sock = bind(args.host, args.port)
+    if args.preload:
+        started = time.perf_counter()
+        import app as api
+
+        api.preload()
+        gc.freeze()
+        print(f"Preloaded in {time.perf_counter() - started:.2f}s (master {os.getpid()})", file=sys.stderr,
+              flush=True)
+
+    workers = {}  # pid -> monotonic start time
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(args.workers):
+        workers[spawn(sock, args)] = time.monotonic()
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting", file=sys.stderr,
+              flush=True)
+        if time.monotonic() - started < RESPAWN_BACKOFF:
+            time.sleep(RESPAWN_BACKOFF)
+            if stopping:
+                continue
+        workers[spawn(sock, args)] = time.monotonic()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
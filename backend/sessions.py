@@ -0,0 +1,161 @@
+# backend/sessions.py
+"""Server-side Flask sessions behind an opaque cookie id.
+
+The cookie only carries a random 256-bit session id; the session data lives
+in a store (models.session_store) keyed by that id. Logging out deletes the
+row, so a copied cookie stops working immediately, and every session of a
+user can be revoked at once.
+
+Expiry slides: a session is only rewritten when its data changed or less
+than half of its lifetime is left, so a read-only request costs one primary
+key lookup. Expired sessions are removed by bounded sweeps that run at most
+once per SESSION_SWEEP_INTERVAL, on whichever request notices it is due.
+"""
+import os
+import secrets
+import threading
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from models.session_store import MemorySessionStore, SQLiteSessionStore
+
+SESSION_BACKENDS = ("sqlite", "memory")
+# Lifetime of sessions without "remember me"; permanent ones use PERMANENT_SESSION_LIFETIME
+SESSION_TTL = float(os.environ.get('SESSION_TTL', 24 * 3600))
+SESSION_SWEEP_INTERVAL = float(os.environ.get('SESSION_SWEEP_INTERVAL', 60))
+SESSION_SWEEP_BATCH = int(os.environ.get('SESSION_SWEEP_BATCH', 1000))
+SESSION_ID_BYTES = 32
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its id and whether it must be rotated"""
+
+    def __init__(self, initial=None, session_id=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.session_id = session_id
+        self.expires_at = expires_at
+        self.new = session_id is None
+        self.modified = False
+        self.rotate = False
+
+    def clear(self):
+        # A cleared session (logout, or login replacing an old one) gets a fresh id
+        super().clear()
+        self.rotate = True
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface storing session data server-side"""
+
+    def __init__(self, store, ttl=SESSION_TTL, sweep_interval=SESSION_SWEEP_INTERVAL,
+                 sweep_batch=SESSION_SWEEP_BATCH):
+        self.store = store
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.sweep_batch = sweep_batch
+        self.serializer = TaggedJSONSerializer()
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval
+        self.swept = 0
+
+    def lifetime(self, app, session):
+        if session.permanent:
+            return app.permanent_session_lifetime.total_seconds()
+        return self.ttl
+
+    def load(self, session_id):
+        """Session data for a cookie value, or None if unknown, expired or malformed"""
+        # Reject anything that cannot be one of our ids before touching the store
+        if not session_id or len(session_id) > 64:
+            return None
+        entry = self.store.get(session_id)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        return self.serializer.loads(data), expires_at
+
+    def open_session(self, app, request):
+        self.maybe_sweep()
+        session_id = request.cookies.get(self.get_cookie_name(app))
+        loaded = self.load(session_id)
+        if loaded is None:
+            return ServerSession()
+        return ServerSession(loaded[0], session_id, loaded[1])
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.rotate and session.session_id is not None:
+            self.store.delete(session.session_id)
+            session.session_id = None
+
+        if not session:
+            if session.modified and not session.new:
+                response.delete_cookie(name, domain=domain, path=path, secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        lifetime = self.lifetime(app, session)
+        now = time.time()
+        if session.session_id is None:
+            session.session_id = secrets.token_urlsafe(SESSION_ID_BYTES)
+        elif not session.modified and session.expires_at - now > lifetime / 2:
+            return
+
+        expires_at = now + lifetime
+        if session.modified:
+            self.store.save(session.session_id, self.serializer.dumps(dict(session)), expires_at,
+                            session.get('user_id'))
+        else:
+            self.store.touch(session.session_id, expires_at)
+        session.expires_at = expires_at
+
+        response.set_cookie(
+            name, session.session_id,
+            expires=expires_at if session.permanent else None,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add("Cookie")
+
+    def maybe_sweep(self):
+        """Remove one bounded batch of expired sessions if a sweep is due"""
+        if time.monotonic() < self._next_sweep or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            removed = self.store.sweep(self.sweep_batch, max_batches=1)
+            self.swept += removed
+            # A full batch means a backlog: let the next request take another one
+            self._next_sweep = time.monotonic() + (0 if removed >= self.sweep_batch else self.sweep_interval)
+        finally:
+            self._sweep_lock.release()
+
+    def revoke_user(self, user_id):
+        """Log a user out everywhere"""
+        return self.store.revoke_user(user_id)
+
+    def stats(self):
+        return {"backend": type(self.store).__name__, "swept": self.swept}
+
+
+def make_session_store(backend=None, db_path=None):
+    """Session store selected by SESSION_BACKEND (sqlite by default, next to the users table)"""
+    backend = backend or os.environ.get('SESSION_BACKEND', 'sqlite')
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore(db_path or os.environ.get('SESSION_DB_PATH')
+                                  or os.environ.get('USERS_DB_PATH', 'users.db'))
+    raise ValueError(f"SESSION_BACKEND must be one of: {', '.join(SESSION_BACKENDS)}")
@@ -0,0 +1,48 @@
+import itertools
+import os
+import sys
+
+import pytest
+
+# Modules import each other from the backend directory (`from inference.forest import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_emails = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    """The app module, imported against a scratch users database and started"""
+    os.environ["USERS_DB_PATH"] = str(tmp_path_factory.mktemp("db") / "users.db")
+    os.environ.setdefault("PASSWORD_ITERATIONS", "1000")
+    import app
+
+    app.startup()
+    return app
+
+
+@pytest.fixture(scope="session")
+def bundle():
+    """The published model artifact, memory-mapped once and shared by the tests that score rows"""
+    from inference.artifact import current_version, load_artifact
+
+    return load_artifact(current_version())
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
+
+
+@pytest.fixture
+def logged_in(client):
+    """A test client logged in as a freshly registered user"""
+    email = f"user{next(_emails)}@example.com"
+    password = "Password123"
+    response = client.post("/auth/register", json={
+        "firstName": "Test", "lastName": "User", "email": email, "password": password,
+        "confirmPassword": password, "agreeToTerms": True})
+    assert response.status_code in (200, 201), response.get_json()
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.get_json()
+    return client
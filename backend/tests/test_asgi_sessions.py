@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.fixture
+def session_id(api, logged_in):
+    return logged_in.get_cookie(api.app.config["SESSION_COOKIE_NAME"]).value
+
+
+@pytest.mark.parametrize("header", [
+    "{name}={id}",
+    "theme=dark; {name}={id}",
+    # Malformed third-party cookies that http.cookies.SimpleCookie gives up on
+    "x y=1; {name}={id}",
+    'foo="bar; {name}={id}',
+])
+def test_session_user_id_matches_flask(api, logged_in, session_id, header):
+    header = header.format(name=api.app.config["SESSION_COOKIE_NAME"], id=session_id)
+    user_id = logged_in.get("/auth/check-auth").get_json()["user"]["id"]
+    assert api.session_user_id(header) == user_id
+
+
+@pytest.mark.parametrize("header", ["", "theme=dark", "session=unknown", "session=" + "x" * 100])
+def test_session_user_id_without_session(api, header):
+    assert api.session_user_id(header) is None
@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+
+import pytest
+
+from models.assessment import AssessmentModel, AssessmentWriter
+from models.database import ConnectionPool
+from models.migrations import USERS_MIGRATIONS, migrate
+
+RECORD = {
+    "gender": "Female", "Age": 50, "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72, "SkinThickness": 35,
+    "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627, "smoking_status": "Never",
+    "physical_activity": "Low",
+}
+
+
+@pytest.fixture
+def model(tmp_path):
+    path = str(tmp_path / "users.db")
+    migrate(path, USERS_MIGRATIONS)
+    pool = ConnectionPool(path, size=2)
+    yield AssessmentModel(pool)
+    pool.close()
+
+
+def insert(model, user_id, *created_at, probability=0.5):
+    model.insert_many([(user_id, at, b"", probability, "Medium", "v1") for at in created_at])
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_pages_through_tied_timestamps(model):
+    insert(model, 1, 1000, 1000, 1000, 2000, 2000, 3000, 3000)
+    insert(model, 2, 1000, 2000)
+    expected = ids(model.page(1, limit=100)[0])
+    assert len(expected) == 7
+
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = model.page(1, before=cursor, limit=3)
+        seen.extend(rows)
+        if cursor is None:
+            break
+    assert ids(seen) == expected
+    # Newest first, ties broken by id
+    assert [(row["created_at"], row["id"]) for row in seen] == sorted(
+        ((row["created_at"], row["id"]) for row in seen), reverse=True)
+
+
+def test_last_full_page_has_no_cursor(model):
+    insert(model, 1, 1000, 2000, 3000)
+    rows, cursor = model.page(1, limit=3)
+    assert len(rows) == 3 and cursor is None
+
+
+def test_from_is_inclusive_and_to_exclusive(model):
+    insert(model, 1, 1000, 2000, 3000, 4000)
+    rows, _ = model.page(1, start=2000, end=4000)
+    assert [row["created_at"] for row in rows] == [3000, 2000]
+
+
+def test_trend_buckets(model):
+    insert(model, 1, 0, 999, probability=0.2)
+    insert(model, 1, 1000, probability=0.8)
+    insert(model, 1, 2500, 2999, probability=0.4)
+    insert(model, 2, 1000, probability=1.0)
+    points = model.trend(1, bucket_ms=1000)
+    assert [(point["start"], point["count"]) for point in points] == [(0, 2), (1000, 1), (2000, 2)]
+    assert points[1]["mean_probability"] == pytest.approx(0.8)
+    assert model.trend(1, start=1000, end=2600, bucket_ms=1000)[-1]["count"] == 1
+
+
+def test_writer_batches_and_flushes(model):
+    writer = AssessmentWriter(model, batch_size=4, flush_interval=0.05)
+    for i in range(10):
+        assert writer.submit(1, [float(i), 33.6], 0.5, "Medium", "v1", created_at=1000 + i)
+    writer.flush()
+    rows, _ = model.page(1, limit=100)
+    assert [row["created_at"] for row in rows] == list(range(1009, 999, -1))
+    assert rows[0]["features"] == [9.0, 33.6]
+    stats = writer.stats()
+    assert stats["written"] == 10 and stats["dropped"] == 0 and stats["queued"] == 0
+    assert 3 <= stats["batches"] <= 10
+
+
+class BlockingModel:
+    """Holds the writer thread inside insert_many until released"""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.rows = []
+
+    def insert_many(self, rows):
+        self.entered.set()
+        self.release.wait(5)
+        self.rows.extend(rows)
+
+
+def test_writer_drops_when_the_queue_is_full():
+    model = BlockingModel()
+    writer = AssessmentWriter(model, batch_size=1, flush_interval=0, max_queue=2)
+    assert writer.submit(1, [1.0], 0.5, "Medium", "v1")
+    assert model.entered.wait(5)
+    assert writer.submit(1, [2.0], 0.5, "Medium", "v1")
+    assert writer.submit(1, [3.0], 0.5, "Medium", "v1")
+    assert not writer.submit(1, [4.0], 0.5, "Medium", "v1")
+    model.release.set()
+    writer.flush()
+    assert len(model.rows) == 3
+    assert writer.stats()["dropped"] == 1 and writer.stats()["written"] == 3
+
+
+def test_writer_counts_failed_batches():
+    class Failing:
+        def insert_many(self, rows):
+            raise sqlite3.OperationalError("database is locked")
+
+    writer = AssessmentWriter(Failing(), batch_size=8, flush_interval=0)
+    writer.submit(1, [1.0], 0.5, "Medium", "v1")
+    writer.flush()
+    assert writer.stats()["failed"] == 1 and writer.stats()["written"] == 0
+
+
+def test_history_routes(api, logged_in):
+    for glucose in (90, 148, 180):
+        assert logged_in.post("/predict", json={**RECORD, "Glucose": glucose}).status_code == 200
+    api.assessment_writer.flush()
+
+    first = logged_in.get("/assessments?limit=2").get_json()
+    assert first["count"] == 2 and first["next_cursor"]
+    assert first["assessments"][0]["features"]["Glucose"] == 180
+    second = logged_in.get(f"/assessments?limit=2&cursor={first['next_cursor']}").get_json()
+    assert [row["features"]["Glucose"] for row in second["assessments"]] == [90]
+    assert second["next_cursor"] is None
+
+    assert logged_in.get("/assessments?from=2999-01-01").get_json()["count"] == 0
+    assert logged_in.get("/assessments?to=2000-01-01T00:00:00Z").get_json()["count"] == 0
+    assert logged_in.get("/assessments?from=0&to=9999999999999").get_json()["count"] == 3
+
+    trend = logged_in.get("/assessments/trend?bucket=week").get_json()
+    assert sum(point["count"] for point in trend["points"]) == 3
+
+
+@pytest.mark.parametrize("query", ["cursor=abc", "cursor=5", "cursor=1-x", "cursor=99999999999999999999-1",
+                                   "from=yesterday", "to=99999999999999999999", "limit=ten"])
+def test_history_rejects_bad_parameters(logged_in, query):
+    response = logged_in.get(f"/assessments?{query}")
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_trend_rejects_bad_bucket(logged_in):
+    assert logged_in.get("/assessments/trend?bucket=month").status_code == 400
+
+
+def test_history_requires_login(client):
+    assert client.get("/assessments").status_code == 401
+    assert client.get("/assessments/trend").status_code == 401
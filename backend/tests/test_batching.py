@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from export_model import DATA_PATH
+from inference.artifact import load_artifact
+from inference.batching import BatchTimeout, MicroBatcher
+
+
+@pytest.fixture(scope="module")
+def rows(bundle):
+    records = pd.read_csv(DATA_PATH).drop("Outcome", axis=1).sample(64, random_state=1).to_dict("records")
+    return [bundle.encoder.encode(bundle.schema.validate(record)) for record in records]
+
+
+class StalledScorer:
+    """Holds the scheduler thread inside score_matrix until released"""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def score_matrix(self, X):
+        self.entered.set()
+        self.release.wait(5)
+        return np.zeros(len(X)), np.zeros(len(X))
+
+
+@pytest.fixture
+def stalled():
+    scorer = StalledScorer()
+    yield SimpleNamespace(scorer=scorer)
+    scorer.release.set()
+
+
+def test_concurrent_rows_match_scoring_alone(bundle, rows):
+    batcher = MicroBatcher(window=0.01, max_rows=16, timeout=5)
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(lambda row: batcher.score(bundle, row), rows))
+    assert results == [bundle.scorer.score_row(row) for row in rows]
+    assert batcher.stats()["rows"] == len(rows)
+
+
+def test_rows_queued_together_share_a_batch(bundle, rows):
+    other = load_artifact(bundle.version)
+    batcher = MicroBatcher(window=0.05, max_rows=64, timeout=5)
+    # Alternate two bundle objects, which the scheduler scores as separate matrices
+    futures = [batcher.submit(bundle if i % 2 else other, row) for i, row in enumerate(rows)]
+    assert [future.result(5) for future in futures] == [bundle.scorer.score_row(row) for row in rows]
+    stats = batcher.stats()
+    assert stats["batches"] < len(rows) and max(stats["batch_sizes"]) > 1
+
+
+def test_stalled_queue_times_out(bundle, rows, stalled):
+    batcher = MicroBatcher(window=0, timeout=0.05)
+    batcher.submit(stalled, rows[0])
+    assert stalled.scorer.entered.wait(5)
+    with pytest.raises(BatchTimeout):
+        batcher.score(bundle, rows[1])
+    assert batcher.stats()["timeouts"] == 1
+
+    # Rows whose callers gave up are skipped once the scheduler recovers
+    stalled.scorer.release.set()
+    assert batcher.score(bundle, rows[2]) == bundle.scorer.score_row(rows[2])
+    assert batcher.stats()["rows"] == 2
+
+
+def test_predict_maps_batch_timeout_to_503(api, client, monkeypatch, rows, stalled):
+    batcher = MicroBatcher(window=0, timeout=0.05)
+    batcher.submit(stalled, rows[0])
+    assert stalled.scorer.entered.wait(5)
+    monkeypatch.setattr(api, "micro_batcher", batcher)
+    monkeypatch.setattr(api, "prediction_cache", SimpleNamespace(score=lambda bundle, row, score: score(bundle, row)))
+    response = client.post("/predict", json={"gender": "Male", "Age": 44, "Glucose": 133, "BMI": 27.3})
+    assert response.status_code == 503
+    assert "timed out" in response.get_json()["error"]
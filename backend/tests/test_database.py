@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from models.database import ConnectionPool
+
+
+class BrokenConnection:
+    """Stands in for a connection whose rollback fails on release"""
+
+    in_transaction = True
+
+    def __init__(self):
+        self.closed = False
+
+    def rollback(self):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1, timeout=5)
+    yield pool
+    pool.close()
+
+
+def borrow_in_thread(pool):
+    result = {}
+
+    def borrow():
+        started = time.monotonic()
+        try:
+            with pool.connection() as conn:
+                result["value"] = conn.execute("SELECT 1").fetchone()[0]
+        except sqlite3.Error as e:
+            result["error"] = e
+        result["waited"] = time.monotonic() - started
+
+    thread = threading.Thread(target=borrow)
+    thread.start()
+    return thread, result
+
+
+def test_connections_are_reused(pool):
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+
+
+def test_waiter_gets_the_returned_connection(pool):
+    with pool.connection():
+        thread, result = borrow_in_thread(pool)
+        time.sleep(0.1)
+        assert thread.is_alive()
+    thread.join(5)
+    assert result["value"] == 1
+
+
+def test_waiter_opens_a_replacement_for_a_dropped_connection(pool):
+    broken = BrokenConnection()
+    pool._connect, connect = (lambda: broken), pool._connect
+    with pool.connection():
+        pool._connect = connect
+        thread, result = borrow_in_thread(pool)
+        time.sleep(0.1)
+        assert thread.is_alive()
+    thread.join(5)
+    assert broken.closed
+    assert result["value"] == 1
+    # Woken by the release rather than left waiting out the pool timeout
+    assert result["waited"] < 2
+
+
+def test_failed_connect_frees_its_slot(pool):
+    def fail():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    pool._connect, connect = fail, pool._connect
+    with pytest.raises(sqlite3.OperationalError, match="unable to open"):
+        with pool.connection():
+            pass
+    pool._connect = connect
+    with pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_times_out_when_every_connection_is_busy(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1, timeout=0.1)
+    with pool.connection():
+        thread, result = borrow_in_thread(pool)
+        thread.join(5)
+    assert "Timed out" in str(result["error"])
+    pool.close()
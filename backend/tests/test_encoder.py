@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from export_model import DATA_PATH
+from inference.encoder import FeatureEncoder
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return pd.read_csv(DATA_PATH).drop("Outcome", axis=1)
+
+
+@pytest.fixture(scope="module")
+def encoder(raw):
+    return FeatureEncoder.from_frame(raw)
+
+
+def test_matches_get_dummies(raw, encoder):
+    expected = pd.get_dummies(raw, drop_first=True)
+    assert encoder.feature_names == expected.columns.tolist()
+    np.testing.assert_array_equal(encoder.encode_batch(raw.to_dict("records")), expected.to_numpy(dtype=np.float64))
+
+
+def test_levels_are_case_insensitive(raw, encoder):
+    record = raw.iloc[0].to_dict()
+    shouted = {key: value.upper() if isinstance(value, str) else value for key, value in record.items()}
+    np.testing.assert_array_equal(encoder.encode(shouted), encoder.encode(record))
+
+
+def test_unseen_level_encodes_as_base_level(raw, encoder):
+    record = raw.iloc[0].to_dict()
+    base = dict(record, smoking_status=encoder.categories["smoking_status"][0])
+    unseen = dict(record, smoking_status="Occasionally")
+    np.testing.assert_array_equal(encoder.encode(unseen), encoder.encode(base))
+
+
+def test_invalid_numeric_value_is_rejected(raw, encoder):
+    with pytest.raises(ValueError, match="Glucose"):
+        encoder.encode(dict(raw.iloc[0].to_dict(), Glucose="high"))
+
+
+def test_encode_feature_matches_full_encoding(raw, encoder):
+    record = raw.iloc[0].to_dict()
+    for name, values in (("BMI", [18.5, 30.0]), ("physical_activity", encoder.categories["physical_activity"])):
+        columns, block = encoder.encode_feature(name, values)
+        for value, encoded in zip(values, block):
+            np.testing.assert_array_equal(encoder.encode(dict(record, **{name: value}))[columns], encoded)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from export_model import DATA_PATH
+from inference.service import explain_record
+
+
+@pytest.fixture(scope="module")
+def records():
+    return pd.read_csv(DATA_PATH).drop("Outcome", axis=1).sample(200, random_state=0).to_dict("records")
+
+
+def walk(forest, positive, x):
+    """Reference decomposition: follow each tree node by node, crediting every split's change"""
+    contributions = np.zeros(len(x))
+    for root in forest.roots:
+        node = root
+        while True:
+            feature = forest.feature[node]
+            child = forest.children[2 * node + (np.float32(x[feature]) <= forest.threshold[node])]
+            if child == node:
+                break
+            contributions[feature] += positive[child] - positive[node]
+            node = child
+    return contributions / forest.n_estimators
+
+
+def test_contributions_sum_to_risk_minus_base(bundle, records):
+    explainer = bundle.explainer
+    X = bundle.encoder.encode_batch(records)
+    probabilities, contributions = explainer.explain(X)
+    risk = bundle.model.predict_proba(X)[:, explainer.positive_index]
+
+    np.testing.assert_allclose(probabilities[:, explainer.positive_index], risk, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(explainer.base_value + contributions.sum(axis=1), risk, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(explainer.grouped(contributions).sum(axis=1), contributions.sum(axis=1),
+                               rtol=0, atol=1e-12)
+
+
+def test_table_matches_per_tree_walk(bundle, records):
+    explainer = bundle.explainer
+    X = bundle.encoder.encode_batch(records[:5])
+    _, contributions = explainer.explain(X)
+    positive = explainer.forest.value[:, explainer.positive_index]
+    for x, row in zip(X, contributions):
+        np.testing.assert_allclose(row, walk(explainer.forest, positive, x), rtol=0, atol=1e-12)
+
+
+def test_one_hot_columns_fold_into_their_field(bundle, records):
+    names = bundle.explainer.group_names
+    assert len(names) == len(set(names))
+    assert set(bundle.encoder.categories) <= set(names)
+    assert not any(name.startswith(f"{column}_") for name in names for column in bundle.encoder.categories)
+
+
+def test_explain_record_response(bundle, records):
+    result = explain_record(bundle, records[0])
+    total = result["base_value"] + sum(item["contribution"] for item in result["contributions"])
+    assert total == pytest.approx(result["probability"], abs=1e-9)
+    effects = [abs(item["contribution"]) for item in result["contributions"]]
+    assert effects == sorted(effects, reverse=True)
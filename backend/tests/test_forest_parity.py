@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from export_model import DATA_PATH, load_training_matrix, verify_parity
+from inference.artifact import LEGACY_MODEL_PATH, current_version, load_artifact, load_legacy_pickle, write_artifact
+from inference.forest import CompiledForest
+
+
+@pytest.fixture(scope="module")
+def legacy():
+    return load_legacy_pickle(LEGACY_MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def X(legacy):
+    return load_training_matrix(legacy.encoder, DATA_PATH)
+
+
+def test_published_artifact_matches_sklearn(bundle, legacy, X):
+    assert bundle.encoder.feature_names == legacy.encoder.feature_names
+    np.testing.assert_allclose(bundle.model.predict_proba(X), legacy.model.predict_proba(X), rtol=0, atol=1e-9)
+
+
+def test_written_artifact_round_trips(legacy, X, tmp_path):
+    compiled = CompiledForest.from_sklearn(legacy.model, legacy.encoder.feature_names, legacy.encoder.categories)
+    assert verify_parity(compiled, legacy.model, X) <= 1e-9
+
+    version = write_artifact(compiled, str(tmp_path))
+    assert current_version(str(tmp_path)) == version
+    loaded = load_artifact(version, str(tmp_path))
+    np.testing.assert_allclose(loaded.model.predict_proba(X), legacy.model.predict_proba(X), rtol=0, atol=1e-9)
+
+
+def test_split_thresholds_follow_sklearn(legacy, X):
+    # Inputs exactly on a split threshold are where float32 and float64 comparisons could disagree
+    compiled = CompiledForest.from_sklearn(legacy.model, legacy.encoder.feature_names, legacy.encoder.categories)
+    nodes = np.arange(len(compiled.feature))
+    internal = nodes[compiled.children[2 * nodes] != nodes][:1000]
+    rows = np.repeat(X[:1], len(internal), axis=0)
+    rows[np.arange(len(internal)), compiled.feature[internal]] = compiled.threshold[internal]
+    np.testing.assert_allclose(compiled.predict_proba(rows), legacy.model.predict_proba(rows), rtol=0, atol=1e-9)
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from inference.artifact import ModelStore, publish_version, write_artifact
+
+
+@pytest.fixture(scope="module")
+def compiled(bundle):
+    return bundle.model
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path / "artifacts")
+
+
+def publish(compiled, root, tag, publish=True):
+    # Versions are named to the second, so the training hash keeps them distinct within a test
+    return write_artifact(compiled, root, training_hash=tag * 8, publish=publish)
+
+
+def break_version(root, version):
+    directory = os.path.join(root, version)
+    os.remove(os.path.join(directory, sorted(name for name in os.listdir(directory) if name.endswith(".npy"))[0]))
+
+
+def test_swaps_in_new_versions_and_keeps_the_last_good_one(compiled, root, tmp_path):
+    store = ModelStore(root, str(tmp_path / "missing.pkl"), reload_interval=0)
+    loaded = []
+    store.on_reload(lambda bundle: loaded.append(bundle.version))
+    assert store.get() is None and not store.loaded
+
+    first = publish(compiled, root, "a")
+    assert store.get().version == first
+    second = publish(compiled, root, "b")
+    bundle = store.get()
+    assert bundle.version == second
+    assert store.get() is bundle
+
+    broken = publish(compiled, root, "c", publish=False)
+    break_version(root, broken)
+    publish_version(broken, root)
+    assert store.get() is bundle
+    assert store.reload() is bundle
+    assert loaded == [first, second]
+
+    # Publishing a good version again recovers from the broken one
+    publish_version(first, root)
+    assert store.get().version == first
+    assert loaded == [first, second, first]
+
+
+def test_reload_interval_limits_checks(compiled, root, tmp_path):
+    first = publish(compiled, root, "a")
+    store = ModelStore(root, str(tmp_path / "missing.pkl"), reload_interval=3600)
+    assert store.get().version == first
+
+    second = publish(compiled, root, "b")
+    assert store.get().version == first
+    assert store.reload().version == second
+    assert store.get().version == second
+
+
+def test_unreadable_first_version_leaves_no_model(compiled, root, tmp_path):
+    version = publish(compiled, root, "a")
+    break_version(root, version)
+    store = ModelStore(root, str(tmp_path / "missing.pkl"), reload_interval=0)
+    assert store.get() is None
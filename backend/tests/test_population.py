@@ -0,0 +1,102 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import population
+from population import Distribution, PopulationIndex, age_band
+
+
+def test_percentile_counts_ties_as_half():
+    distribution = Distribution.from_values([1, 2, 2, 2, 3])
+    assert distribution.percentile(2) == pytest.approx(50)
+    assert distribution.percentile(1) == pytest.approx(10)
+    assert distribution.percentile(3) == pytest.approx(90)
+    assert distribution.percentile(2.5) == pytest.approx(80)
+    assert distribution.percentile(0) == 0 and distribution.percentile(4) == 100
+
+
+def test_float32_round_trips_count_as_one_value():
+    distribution = Distribution.from_values([33.6, float(np.float32(33.6)), 40.0])
+    assert len(distribution.values) == 2
+    assert distribution.percentile(np.float32(33.6)) == pytest.approx(100 / 3)
+
+
+def test_quantile():
+    distribution = Distribution.from_values([5, 1, 3, 3, 4])
+    assert distribution.quantile(0) == 1
+    assert distribution.quantile(0.5) == 3
+    assert distribution.quantile(0.61) == 4
+    assert distribution.quantile(1) == 5
+
+
+def test_merge_is_exact():
+    rng = np.random.default_rng(0)
+    values = np.round(rng.normal(120, 30, 5000), 1)
+    merged = Distribution.from_values(values[:1234]).merge(Distribution.from_values(values[1234:]))
+    whole = Distribution.from_values(values)
+    np.testing.assert_array_equal(merged.values, whole.values)
+    np.testing.assert_array_equal(merged.cumulative, whole.cumulative)
+    for value in (60, 120, 120.3, 181.5):
+        assert merged.percentile(value) == whole.percentile(value)
+
+    empty = Distribution.from_values([])
+    assert empty.merge(whole) is whole and whole.merge(empty) is whole
+
+
+@pytest.fixture
+def frame():
+    # 40 women aged 40-49 (4 with the outcome), 40 men aged 20-29, one 85-year-old woman
+    women = pd.DataFrame({"gender": "Female", "Age": 40 + np.arange(40) % 10, "Glucose": 100 + np.arange(40),
+                          "BMI": 0.0, "Outcome": (np.arange(40) < 4).astype(int)})
+    men = pd.DataFrame({"gender": "Male", "Age": 25, "Glucose": 150 + np.arange(40), "BMI": 30.0, "Outcome": 0})
+    old = pd.DataFrame({"gender": ["Female"], "Age": [85], "Glucose": [200], "BMI": [25.0], "Outcome": [1]})
+    return pd.concat([women, men, old], ignore_index=True)
+
+
+def test_lookup_widens_small_segments(frame):
+    index = PopulationIndex.from_frame(frame)
+    assert index.lookup("Glucose", "Female", "40-49", 0, min_size=30)[0] == ("Female", "40-49", 0)
+    # Only 4 women in their forties have the outcome, so the outcome is dropped first
+    segment, distribution = index.lookup("Glucose", "Female", "40-49", 1, min_size=30)
+    assert segment == ("Female", "40-49", None) and distribution.count == 40
+    assert index.lookup("Glucose", "Female", "80+", 1, min_size=30)[0] == ("Female", None, None)
+    assert index.lookup("Glucose", "Other", "80+", 1, min_size=30)[0] == (None, None, None)
+    assert index.lookup("Glucose", "Female", "80+", 1, min_size=1)[0] == ("Female", "80+", 1)
+    # The whole population is used however small it is
+    assert index.lookup("Glucose", min_size=1000)[1].count == 81
+    assert index.lookup("Insulin") == (None, None)
+
+
+def test_zero_means_missing(frame):
+    index = PopulationIndex.from_frame(frame)
+    assert index.lookup("BMI")[1].count == 41
+    assert index.lookup("BMI", "Female", "40-49", min_size=1)[0] == ("Female", None, None)
+
+
+def test_index_merge_matches_one_pass(frame):
+    merged = PopulationIndex.from_frame(frame[:50]).merge(PopulationIndex.from_frame(frame[50:]))
+    whole = PopulationIndex.from_frame(frame)
+    assert merged.distributions.keys() == whole.distributions.keys()
+    for key, distribution in whole.distributions.items():
+        np.testing.assert_array_equal(merged.distributions[key].cumulative, distribution.cumulative)
+
+
+def test_age_band():
+    assert [age_band(age) for age in (None, float("nan"), 9, 40, 49.9, 79, 80, 104)] == [
+        None, None, "0-9", "40-49", "40-49", "70-79", "80+", "80+"]
+
+
+def test_main(frame, tmp_path, monkeypatch, capsys):
+    path = tmp_path / "population.csv"
+    frame.to_csv(path, index=False)
+    monkeypatch.setattr(sys, "argv", ["population.py", str(path), "--help"])
+    with pytest.raises(SystemExit):
+        population.main()
+    assert "Population statistics for placing a user's measurements in context." in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["population.py", str(path), "--Glucose", "110", "--gender", "Female",
+                                      "--age", "44", "--outcome", "0"])
+    population.main()
+    assert capsys.readouterr().out.startswith("Glucose 110: ")
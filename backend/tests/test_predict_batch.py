@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+RECORDS = [
+    {"gender": "Female", "Age": 50, "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72, "SkinThickness": 35,
+     "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627, "smoking_status": "Never",
+     "physical_activity": "Low"},
+    {"gender": "Male", "Age": 31, "Glucose": 85, "BMI": 26.6, "smoking_status": "Current",
+     "physical_activity": "High"},
+    {"gender": "Female", "Age": 62, "Glucose": 183, "BMI": 41.2, "smoking_status": "Former"},
+    {"gender": "Male", "Age": 23, "Glucose": 97, "BMI": 21.1},
+    {"Age": 45, "Glucose": 120},
+]
+
+
+@pytest.fixture
+def small_chunks(api, monkeypatch):
+    # Spread the rows over several chunks so order is checked across chunk boundaries
+    monkeypatch.setattr(api, "BATCH_CHUNK_SIZE", 2)
+
+
+def single(client, record):
+    response = client.post("/predict", json=record)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def ndjson(*lines):
+    return "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n"
+
+
+def test_json_array_matches_single_predictions_in_order(client, small_chunks):
+    response = client.post("/predict/batch", json=RECORDS)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["count"] == len(RECORDS) and body["failed"] == 0 and body["status"] == "success"
+    assert [result["index"] for result in body["results"]] == list(range(len(RECORDS)))
+    for record, result in zip(RECORDS, body["results"]):
+        assert {key: value for key, value in result.items() if key != "index"} == single(client, record)
+
+
+@pytest.mark.parametrize("mimetype", ["application/x-ndjson", "application/jsonl"])
+def test_ndjson_matches_json_array(client, small_chunks, mimetype):
+    expected = client.post("/predict/batch", json=RECORDS).get_json()
+    # Blank lines are skipped
+    response = client.post("/predict/batch", data=ndjson(*RECORDS[:2], "", *RECORDS[2:]), content_type=mimetype)
+    assert response.status_code == 200
+    assert response.get_json() == expected
+
+
+def test_failed_rows_are_reported_in_place(client, small_chunks):
+    records = [RECORDS[0], {**RECORDS[1], "Glucose": "abc"}, RECORDS[2], "not a record", RECORDS[3]]
+    body = client.post("/predict/batch", json=records).get_json()
+    assert body["count"] == 5 and body["failed"] == 2
+    assert [result["status"] for result in body["results"]] == ["success", "error", "success", "error", "success"]
+    assert [result["index"] for result in body["results"]] == [0, 1, 2, 3, 4]
+    assert body["results"][1]["errors"] == {"Glucose": "Must be a number"}
+    assert body["results"][4]["probability"] == single(client, RECORDS[3])["probability"]
+
+
+def test_ndjson_reports_bad_lines(client, small_chunks):
+    response = client.post("/predict/batch", data=ndjson(RECORDS[0], "{not json", RECORDS[1]),
+                           content_type="application/x-ndjson")
+    body = response.get_json()
+    assert response.status_code == 200 and body["failed"] == 1
+    assert body["results"][1]["status"] == "error" and body["results"][1]["error"].startswith("Invalid JSON")
+    assert body["results"][2]["status"] == "success"
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"json": RECORDS[0]},
+    {"json": "records"},
+    {"data": "[not json", "content_type": "application/json"},
+    {"data": "", "content_type": "application/json"},
+])
+def test_rejects_non_array_body(client, kwargs):
+    response = client.post("/predict/batch", **kwargs)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Expected a JSON array of records"}
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"json": []},
+    {"data": "", "content_type": "application/x-ndjson"},
+    {"data": "\n\n", "content_type": "application/x-ndjson"},
+])
+def test_rejects_empty_batch(client, kwargs):
+    response = client.post("/predict/batch", **kwargs)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "No data provided"}
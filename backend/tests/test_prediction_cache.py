@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from inference.cache import PredictionCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Scorer:
+    """Counts calls so tests can tell hits from misses"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, bundle, row):
+        self.calls += 1
+        return (bundle.version, float(row.sum()))
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def row(*values):
+    return np.array(values, dtype=np.float64)
+
+
+def test_evicts_least_recently_used(clock):
+    cache = PredictionCache(maxsize=2, ttl=60, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+
+
+def test_put_refreshes_recency(clock):
+    cache = PredictionCache(maxsize=2, ttl=60, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+    assert cache.get("a") == 10 and cache.get("b") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(maxsize=8, ttl=30, clock=clock)
+    cache.put("a", 1)
+    clock.now += 30
+    assert cache.get("a") == 1
+    clock.now += 0.5
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["size"] == 0
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_score_misses_on_a_new_model_version(clock):
+    cache = PredictionCache(maxsize=8, ttl=60, clock=clock)
+    score = Scorer()
+    v1, v2 = SimpleNamespace(version="v1"), SimpleNamespace(version="v2")
+    assert cache.score(v1, row(1, 2), score) == ("v1", 3.0)
+    assert cache.score(v1, row(1, 2), score) == ("v1", 3.0)
+    assert score.calls == 1
+    assert cache.score(v2, row(1, 2), score) == ("v2", 3.0)
+    assert cache.score(v1, row(2, 1), score) == ("v1", 3.0)
+    assert score.calls == 3
+
+
+def test_disabled_cache_always_scores(clock):
+    cache = PredictionCache(maxsize=0, clock=clock)
+    score = Scorer()
+    bundle = SimpleNamespace(version="v1")
+    cache.score(bundle, row(1), score)
+    cache.score(bundle, row(1), score)
+    assert score.calls == 2 and cache.stats()["size"] == 0
+
+
+def test_model_reload_clears_the_app_cache(api):
+    api.prediction_cache.put(b"key", {"prediction": 1})
+    assert api.prediction_cache.get(b"key") is not None
+    for callback in api.model_store.listeners:
+        callback(api.model_store.get())
+    assert api.prediction_cache.get(b"key") is None
+    assert api.prediction_cache.stats()["size"] == 0
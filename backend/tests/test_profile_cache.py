@@ -0,0 +1,96 @@
+import pytest
+
+from models.profile_cache import ProfileCache
+from models.store import MemoryStore
+
+
+@pytest.fixture(params=["local", "shared"])
+def cache(request):
+    yield ProfileCache(ttl=60.0, shared=MemoryStore() if request.param == "shared" else None, local_ttl=60.0)
+
+
+class Users:
+    """Loader over a dict of profiles, counting the loads"""
+
+    def __init__(self, **profiles):
+        self.profiles = profiles
+        self.loads = 0
+        self.during_load = None
+
+    def __call__(self, user_id):
+        self.loads += 1
+        profile = dict(self.profiles[user_id]) if user_id in self.profiles else None
+        if self.during_load:
+            action, self.during_load = self.during_load, None
+            action()
+        return profile
+
+
+def test_hit_after_miss(cache):
+    users = Users(a={"email": "a@example.com"})
+    assert cache.get("a", users) == {"email": "a@example.com"}
+    assert cache.get("a", users) == {"email": "a@example.com"}
+    assert users.loads == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_returns_copies(cache):
+    users = Users(a={"email": "a@example.com"})
+    cache.get("a", users)["email"] = "changed"
+    assert cache.get("a", users) == {"email": "a@example.com"}
+
+
+def test_missing_user_is_not_cached(cache):
+    users = Users()
+    assert cache.get("a", users) is None
+    assert cache.get("a", users) is None
+    assert users.loads == 2
+
+
+def test_invalidate_reloads(cache):
+    users = Users(a={"email": "a@example.com"})
+    cache.get("a", users)
+    users.profiles["a"] = {"email": "new@example.com"}
+    cache.invalidate("a")
+    assert cache.get("a", users) == {"email": "new@example.com"}
+    assert users.loads == 2
+
+
+def test_load_racing_invalidate_is_not_cached(cache):
+    users = Users(a={"email": "a@example.com"})
+
+    def update():
+        users.profiles["a"] = {"email": "new@example.com"}
+        cache.invalidate("a")
+
+    # The row is read, then updated and invalidated before the load fills the cache
+    users.during_load = update
+    assert cache.get("a", users) == {"email": "a@example.com"}
+    assert cache.get("a", users) == {"email": "new@example.com"}
+    assert users.loads == 2
+    assert cache.get("a", users) == {"email": "new@example.com"}
+    assert users.loads == 2
+
+
+def test_loader_error_leaves_no_load_behind(cache):
+    def failing(user_id):
+        raise RuntimeError("database unavailable")
+
+    with pytest.raises(RuntimeError):
+        cache.get("a", failing)
+    assert cache._loads == {}
+    assert cache.get("a", Users(a={"email": "a@example.com"})) == {"email": "a@example.com"}
+
+
+def test_evicts_least_recently_used():
+    cache = ProfileCache(maxsize=2)
+    users = Users(a={"id": "a"}, b={"id": "b"}, c={"id": "c"})
+    cache.get("a", users)
+    cache.get("b", users)
+    cache.get("a", users)
+    cache.get("c", users)
+    assert cache.stats()["size"] == 2
+    cache.get("a", users)
+    assert users.loads == 3
+    cache.get("b", users)
+    assert users.loads == 4
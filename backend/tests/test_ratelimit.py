@@ -0,0 +1,145 @@
+import pytest
+
+from models.migrations import RATE_LIMIT_MIGRATIONS, migrate
+from ratelimit import MemoryLimitStore, RateLimit, SQLiteLimitStore, gcra, parse_rate
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryLimitStore()
+        return
+    path = str(tmp_path / "limits.db")
+    migrate(path, RATE_LIMIT_MIGRATIONS)
+    store = SQLiteLimitStore(path)
+    yield store
+    store.pool.close()
+
+
+def test_gcra_burst_then_one_per_interval():
+    tat, now, allowed = None, 0.0, 0
+    # 5 per 300 s: interval 60 s, tolerance 240 s
+    for _ in range(10):
+        new_tat, retry_after = gcra(tat, now, 60.0, 240.0)
+        if new_tat is not None:
+            tat, allowed = new_tat, allowed + 1
+    assert allowed == 5
+    assert retry_after == pytest.approx(60.0)
+    assert gcra(tat, now + 60.0, 60.0, 240.0)[0] is not None
+
+
+def test_burst_is_denied_with_retry_after(store, clock):
+    limit = RateLimit("login", 5, 300, store, clock)
+    assert [limit.hit("a@example.com")[0] for _ in range(5)] == [True] * 5
+    assert limit.hit("a@example.com") == (False, 60)
+
+    clock.now += 59
+    assert limit.hit("a@example.com") == (False, 1)
+    clock.now += 1
+    assert limit.hit("a@example.com") == (True, 0)
+    assert limit.hit("a@example.com")[0] is False
+
+
+def test_keys_and_limits_are_independent(store, clock):
+    by_email = RateLimit("email", 1, 60, store, clock)
+    by_ip = RateLimit("ip", 1, 60, store, clock)
+    assert by_email.hit("x")[0] and not by_email.hit("x")[0]
+    assert by_email.hit("y")[0]
+    assert by_ip.hit("x")[0]
+
+
+def test_reset_forgets_attempts(store, clock):
+    limit = RateLimit("login", 2, 60, store, clock)
+    limit.hit("k"), limit.hit("k")
+    assert not limit.hit("k")[0]
+    limit.reset("k")
+    assert limit.hit("k")[0]
+
+
+def test_window_slides_back_to_full_burst(store, clock):
+    limit = RateLimit("login", 3, 30, store, clock)
+    assert all(limit.hit("k")[0] for _ in range(3))
+    clock.now += 30
+    assert all(limit.hit("k")[0] for _ in range(3))
+    assert not limit.hit("k")[0]
+
+
+def test_memory_store_evicts_idle_keys():
+    store = MemoryLimitStore(max_keys=3, evict_interval=0)
+    for i in range(3):
+        store.hit(f"k{i}", 0.0, 1.0, 0.0)
+    store.hit("late", 0.5, 1.0, 0.0)
+    assert len(store) == 3
+    store.hit("later", 5.0, 1.0, 0.0)
+    assert len(store) == 1
+
+
+def test_memory_store_evicts_in_expiry_order():
+    # A long-lived key added first must not hold back keys that expire sooner
+    store = MemoryLimitStore(evict_interval=0)
+    store.hit("login_email:a", 0.0, 60.0, 240.0)
+    for i in range(5):
+        store.hit(f"login_ip:{i}", 0.0, 3.0, 57.0)
+    store.hit("login_ip:0", 1.0, 3.0, 57.0)
+    store.hit("login_ip:late", 10.0, 3.0, 57.0)
+    assert len(store) == 2
+    assert set(store._tats) == {"login_email:a", "login_ip:late"}
+    store.hit("other", 61.0, 1.0, 0.0)
+    assert set(store._tats) == {"other"}
+
+
+def test_memory_store_drops_keys_closest_to_expiry_past_max_keys():
+    store = MemoryLimitStore(max_keys=2, evict_interval=100)
+    store.hit("long", 0.0, 60.0, 0.0)
+    store.hit("short", 0.0, 1.0, 0.0)
+    store.hit("new", 0.5, 30.0, 0.0)
+    assert set(store._tats) == {"long", "new"}
+
+
+def test_refund_gives_back_one_attempt(store, clock):
+    limit = RateLimit("login", 2, 60, store, clock)
+    for _ in range(10):
+        assert limit.hit("k")[0]
+        limit.refund("k")
+    assert limit.hit("k")[0] and limit.hit("k")[0]
+    assert not limit.hit("k")[0]
+    limit.refund("unknown")
+
+
+def test_successful_logins_do_not_spend_the_ip_limit(client, logged_in):
+    from routes.auth import login_ip_limit
+
+    email = logged_in.get("/auth/check-auth").get_json()["user"]["email"]
+    address = {"REMOTE_ADDR": "203.0.113.7"}
+    for _ in range(login_ip_limit.limit + 5):
+        response = client.post("/auth/login", json={"email": email, "password": "Password123"},
+                               environ_base=address)
+        assert response.status_code == 200
+    statuses = [client.post("/auth/login", json={"email": f"nobody{i}@example.com", "password": "wrong-pass1"},
+                            environ_base=address).status_code for i in range(login_ip_limit.limit + 1)]
+    assert statuses[:-1] == [401] * login_ip_limit.limit
+    assert statuses[-1] == 429
+    login_ip_limit.reset("203.0.113.7")
+
+
+@pytest.mark.parametrize("value", ["5", "0/60", "5/0", "a/b", "-1/10"])
+def test_parse_rate_rejects(value):
+    with pytest.raises(ValueError):
+        parse_rate(value)
+
+
+def test_parse_rate():
+    assert parse_rate("20/60") == (20, 60.0)
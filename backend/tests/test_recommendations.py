@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from inference.encoder import FeatureEncoder
+from inference.recommendations import BASE_RECOMMENDATIONS, RecommendationEngine
+from schemas import prediction_schema
+
+ENCODER = FeatureEncoder(
+    ["Age", "Pregnancies", "Glucose", "BloodPressure", "SkinThickness", "Insulin", "BMI",
+     "DiabetesPedigreeFunction", "gender_Male", "smoking_status_Former", "smoking_status_Never",
+     "physical_activity_Low", "physical_activity_Medium"],
+    {"gender": ["Female", "Male"], "smoking_status": ["Current", "Former", "Never"],
+     "physical_activity": ["High", "Low", "Medium"]},
+)
+SCHEMA = prediction_schema(ENCODER)
+ENGINE = RecommendationEngine(ENCODER.feature_names)
+
+# What the risk form posts: lower-case smoking status and activity on a 0-1 scale
+FORM = {"gender": "Female", "Age": 50, "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72, "SkinThickness": 35,
+        "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627, "smoking_status": "never",
+        "physical_activity": 1}
+# A row of the training CSV, with its level names
+CSV = {"gender": "Male", "Age": 31, "Pregnancies": 0, "Glucose": 110, "BloodPressure": 70, "SkinThickness": 20,
+       "Insulin": 80, "BMI": 24.5, "DiabetesPedigreeFunction": 0.3, "smoking_status": "Current",
+       "physical_activity": "Low"}
+
+
+def personalized(record, risk_level="Medium"):
+    row = ENCODER.encode(SCHEMA.validate(record))
+    rule_ids = ENGINE.recommend(row, risk_level)
+    assert rule_ids[:len(BASE_RECOMMENDATIONS[risk_level])] == BASE_RECOMMENDATIONS[risk_level]
+    return rule_ids[len(BASE_RECOMMENDATIONS[risk_level]):]
+
+
+@pytest.mark.parametrize("record, expected", [
+    (FORM, ("weight_management", "glucose_monitoring")),
+    ({**FORM, "physical_activity": 0.5}, ("weight_management", "increase_activity", "glucose_monitoring")),
+    ({**FORM, "physical_activity": 0}, ("weight_management", "increase_activity", "glucose_monitoring")),
+    ({**FORM, "smoking_status": "current", "BMI": 24, "Glucose": 100}, ("smoking_cessation",)),
+    ({**FORM, "smoking_status": "former"}, ("weight_management", "smoking_cessation", "glucose_monitoring")),
+    (CSV, ("smoking_cessation", "increase_activity")),
+    ({**CSV, "smoking_status": "Never", "physical_activity": "Medium"}, ("increase_activity",)),
+    ({**CSV, "smoking_status": "NEVER", "physical_activity": "High"}, ()),
+    # Thresholds are strict: BMI > 30 and Glucose > 125
+    ({**CSV, "smoking_status": "Never", "physical_activity": "High", "BMI": 30, "Glucose": 125}, ()),
+    ({**CSV, "smoking_status": "Never", "physical_activity": "High", "BMI": 30.1, "Glucose": 126},
+     ("weight_management", "glucose_monitoring")),
+])
+def test_personalized_rules(record, expected):
+    assert personalized(record) == expected
+
+
+def test_messages_follow_rule_order():
+    rule_ids = ENGINE.recommend(ENCODER.encode(SCHEMA.validate(FORM)), "High")
+    assert ENGINE.messages(rule_ids)[-2:] == (
+        "Focus on weight management - consider consulting a nutritionist",
+        "Monitor fasting glucose levels more frequently")
+
+
+def test_unknown_risk_level_uses_low():
+    row = ENCODER.encode(SCHEMA.validate(CSV))
+    assert ENGINE.recommend(row, "Unknown") == ENGINE.recommend(row, "Low")
+
+
+def test_batch_matches_single_rows():
+    records = [FORM, CSV, {**FORM, "physical_activity": 0}, {**CSV, "BMI": 41, "smoking_status": "Never"}]
+    X = np.stack([ENCODER.encode(SCHEMA.validate(record)) for record in records])
+    levels = ["High", "Medium", "Low", "Medium"]
+    assert ENGINE.recommend_batch(X, levels) == [ENGINE.recommend(row, level) for row, level in zip(X, levels)]
+
+
+def test_unknown_rule_column_is_rejected():
+    # Without the Never dummy the smoking rule would fire for every patient
+    names = [name for name in ENCODER.feature_names if name != "smoking_status_Never"]
+    with pytest.raises(ValueError, match="smoking_cessation.*smoking_status_Never"):
+        RecommendationEngine(names)
@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from inference.encoder import FeatureEncoder
+from schemas import LOGIN_SCHEMA, REGISTER_SCHEMA, ValidationError, prediction_schema
+
+ENCODER = FeatureEncoder(
+    ["Age", "Glucose", "BMI", "gender_Male", "physical_activity_Low", "physical_activity_Medium"],
+    {"gender": ["Female", "Male"], "physical_activity": ["High", "Low", "Medium"]},
+)
+SCHEMA = prediction_schema(ENCODER)
+
+
+def errors(schema, payload):
+    with pytest.raises(ValidationError) as raised:
+        schema.validate(payload)
+    return raised.value.errors
+
+
+def test_prediction_record_is_cleaned():
+    clean = SCHEMA.validate({"Age": "50", "Glucose": 148, "BMI": 33.6, "gender": " female ",
+                             "physical_activity": "MEDIUM", "unknown": 1})
+    assert clean == {"Age": 50.0, "Glucose": 148.0, "BMI": 33.6, "gender": "Female", "physical_activity": "Medium"}
+
+
+@pytest.mark.parametrize("value, level", [(1, "High"), ("0.5", "Medium"), (0, "Low"), ("0.0", "Low")])
+def test_activity_aliases(value, level):
+    assert SCHEMA.validate({"physical_activity": value}) == {"physical_activity": level}
+
+
+@pytest.mark.parametrize("value", [True, "abc", [1], {"a": 1}, math.nan, math.inf, "-inf", -1, 700])
+def test_bad_numbers_are_rejected(value):
+    assert "Glucose" in errors(SCHEMA, {"Glucose": value})
+
+
+@pytest.mark.parametrize("value", ["Other", True, 2, {"level": "Male"}])
+def test_bad_levels_are_rejected(value):
+    assert errors(SCHEMA, {"gender": value})["gender"].startswith("Must be one of")
+
+
+def test_inferred_levels_accept_the_baseline():
+    # A legacy pickle only names the dummy columns, so the dropped level is unknown
+    schema = prediction_schema(FeatureEncoder(["Age", "gender_Male", "physical_activity_Low",
+                                               "physical_activity_Medium"]))
+    assert schema.validate({"gender": " Female ", "physical_activity": "0.5"}) == {
+        "gender": "Female", "physical_activity": "Medium"}
+    assert schema.validate({"gender": "male"}) == {"gender": "Male"}
+    assert "gender" in errors(schema, {"gender": 2})
+
+
+def test_every_bad_field_is_reported():
+    assert set(errors(SCHEMA, {"Age": -5, "Glucose": "x", "gender": "?"})) == {"Age", "Glucose", "gender"}
+
+
+def test_non_object_payload():
+    assert errors(SCHEMA, [1, 2]) == {"_": "Expected a JSON object"}
+
+
+def test_register_checks():
+    payload = {"firstName": "Ada", "lastName": "L", "email": "Ada@Example.com", "password": "secret123",
+               "confirmPassword": "secret123", "agreeToTerms": True}
+    assert REGISTER_SCHEMA.validate(payload)["email"] == "ada@example.com"
+    assert "confirmPassword" in errors(REGISTER_SCHEMA, dict(payload, confirmPassword="other123"))
+    assert "agreeToTerms" in errors(REGISTER_SCHEMA, dict(payload, agreeToTerms=False))
+    assert "password" in errors(REGISTER_SCHEMA, dict(payload, password="short1", confirmPassword="short1"))
+    assert "email" in errors(REGISTER_SCHEMA, dict(payload, email="not-an-email"))
+
+
+def test_login_requires_fields():
+    assert errors(LOGIN_SCHEMA, {"email": "", "password": "x" * 2000}) == {
+        "email": "This field is required", "password": "Must be at most 1024 characters long"}
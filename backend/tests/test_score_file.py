@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from export_model import DATA_PATH
+from inference.artifact import LEGACY_MODEL_PATH, LEGACY_VERSION
+from inference.service import score_records
+from score_file import RECOMMENDATION_SEPARATOR, load_bundle, score_frame, validate_frame
+
+
+@pytest.fixture(scope="module")
+def frame():
+    frame = pd.read_csv(DATA_PATH).drop("Outcome", axis=1).sample(200, random_state=0).reset_index(drop=True)
+    frame = frame.astype(object)
+    frame.loc[1, "Glucose"] = "abc"
+    frame.loc[2, "BMI"] = float("inf")
+    frame.loc[3, "gender"] = "Robot"
+    frame.loc[4, ["Age", "physical_activity"]] = [500, "sometimes"]
+    frame.loc[5, "physical_activity"] = "0.5"
+    frame.loc[6, "BMI"] = None
+    return frame
+
+
+def test_validate_frame_reports_rows(bundle, frame):
+    clean, errors = validate_frame(bundle.schema, frame)
+    assert sorted(errors) == [1, 2, 3, 4]
+    assert errors[1] == {"Glucose": "Must be a number"}
+    assert set(errors[4]) == {"Age", "physical_activity"}
+    assert clean.loc[5, "physical_activity"] == "Medium"
+    assert clean.loc[6, "BMI"] is None
+
+
+def test_score_frame_matches_batch_route(bundle, frame):
+    scored = score_frame(bundle, frame, recommendations=True)
+    records = [{key: value for key, value in record.items() if not pd.isna(value)}
+               for record in frame.to_dict("records")]
+    for i, expected in enumerate(score_records(bundle, records)):
+        row = scored.loc[i]
+        if expected["status"] == "error":
+            assert row["error"] == expected["error"]
+            assert pd.isna(row["prediction"]) and pd.isna(row["risk_level"]) and pd.isna(row["recommendations"])
+        else:
+            assert pd.isna(row["error"])
+            assert row["prediction"] == expected["prediction"]
+            assert row["probability"] == pytest.approx(expected["probability"])
+            assert row["risk_level"] == expected["risk_level"]
+
+
+def test_recommendations_match_api_at_thresholds(bundle):
+    # Just above BMI > 30 and Glucose > 125, but equal to the thresholds once rounded to float32
+    records = [{"gender": "Female", "Age": 40, "Glucose": glucose, "BMI": bmi, "smoking_status": "Never",
+                "physical_activity": "High"}
+               for bmi, glucose in [(30.000001, 125.000001), (30, 125), (30.5, 126)]]
+    scored = score_frame(bundle, pd.DataFrame(records), recommendations=True)
+    expected = [RECOMMENDATION_SEPARATOR.join(result["recommendations"]) for result in score_records(bundle, records)]
+    assert scored["recommendations"].tolist() == expected
+    assert "Focus on weight management" in expected[0] and "Focus on weight management" not in expected[1]
+
+
+def test_load_bundle_legacy_version(tmp_path):
+    bundle = load_bundle(str(tmp_path), LEGACY_VERSION, LEGACY_MODEL_PATH)
+    assert bundle.version == LEGACY_VERSION
+    assert load_bundle(str(tmp_path), None, LEGACY_MODEL_PATH).version == LEGACY_VERSION
+    with pytest.raises(SystemExit):
+        load_bundle(str(tmp_path), LEGACY_VERSION, str(tmp_path / "missing.pkl"))
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from flask import Flask, jsonify, session
+
+from models.migrations import SESSION_MIGRATIONS, migrate
+from models.session_store import MemorySessionStore, SQLiteSessionStore
+from sessions import ServerSessionInterface
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemorySessionStore()
+        return
+    path = str(tmp_path / "sessions.db")
+    migrate(path, SESSION_MIGRATIONS)
+    store = SQLiteSessionStore(path)
+    yield store
+    store.pool.close()
+
+
+@pytest.fixture
+def app(store):
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.session_interface = ServerSessionInterface(store, ttl=60)
+
+    @app.post("/login/<int:user_id>")
+    def login(user_id):
+        session.clear()
+        session["user_id"] = user_id
+        return jsonify(ok=True)
+
+    @app.get("/me")
+    def me():
+        return jsonify(user_id=session.get("user_id"))
+
+    @app.post("/logout")
+    def logout():
+        session.clear()
+        return jsonify(ok=True)
+
+    return app
+
+
+def cookie(client):
+    return client.get_cookie("session").value
+
+
+def test_store_expiry_and_sweep(store):
+    now = time.time()
+    store.save("live", "{}", now + 60, 1)
+    store.save("expired", "{}", now - 1, 1)
+    assert store.get("live") == ("{}", pytest.approx(now + 60))
+    assert store.get("expired") is None
+    assert store.sweep(batch_size=10) == 1
+    assert store.count() == 1
+
+
+def test_store_revoke_user(store):
+    expires = time.time() + 60
+    for session_id, user_id in (("a", 1), ("b", 1), ("c", 2), ("anonymous", None)):
+        store.save(session_id, "{}", expires, user_id)
+    assert store.revoke_user(1) == 2
+    assert store.get("a") is None and store.get("b") is None
+    assert store.get("c") is not None and store.get("anonymous") is not None
+
+
+def test_cookie_holds_only_an_opaque_id(app, store):
+    client = app.test_client()
+    client.post("/login/7")
+    session_id = cookie(client)
+    # A signed cookie session would carry the data itself ("eyJ1c2VyX2lkIjo3fQ..." decodes to user_id)
+    assert not session_id.startswith("eyJ") and "." not in session_id and len(session_id) >= 40
+    data, _ = store.get(session_id)
+    assert "user_id" in data
+    assert client.get("/me").get_json() == {"user_id": 7}
+
+
+def test_login_and_logout_rotate_the_id(app, store):
+    client = app.test_client()
+    client.post("/login/1")
+    first = cookie(client)
+    client.post("/login/2")
+    second = cookie(client)
+    assert second != first and store.get(first) is None
+
+    client.post("/logout")
+    assert store.get(second) is None
+    assert client.get("/me").get_json() == {"user_id": None}
+
+
+def test_stolen_id_is_useless_after_revocation(app):
+    victim, attacker = app.test_client(), app.test_client()
+    victim.post("/login/5")
+    attacker.set_cookie("session", cookie(victim))
+    assert attacker.get("/me").get_json() == {"user_id": 5}
+
+    app.session_interface.revoke_user(5)
+    assert attacker.get("/me").get_json() == {"user_id": None}
+    assert victim.get("/me").get_json() == {"user_id": None}
+
+
+def test_expired_session_starts_fresh(app, store):
+    client = app.test_client()
+    client.post("/login/3")
+    session_id = cookie(client)
+    store.touch(session_id, time.time() - 1)
+    assert client.get("/me").get_json() == {"user_id": None}
+
+
+def test_malformed_ids_never_reach_the_store(app):
+    client = app.test_client()
+    client.set_cookie("session", "x" * 500)
+    assert client.get("/me").get_json() == {"user_id": None}
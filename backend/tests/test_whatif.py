@@ -0,0 +1,118 @@
+import asyncio
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from inference.whatif import TREE_SKIP_MIN_ROWS, whatif_record
+from schemas import ValidationError
+
+PROFILE = {
+    "gender": "Female", "Age": 50, "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+    "SkinThickness": 35, "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627,
+    "smoking_status": "Never", "physical_activity": "Low",
+}
+
+
+def per_row(bundle, result):
+    """Risk of every grid point scored one encoded row at a time"""
+    base = bundle.schema.validate(PROFILE)
+    positive = bundle.scorer.positive_index
+    risks = []
+    for point in itertools.product(*result["values"]):
+        row = bundle.encoder.encode(dict(base, **dict(zip(result["features"], point))))
+        risks.append(bundle.model.predict_proba(row.reshape(1, -1))[0, positive])
+    return np.array(risks).reshape([len(values) for values in result["values"]])
+
+
+@pytest.mark.parametrize("vary", [
+    {"Glucose": {"start": 60, "stop": 200, "step": 5}},
+    {"BMI": {"start": -10, "stop": 10, "step": 0.5, "relative": True}},
+    {"physical_activity": ["Low", "Medium", "High"], "smoking_status": ["Never", "Former", "Current"]},
+    # Enough distinct cells to take the tree skipping path
+    {"Glucose": {"start": 50, "stop": 250, "step": 3}, "BMI": {"start": 18, "stop": 45, "step": 1}},
+])
+def test_grid_matches_per_row_scoring(bundle, vary):
+    result = whatif_record(bundle, {"profile": PROFILE, "vary": vary})
+    np.testing.assert_allclose(result["probabilities"], np.round(per_row(bundle, result), 4), rtol=0, atol=1e-12)
+    assert result["points"] == np.prod([len(values) for values in result["values"]])
+
+
+def test_large_grid_skips_duplicate_cells(bundle):
+    result = whatif_record(bundle, {"profile": PROFILE, "vary": {"Glucose": {"start": 50, "stop": 250, "step": 3},
+                                                                 "BMI": {"start": 18, "stop": 45, "step": 1}}})
+    assert TREE_SKIP_MIN_ROWS <= result["scored_points"] < result["points"]
+
+
+def test_base_matches_profile(bundle):
+    result = whatif_record(bundle, {"profile": PROFILE, "vary": {"Age": [PROFILE["Age"]]}})
+    assert result["base"]["probability"] == pytest.approx(result["probabilities"][0], abs=1e-4)
+
+
+@pytest.mark.parametrize("vary", [
+    {},
+    {"Glucose": [100], "BMI": [30], "Age": [40]},
+    {"Unknown": [1]},
+    {"Glucose": {"start": 10, "stop": 5}},
+    {"Glucose": {"start": 0, "stop": 1e6, "step": 1}},
+    {"Glucose": [10000]},
+    {"Glucose": {"start": float("nan"), "stop": 100}},
+    {"Glucose": {"start": 0, "stop": float("inf")}},
+    {"Glucose": {"start": 0, "stop": 100, "step": float("nan")}},
+    {"Glucose": {"start": -1e308, "stop": 1e308}},
+    {"Glucose": [float("nan")]},
+])
+def test_invalid_requests(bundle, vary):
+    with pytest.raises(ValidationError):
+        whatif_record(bundle, {"profile": PROFILE, "vary": vary})
+
+
+def asgi_post(asgi, path, payload):
+    """(status, JSON body) of one request through the ASGI app"""
+    body = json.dumps(payload).encode()
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": body}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        else:
+            response["body"] = json.loads(message["body"])
+
+    scope = {"type": "http", "method": "POST", "path": path, "headers": []}
+    asyncio.run(asgi.application(scope, receive, send))
+    return response["status"], response["body"]
+
+
+@pytest.fixture
+def asgi(api):
+    import asgi
+
+    return asgi
+
+
+def test_routes(client, asgi):
+    payload = {"profile": PROFILE, "vary": {"BMI": [25, 35]}}
+    response = client.post("/predict/whatif", json=payload)
+    assert response.status_code == 200
+    assert asgi_post(asgi, "/predict/whatif", payload) == (200, response.get_json())
+
+    payload = {"profile": PROFILE, "vary": {"Unknown": [1]}}
+    assert client.post("/predict/whatif", json=payload).status_code == 400
+    assert asgi_post(asgi, "/predict/whatif", payload)[0] == 400
+
+
+def test_routes_map_other_input_errors_to_400(client, asgi, monkeypatch):
+    def broken(bundle, data):
+        raise ValueError("cannot convert float infinity to integer")
+
+    monkeypatch.setattr("app.whatif_record", broken)
+    monkeypatch.setattr(asgi, "whatif_record", broken)
+    payload = {"profile": PROFILE, "vary": {"BMI": [25]}}
+    response = client.post("/predict/whatif", json=payload)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "cannot convert float infinity to integer"}
+    assert asgi_post(asgi, "/predict/whatif", payload) == (400, response.get_json())
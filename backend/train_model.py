@@ -1,28 +1,215 @@
 # backend/train_model.py
-import pandas as pd
+"""Train the risk model and publish it as a versioned artifact.
+
+    python train_model.py                                  # default forest, as before
+    python train_model.py --search grid --max-accuracy-drop 0.01
+    python train_model.py --search random --n-iter 20 --n-jobs 8
+
+Tree building and cross-validation folds run on every core (--n-jobs). With a
+search, each configuration is scored by cross-validated accuracy and by the
+single-row latency of its compiled forest, and the trade-off table is printed.
+--max-accuracy-drop picks the fastest configuration within that much accuracy
+of the best one. The chosen parameters and metrics go into the artifact manifest.
+
+For exports larger than memory, --chunksize streams the CSV through ingest.py
+and trains on a uniform sample of at most --sample-rows rows:
+
+    python train_model.py --data export.csv --chunksize 100000 --sample-rows 500000
+"""
+import argparse
 import pickle
-from sklearn.model_selection import train_test_split
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import GridSearchCV, ParameterGrid, RandomizedSearchCV, StratifiedKFold, \
+    cross_val_score, train_test_split
+
+from export_model import DATA_PATH, export
+from ingest import sample_dataset
+from inference.artifact import ARTIFACT_DIR, LEGACY_MODEL_PATH
+from inference.encoder import FeatureEncoder
+from inference.forest import CompiledForest
+
+DEFAULT_PARAMS = {"n_estimators": 100, "max_depth": None, "min_samples_leaf": 1}
+
+PARAM_GRID = {
+    "n_estimators": [25, 50, 100, 200],
+    "max_depth": [6, 10, 14, None],
+    "min_samples_leaf": [1, 2, 4],
+}
+
+
+def load_dataset(data_path=DATA_PATH):
+    """Return (encoded features, target, encoder) from the training CSV"""
+    df = pd.read_csv(data_path)
+
+    # Features & Target
+    X = df.drop("Outcome", axis=1)
+    y = df["Outcome"]
+
+    # Record categorical levels so the API can reproduce the encoding
+    encoder = FeatureEncoder.from_frame(X)
+
+    # One-hot encode categorical columns
+    X = pd.get_dummies(X, drop_first=True)
+    assert encoder.feature_names == X.columns.tolist()
+    return X, y, encoder
+
+
+def stream_dataset(data_path, chunksize, sample_rows, seed):
+    """Chunked counterpart of load_dataset with bounded memory"""
+    X, y, encoder, summary = sample_dataset(data_path, chunksize, sample_rows, seed)
+    print(f"Streamed {summary['rows_read']} rows in {summary['seconds']}s, sampled {summary['rows_sampled']} "
+          f"(peak working set {summary['peak_working_mb']} MB, max RSS {summary['max_rss_mb']} MB)")
+    return pd.DataFrame(X, columns=encoder.feature_names), pd.Series(y, name="Outcome"), encoder, summary
+
+
+def measure_latency(compiled, X, repeats=200):
+    """Median single-row latency in microseconds, and batch rows per second"""
+    rows = np.ascontiguousarray(X, dtype=np.float64)
+    timings = []
+    for i in range(repeats):
+        row = rows[i % len(rows)][None, :]
+        start = time.perf_counter()
+        compiled.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    compiled.predict_proba(rows)
+    batch_seconds = time.perf_counter() - start
+    return float(np.median(timings) * 1e6), len(rows) / batch_seconds
+
+
+def evaluate(params, X_train, y_train, X_test, y_test, feature_names, categories, seed, n_jobs):
+    """Fit one configuration on the training split and measure holdout accuracy and latency"""
+    model = RandomForestClassifier(random_state=seed, n_jobs=n_jobs, **params)
+    model.fit(X_train, y_train)
+    compiled = CompiledForest.from_sklearn(model, feature_names, categories)
+    latency_us, rows_per_second = measure_latency(compiled, X_test.to_numpy(dtype=np.float64))
+    return model, {
+        "test_accuracy": float(model.score(X_test, y_test)),
+        "latency_us": latency_us,
+        "rows_per_second": rows_per_second,
+        "nodes": int(len(compiled.feature)),
+        "max_depth": int(compiled.max_depth),
+    }
+
+
+def search(kind, X_train, y_train, folds, seed, n_jobs, n_iter):
+    """Cross-validate candidate configurations, returning [(params, mean accuracy, std)]"""
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    # Parallelise across configurations and folds; each forest builds on one core
+    estimator = RandomForestClassifier(random_state=seed, n_jobs=1)
+    if kind == "grid":
+        searcher = GridSearchCV(estimator, PARAM_GRID, cv=cv, n_jobs=n_jobs)
+    else:
+        searcher = RandomizedSearchCV(estimator, PARAM_GRID, n_iter=min(n_iter, len(ParameterGrid(PARAM_GRID))),
+                                      cv=cv, n_jobs=n_jobs, random_state=seed)
+    searcher.fit(X_train, y_train)
+    results = searcher.cv_results_
+    return [(params, float(mean), float(std)) for params, mean, std in
+            zip(results["params"], results["mean_test_score"], results["std_test_score"])]
+
+
+def choose(rows, max_accuracy_drop):
+    """Most accurate configuration, or the fastest within max_accuracy_drop of it"""
+    best = max(rows, key=lambda row: row["cv_accuracy"])
+    if max_accuracy_drop is None:
+        return best
+    eligible = [row for row in rows if row["cv_accuracy"] >= best["cv_accuracy"] - max_accuracy_drop]
+    return min(eligible, key=lambda row: row["latency_us"])
+
+
+def print_table(rows, chosen):
+    print(f"{'trees':>6} {'depth':>6} {'leaf':>5} {'cv acc':>14} {'test acc':>9} {'nodes':>7} "
+          f"{'row us':>8} {'rows/s':>10}")
+    for row in sorted(rows, key=lambda row: -row["cv_accuracy"]):
+        params = row["params"]
+        marker = " *" if row is chosen else ""
+        print(f"{params['n_estimators']:>6} {str(params['max_depth']):>6} {params['min_samples_leaf']:>5} "
+              f"{row['cv_accuracy']:>7.4f}±{row['cv_std']:.4f} {row['test_accuracy']:>9.4f} {row['nodes']:>7} "
+              f"{row['latency_us']:>8.1f} {row['rows_per_second']:>10.0f}{marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the risk model and publish an artifact")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--artifacts", default=ARTIFACT_DIR, help="artifact root directory")
+    parser.add_argument("--model", default=LEGACY_MODEL_PATH, help="where to write the pickled model")
+    parser.add_argument("--search", choices=("none", "grid", "random"), default="none")
+    parser.add_argument("--n-iter", type=int, default=20, help="configurations sampled by --search random")
+    parser.add_argument("--cv", type=int, default=5, help="cross-validation folds")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel workers (-1 uses every core)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-accuracy-drop", type=float, default=None,
+                        help="pick the fastest configuration within this cv accuracy of the best")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the CSV in chunks of this many rows instead of loading it whole")
+    parser.add_argument("--sample-rows", type=int, default=500_000, help="rows kept when streaming")
+    parser.add_argument("--no-publish", action="store_true", help="write the version without making it current")
+    args = parser.parse_args()
+
+    ingestion = None
+    if args.chunksize:
+        X, y, encoder, ingestion = stream_dataset(args.data, args.chunksize, args.sample_rows, args.seed)
+    else:
+        X, y, encoder = load_dataset(args.data)
+    feature_names = X.columns.tolist()
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=args.seed)
 
-# Load dataset
-df = pd.read_csv("data/diabetes_extended_ordered.csv")
+    started = time.perf_counter()
+    if args.search == "none":
+        cv = StratifiedKFold(n_splits=args.cv, shuffle=True, random_state=args.seed)
+        scores = cross_val_score(RandomForestClassifier(random_state=args.seed, n_jobs=1, **DEFAULT_PARAMS),
+                                 X_train, y_train, cv=cv, n_jobs=args.n_jobs)
+        candidates = [(DEFAULT_PARAMS, float(scores.mean()), float(scores.std()))]
+    else:
+        candidates = search(args.search, X_train, y_train, args.cv, args.seed, args.n_jobs, args.n_iter)
+    search_seconds = time.perf_counter() - started
 
-# Features & Target
-X = df.drop("Outcome", axis=1)
-y = df["Outcome"]
+    # Refit every candidate on all cores to measure its holdout accuracy and serving latency
+    rows = []
+    models = {}
+    for params, cv_accuracy, cv_std in candidates:
+        model, metrics = evaluate(params, X_train, y_train, X_test, y_test, feature_names, encoder.categories,
+                                  args.seed, args.n_jobs)
+        row = {"params": params, "cv_accuracy": cv_accuracy, "cv_std": cv_std, **metrics}
+        rows.append(row)
+        models[id(row)] = model
 
-# One-hot encode categorical columns
-X = pd.get_dummies(X, drop_first=True)
+    chosen = choose(rows, args.max_accuracy_drop)
+    print_table(rows, chosen)
+    model = models[id(chosen)]
 
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Save model
+    with open(args.model, "wb") as f:
+        pickle.dump((model, feature_names, encoder.categories), f)
+    print(f"✅ Model trained and saved as {args.model}")
 
-# Train model
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
+    # Export the versioned artifact the API loads in place of the pickle
+    metadata = {"training": {
+        "params": chosen["params"],
+        "seed": args.seed,
+        "search": args.search,
+        "cv_folds": args.cv,
+        "max_accuracy_drop": args.max_accuracy_drop,
+        "sklearn_version": sklearn.__version__,
+        "search_seconds": round(search_seconds, 3),
+        "metrics": {key: chosen[key] for key in
+                    ("cv_accuracy", "cv_std", "test_accuracy", "latency_us", "rows_per_second", "nodes")},
+        "candidates": len(rows),
+        "ingestion": ingestion,
+    }}
+    _, version = export(model, feature_names, encoder.categories, args.artifacts, data_path=args.data,
+                        metadata=metadata, publish=not args.no_publish,
+                        verify_rows=args.sample_rows if args.chunksize else None)
+    print(f"✅ Compiled forest published as artifact {version}")
 
-# Save model
-with open("model.pkl", "wb") as f:
-    pickle.dump((model, X.columns.tolist()), f)
 
-print("✅ Model trained and saved as model.pkl")
+if __name__ == "__main__":
+    main()